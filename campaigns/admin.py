@@ -1,15 +1,17 @@
+import base64
 import hashlib
-import json
 
+import numpy as np
 from csvexport.actions import csvexport
 from django.contrib import admin
 from django.shortcuts import render
 from ordered_model.admin import OrderedModelAdmin
 
 from campaigns.models import Campaign, Petition, PetitionSignature
-from campaigns.tasks import geocode_signature
+from campaigns.tasks import bulk_geocode_signatures
 from facets.models import District, RegisteredCommunityOrganization
 from pbaabp.admin import ReadOnlyLeafletGeoAdminMixin
+from pbaabp.pins import encode_pins
 
 
 class CampaignAdmin(OrderedModelAdmin):
@@ -65,9 +67,11 @@ class PetitionAdmin(admin.ModelAdmin):
 
 
 def geocode(modeladmin, request, queryset):
-    for obj in queryset:
-        if obj.location is None:
-            geocode_signature.delay(obj.id)
+    signature_ids = [
+        str(pk) for pk in queryset.filter(location__isnull=True).values_list("id", flat=True)
+    ]
+    if signature_ids:
+        bulk_geocode_signatures.delay(signature_ids)
 
 
 def randomize_lat_long(salt, lat, long):
@@ -78,15 +82,48 @@ def randomize_lat_long(salt, lat, long):
     return (lat + x_smear, long + y_smear)
 
 
+def _digests_mod(digests, modulus):
+    # Each 256-bit digest as four big-endian 64-bit words, reduced word by word so the
+    # arithmetic fits in uint64: x mod m == sum((w_k mod m) * (2**(64 * (3 - k)) mod m)) mod m
+    words = np.frombuffer(digests, dtype=">u8").reshape(-1, 4)
+    place_values = np.array([pow(2, 64 * (3 - k), modulus) for k in range(4)], dtype=np.uint64)
+    modulus = np.uint64(modulus)
+    return ((words % modulus) * place_values).sum(axis=1) % modulus
+
+
+def randomize_lat_longs(salts, lats, longs):
+    """
+    Batch version of randomize_lat_long, returning (lats, longs) arrays.
+
+    The SHA-256 digests are still computed per point, but reducing them and applying the
+    smear is done with NumPy. Results are identical to calling randomize_lat_long on each
+    point.
+    """
+    lats, longs = np.asarray(lats, dtype=np.float64), np.asarray(longs, dtype=np.float64)
+    sha256 = hashlib.sha256
+    digests = b"".join(
+        [
+            sha256(f"{salt}-{lat}-{long}".encode()).digest()
+            for salt, lat, long in zip(salts, lats.tolist(), longs.tolist())
+        ]
+    )
+    x_smear = ((_digests_mod(digests, 2179).astype(np.int64) / 2179) - 0.5) * 0.000287
+    y_smear = ((_digests_mod(digests, 2803).astype(np.int64) / 2803) - 0.5) * 0.000358
+    return lats + x_smear, longs + y_smear
+
+
 def heatmap(modeladmin, request, queryset):
+    signatures = [
+        (petition_id, location.y, location.x)
+        for petition_id, location in queryset.values_list("petition_id", "location")
+        if location
+    ]
     pins = []
-    for signature in queryset:
-        if signature.location:
-            lat, lng = randomize_lat_long(
-                signature.petition.id, signature.location.y, signature.location.x
-            )
-            pins.append([lat, lng, 1])
-    return render(request, "petition/heatmap.html", {"pins_json": json.dumps(pins)})
+    if signatures:
+        lats, lngs = randomize_lat_longs(*zip(*signatures))
+        pins = [[lat, lng, 1] for lat, lng in zip(lats.tolist(), lngs.tolist())]
+    pins_encoded = base64.b64encode(encode_pins(pins)).decode()
+    return render(request, "petition/heatmap.html", {"pins_encoded": pins_encoded})
 
 
 class DistrictFilter(admin.SimpleListFilter):
@@ -0,0 +1,44 @@
+import random
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from campaigns.admin import randomize_lat_long, randomize_lat_longs
+
+
+class Command(BaseCommand):
+    help = "Compare randomize_lat_long called per point with the batch randomize_lat_longs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--points", type=int, default=100_000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        n = options["points"]
+        lats = [rng.uniform(39.86, 40.14) for _ in range(n)]
+        longs = [rng.uniform(-75.28, -74.95) for _ in range(n)]
+        scenarios = [
+            ("report ids", [rng.randrange(1_000_000) for _ in range(n)]),
+            ("one petition", [uuid.UUID(int=rng.getrandbits(128))] * n),
+        ]
+
+        self.stdout.write(f"Points: {n}")
+        for name, salts in scenarios:
+            start = time.perf_counter()
+            expected = [randomize_lat_long(*point) for point in zip(salts, lats, longs)]
+            scalar_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            batch_lats, batch_longs = randomize_lat_longs(salts, lats, longs)
+            batch_time = time.perf_counter() - start
+
+            results = list(zip(batch_lats.tolist(), batch_longs.tolist()))
+            if results != expected:
+                mismatches = sum(1 for a, b in zip(results, expected) if a != b)
+                self.stderr.write(self.style.ERROR(f"{name}: {mismatches} points disagree!"))
+
+            self.stdout.write(
+                f"{name}: scalar {scalar_time * 1000:.1f} ms, batch {batch_time * 1000:.1f} ms"
+            )
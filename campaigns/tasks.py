@@ -2,9 +2,16 @@ from asgiref.sync import async_to_sync
 from celery import shared_task
 from django.contrib.gis.geos import Point
 
+from facets.geocoding import bulk_geocode
 from facets.utils import geocode_address
 
 
+def signature_search_address(signature):
+    if signature.postal_address_line_1 is None:
+        return None
+    return signature.postal_address_line_1 + " " + (signature.zip_code or "")
+
+
 @shared_task
 def geocode_signature(signature_id):
     from campaigns.models import PetitionSignature
@@ -13,9 +20,7 @@ def geocode_signature(signature_id):
 
     if signature.postal_address_line_1 is not None:
         print(f"Geocoding {signature}")
-        address = async_to_sync(geocode_address)(
-            signature.postal_address_line_1 + " " + signature.zip_code
-        )
+        address = async_to_sync(geocode_address)(signature_search_address(signature))
         if address is not None:
             print(f"Address found {address}")
             PetitionSignature.objects.filter(id=signature_id).update(
@@ -24,3 +29,15 @@ def geocode_signature(signature_id):
         else:
             print(f"No address found for {signature.postal_address_line_1} {signature.zip_code}")
             PetitionSignature.objects.filter(id=signature_id).update(location=None)
+
+
+@shared_task
+def bulk_geocode_signatures(signature_ids=None, only_missing=True):
+    from campaigns.models import PetitionSignature
+
+    queryset = PetitionSignature.objects.filter(postal_address_line_1__isnull=False)
+    if signature_ids is not None:
+        queryset = queryset.filter(id__in=signature_ids)
+    if only_missing:
+        queryset = queryset.filter(location__isnull=True)
+    return bulk_geocode(queryset, signature_search_address)
@@ -0,0 +1,43 @@
+import hashlib
+import random
+import uuid
+
+from django.test import SimpleTestCase
+
+from campaigns.admin import _digests_mod, randomize_lat_long, randomize_lat_longs
+
+
+class RandomizeLatLongsTestCase(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(1234)
+        self.lats = [39.8 + rng.random() * 0.3 for _ in range(500)]
+        self.longs = [-75.3 + rng.random() * 0.3 for _ in range(500)]
+
+    def assert_matches_per_point(self, salts):
+        lats, longs = randomize_lat_longs(salts, self.lats, self.longs)
+
+        for salt, lat, long, jittered_lat, jittered_long in zip(
+            salts, self.lats, self.longs, lats.tolist(), longs.tolist()
+        ):
+            # Bit identical, so pins don't move when switching between the two
+            self.assertEqual((jittered_lat, jittered_long), randomize_lat_long(salt, lat, long))
+
+    def test_report_ids(self):
+        self.assert_matches_per_point(list(range(1, 501)))
+
+    def test_petition_ids(self):
+        self.assert_matches_per_point([uuid.UUID(int=i) for i in range(500)])
+
+    def test_empty(self):
+        lats, longs = randomize_lat_longs([], [], [])
+
+        self.assertEqual((len(lats), len(longs)), (0, 0))
+
+    def test_digests_mod(self):
+        digests = [hashlib.sha256(str(i).encode()).digest() for i in range(200)]
+
+        for modulus in [2179, 2803]:
+            self.assertEqual(
+                _digests_mod(b"".join(digests), modulus).tolist(),
+                [int.from_bytes(digest, "big") % modulus for digest in digests],
+            )
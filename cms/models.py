@@ -1,4 +1,3 @@
-from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
 from django.db import models
 from django.http import Http404
 from modelcluster.contrib.taggit import ClusterTaggableManager
@@ -23,6 +22,7 @@ from wagtail.models.media import Collection
 from wagtail_link_block.blocks import LinkBlock
 
 from pbaabp.forms import NewsletterSignupForm
+from pbaabp.pagination import KeysetPaginator
 
 
 class AlignedParagraphBlock(StructBlock):
@@ -342,6 +342,10 @@ class PostsContainerPage(RoutablePageMixin, Page):
             posts = posts.filter(tags__name=tag)
         return posts
 
+    def paginate_posts(self, request, posts):
+        paginator = KeysetPaginator(posts, self.posts_per_page, ["-date", "-pk"])
+        return paginator.get_page(request.GET.get("cursor"))
+
     def get_context(self, request):
         context = super().get_context(request)
 
@@ -351,18 +355,7 @@ class PostsContainerPage(RoutablePageMixin, Page):
         # Get all posts, ordered by date (newest first)
         posts = self.get_posts(tag=tag).order_by("-date")
 
-        # Pagination
-        page = request.GET.get("page", 1)
-        paginator = Paginator(posts, self.posts_per_page)
-
-        try:
-            posts = paginator.page(page)
-        except PageNotAnInteger:
-            posts = paginator.page(1)
-        except EmptyPage:
-            posts = paginator.page(paginator.num_pages)
-
-        context["posts"] = posts
+        context["posts"] = self.paginate_posts(request, posts)
         context["current_tag"] = tag
 
         # Get all tags used in posts with counts
@@ -389,18 +382,7 @@ class PostsContainerPage(RoutablePageMixin, Page):
         if day:
             posts = posts.filter(date__day=day)
 
-        # Apply pagination
-        page = request.GET.get("page", 1)
-        paginator = Paginator(posts, self.posts_per_page)
-
-        try:
-            posts = paginator.page(page)
-        except PageNotAnInteger:
-            posts = paginator.page(1)
-        except EmptyPage:
-            posts = paginator.page(paginator.num_pages)
-
-        context["posts"] = posts
+        context["posts"] = self.paginate_posts(request, posts)
         return self.render(request, context_overrides=context)
 
     @path("tag/<slug:tag>/")
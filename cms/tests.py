@@ -0,0 +1,48 @@
+import datetime
+
+from django.test import TestCase
+from wagtail.models import Site
+
+from cms.models import PostPage, PostsContainerPage
+
+
+class PostsContainerPageTestCase(TestCase):
+    def setUp(self):
+        root = Site.objects.get(is_default_site=True).root_page
+        self.container = root.add_child(
+            instance=PostsContainerPage(title="News", slug="news", posts_per_page=2)
+        )
+        # Posts on the same date have to be told apart by pk
+        dates = [datetime.date(2025, 6, 3)] * 3 + [datetime.date(2025, 6, 1)] * 2
+        self.posts = [
+            self.container.add_child(
+                instance=PostPage(title=f"Post {i}", slug=f"post-{i}", date=date, body=[])
+            )
+            for i, date in enumerate(dates)
+        ]
+        self.expected = sorted(self.posts, key=lambda p: (p.date, p.pk), reverse=True)
+
+    def test_renders_pages_by_cursor(self):
+        seen = []
+        params = {}
+        while True:
+            response = self.client.get(self.container.url, params)
+            self.assertEqual(response.status_code, 200)
+            posts = response.context["posts"]
+            seen.extend(post.pk for post in posts)
+            if not posts.has_next():
+                break
+            self.assertContains(response, f"cursor={posts.next_cursor}")
+            params = {"cursor": posts.next_cursor}
+
+        self.assertEqual(seen, [post.pk for post in self.expected])
+
+    def test_previous_cursor_returns_to_newer_posts(self):
+        first = self.client.get(self.container.url).context["posts"]
+        second = self.client.get(self.container.url, {"cursor": first.next_cursor})
+
+        previous = self.client.get(
+            self.container.url, {"cursor": second.context["posts"].previous_cursor}
+        )
+
+        self.assertEqual(list(previous.context["posts"]), list(first))
@@ -1,3 +1,37 @@
-# from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from events.models import ScheduledEvent
+
+
+class PastEventsListViewTestCase(TestCase):
+    def setUp(self):
+        start = timezone.now().replace(microsecond=0) - datetime.timedelta(days=1)
+        # Pairs share a start_datetime, so pages have to break ties on pk
+        self.events = [
+            ScheduledEvent.objects.create(
+                title=f"Event {i}",
+                slug=f"event-{i}",
+                status=ScheduledEvent.Status.COMPLETED,
+                start_datetime=start - datetime.timedelta(days=i // 2),
+            )
+            for i in range(13)
+        ]
+        self.expected = sorted(self.events, key=lambda e: (e.start_datetime, e.pk), reverse=True)
+
+    def test_renders_pages_by_cursor(self):
+        url = reverse("events_past_list")
+        first = self.client.get(url)
+        cursor = first.context["page_obj"].next_cursor
+        second = self.client.get(url, {"cursor": cursor})
+
+        self.assertEqual(second.status_code, 200)
+        self.assertContains(second, f"?cursor={second.context['page_obj'].previous_cursor}")
+        self.assertEqual(
+            list(first.context["object_list"]) + list(second.context["object_list"]),
+            self.expected,
+        )
+        self.assertFalse(second.context["page_obj"].has_next())
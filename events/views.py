@@ -10,6 +10,7 @@ from django.views.generic import DetailView, ListView
 
 from events.forms import EventRSVPForm, EventSignInForm
 from events.models import EventRSVP, EventSignIn, ScheduledEvent
+from pbaabp.pagination import KeysetPaginator
 
 
 def _fetch_event_by_slug_or_id(event_slug_or_id):
@@ -73,6 +74,11 @@ class PastEventsListView(ListView):
 
         return queryset
 
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size, ["-start_datetime", "-pk"])
+        page = paginator.get_page(self.request.GET.get("cursor"))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["feed_url"] = (
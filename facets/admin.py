@@ -2,6 +2,7 @@ from django.contrib import admin
 
 from facets.models import (
     District,
+    PollingPlace,
     RegisteredCommunityOrganization,
     StateHouseDistrict,
     StateSenateDistrict,
@@ -61,8 +62,15 @@ class StateSenateDistrictAdmin(FacetAdmin):
     search_fields = ["name"]
 
 
+class PollingPlaceAdmin(ReadOnlyLeafletGeoAdminMixin, admin.ModelAdmin):
+    list_display = ["ward", "division", "placename", "street_address"]
+    ordering = ("ward", "division")
+    search_fields = ["placename", "street_address"]
+
+
 admin.site.register(District, DistrictAdmin)
 admin.site.register(RegisteredCommunityOrganization, RegisteredCommunityOrganizationAdmin)
 admin.site.register(ZipCode, ZipCodeAdmin)
 admin.site.register(StateHouseDistrict, StateHouseDistrictAdmin)
 admin.site.register(StateSenateDistrict, StateSenateDistrictAdmin)
+admin.site.register(PollingPlace, PollingPlaceAdmin)
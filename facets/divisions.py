@@ -0,0 +1,52 @@
+import functools
+import json
+import pathlib
+
+from shapely import STRtree
+from shapely.geometry import shape
+from shapely.prepared import prep
+
+DATA_DIR = pathlib.Path(__file__).parent / "data"
+DIVISIONS_GEOJSON = DATA_DIR / "Political_Divisions.geojson"
+
+
+def parse_division_num(division_num):
+    """Split a DIVISION_NUM like "5815" into (ward, division) integers."""
+    return tuple(int(division_num[i : i + 2]) for i in range(0, len(division_num), 2))
+
+
+class DivisionIndex:
+    """
+    STRtree over the political division polygons.
+
+    Geometries are built and prepared once, lookups probe the tree by bounding
+    box and only run an exact containment test against the candidates.
+    """
+
+    def __init__(self, features):
+        self.geometries = [shape(feature["geometry"]) for feature in features]
+        self.prepared = [prep(geometry) for geometry in self.geometries]
+        self.division_nums = [feature["properties"]["DIVISION_NUM"] for feature in features]
+        self.tree = STRtree(self.geometries)
+
+    @classmethod
+    def from_file(cls, path=DIVISIONS_GEOJSON):
+        with open(path) as f:
+            return cls(json.load(f)["features"])
+
+    def lookup(self, point):
+        # Candidates come back in tree order, sort to keep file order precedence
+        for i in sorted(self.tree.query(point)):
+            if self.prepared[i].contains(point):
+                return parse_division_num(self.division_nums[i])
+        return None, None
+
+
+@functools.cache
+def division_index():
+    return DivisionIndex.from_file()
+
+
+def find_division(point):
+    """Return (ward, division) for a shapely Point, or (None, None)."""
+    return division_index().lookup(point)
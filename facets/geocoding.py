@@ -0,0 +1,113 @@
+import asyncio
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.gis.geos import Point
+
+from facets.utils import geocode_address
+
+
+class RateLimiter:
+    """Spaces out callers so no more than `rate` calls start per second."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate
+        self._next = 0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def _requests_per_second(requests_per_second=None):
+    if requests_per_second is None:
+        requests_per_second = settings.GEOCODE_BULK_REQUESTS_PER_SECOND
+    if settings.GOOGLE_MAPS_API_KEY is None:
+        # Nominatim's usage policy allows at most one request per second
+        requests_per_second = min(requests_per_second, 1)
+    return requests_per_second
+
+
+async def geocode_many(searches, requests_per_second=None, concurrency=None):
+    """
+    Geocode a {key: search_address} mapping concurrently.
+
+    Returns {key: Location or None}, None where the geocoder found nothing. Lookups that
+    raise, e.g. on a timeout or exceeded quota, are left out rather than raising.
+    """
+    limiter = RateLimiter(_requests_per_second(requests_per_second))
+    semaphore = asyncio.Semaphore(concurrency or settings.GEOCODE_BULK_CONCURRENCY)
+
+    async def _lookup(key, search_address):
+        async with semaphore:
+            await limiter.wait()
+            try:
+                return key, await geocode_address(search_address)
+            except Exception:
+                return None
+
+    results = await asyncio.gather(*[_lookup(key, search) for key, search in searches.items()])
+    return dict(result for result in results if result is not None)
+
+
+def bulk_geocode(
+    queryset,
+    address_for,
+    accept=None,
+    chunk_size=100,
+    requests_per_second=None,
+    concurrency=None,
+    on_chunk=None,
+):
+    """
+    Geocode every row of `queryset` and store the result on its `location` field.
+
+    Rows are pulled in primary key order, `chunk_size` at a time, and written back with a
+    single bulk_update per chunk. `address_for(obj)` builds the search string (or returns
+    None to skip the row) and `accept(location)` can reject poor matches, which are stored
+    as a null location like addresses with no result. Rows whose lookup errored keep their
+    location and count as failed. `on_chunk(objs)` is called after each chunk is written.
+    """
+    model = queryset.model
+    queryset = queryset.order_by("pk")
+    geocoded, failed = 0, 0
+    last_pk = None
+
+    while True:
+        chunk_queryset = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        chunk = list(chunk_queryset[:chunk_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1].pk
+
+        searches = {obj.pk: address_for(obj) for obj in chunk}
+        searches = {pk: search for pk, search in searches.items() if search}
+        results = async_to_sync(geocode_many)(searches, requests_per_second, concurrency)
+
+        updated = []
+        for obj in chunk:
+            if obj.pk not in searches:
+                continue
+            if obj.pk not in results:
+                # The geocoder errored, a later run can try again
+                failed += 1
+                continue
+            location = results[obj.pk]
+            if location is not None and (accept is None or accept(location)):
+                obj.location = Point(location.longitude, location.latitude)
+                geocoded += 1
+            else:
+                obj.location = None
+                failed += 1
+            updated.append(obj)
+
+        model.objects.bulk_update(updated, ["location"])
+        if on_chunk is not None:
+            on_chunk(updated)
+
+    return geocoded, failed
@@ -0,0 +1,57 @@
+import json
+import random
+import time
+
+import shapely
+from django.core.management.base import BaseCommand
+from shapely.geometry import Point, shape
+
+from facets.divisions import DIVISIONS_GEOJSON, DivisionIndex, parse_division_num
+
+
+def linear_scan(features, point):
+    for feature in features:
+        if shape(feature["geometry"]).contains(point):
+            return parse_division_num(feature["properties"]["DIVISION_NUM"])
+    return None, None
+
+
+class Command(BaseCommand):
+    help = "Compare per-lookup latency of the ward/division linear scan and the STRtree index"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--points", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        with open(DIVISIONS_GEOJSON) as f:
+            features = json.load(f)["features"]
+
+        start = time.perf_counter()
+        index = DivisionIndex(features)
+        build_time = time.perf_counter() - start
+
+        minx, miny, maxx, maxy = shapely.total_bounds(index.geometries)
+        rng = random.Random(options["seed"])
+        points = [
+            Point(rng.uniform(minx, maxx), rng.uniform(miny, maxy))
+            for _ in range(options["points"])
+        ]
+
+        start = time.perf_counter()
+        expected = [linear_scan(features, point) for point in points]
+        scan_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = [index.lookup(point) for point in points]
+        index_time = time.perf_counter() - start
+
+        if results != expected:
+            mismatches = sum(1 for a, b in zip(results, expected) if a != b)
+            self.stderr.write(self.style.ERROR(f"{mismatches} lookups disagree!"))
+
+        n = len(points)
+        self.stdout.write(f"Divisions: {len(features)}, lookups: {n}")
+        self.stdout.write(f"Index build: {build_time * 1000:.1f} ms (once per process)")
+        self.stdout.write(f"Linear scan: {scan_time / n * 1000:.3f} ms/lookup")
+        self.stdout.write(f"STRtree:     {index_time / n * 1000:.3f} ms/lookup")
@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from campaigns.models import PetitionSignature
+from campaigns.tasks import signature_search_address
+from facets.geocoding import bulk_geocode
+from profiles.models import Profile
+from profiles.tasks import (
+    profile_address_accepted,
+    profile_search_address,
+    update_profile_memberships_for,
+)
+
+
+class Command(BaseCommand):
+    help = "Geocode profiles or petition signatures in rate-limited batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("target", choices=["profiles", "signatures"])
+        parser.add_argument(
+            "--all", action="store_true", help="Re-geocode rows that already have a location"
+        )
+        parser.add_argument("--petition", help="Only signatures for the petition with this slug")
+        parser.add_argument("--chunk-size", type=int, default=100)
+        parser.add_argument("--rate", type=float, default=None, help="Requests per second")
+        parser.add_argument("--concurrency", type=int, default=None)
+
+    def handle(self, *args, **options):
+        if options["target"] == "profiles":
+            queryset = Profile.objects.filter(street_address__isnull=False)
+            address_for, accept = profile_search_address, profile_address_accepted
+            on_chunk = update_profile_memberships_for
+        else:
+            queryset = PetitionSignature.objects.filter(postal_address_line_1__isnull=False)
+            if options["petition"]:
+                queryset = queryset.filter(petition__slug=options["petition"])
+            address_for, accept, on_chunk = signature_search_address, None, None
+
+        if not options["all"]:
+            queryset = queryset.filter(location__isnull=True)
+
+        self.stdout.write(f"Geocoding {queryset.count()} {options['target']}")
+        start = time.perf_counter()
+        geocoded, failed = bulk_geocode(
+            queryset,
+            address_for,
+            accept=accept,
+            chunk_size=options["chunk_size"],
+            requests_per_second=options["rate"],
+            concurrency=options["concurrency"],
+            on_chunk=on_chunk,
+        )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"Geocoded {geocoded}, failed {failed} in {elapsed:.1f}s")
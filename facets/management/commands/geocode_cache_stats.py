@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from facets.utils import geocode_cache_stats, reset_geocode_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Show hit/miss counters for the geocoding cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Zero the counters afterwards")
+
+    def handle(self, *args, **options):
+        stats = geocode_cache_stats()
+        total = stats["hits"] + stats["misses"]
+        ratio = stats["hits"] / total if total else 0
+        self.stdout.write(f"Hits: {stats['hits']}")
+        self.stdout.write(f"Misses: {stats['misses']}")
+        self.stdout.write(f"Hit ratio: {ratio:.1%}")
+        if options["reset"]:
+            reset_geocode_cache_stats()
+            self.stdout.write("Counters reset")
@@ -0,0 +1,34 @@
+import json
+
+import httpx
+from django.core.management.base import BaseCommand
+
+from facets.polling_places import (
+    POLLING_PLACES_GEOJSON,
+    read_polling_places,
+    replace_polling_places,
+)
+
+
+class Command(BaseCommand):
+    help = "Replace the polling place table from a GeoJSON file or URL"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "source",
+            nargs="?",
+            default=str(POLLING_PLACES_GEOJSON),
+            help="Path or http(s) URL of the city's polling places GeoJSON",
+        )
+
+    def handle(self, *args, **options):
+        source = options["source"]
+        if source.startswith(("http://", "https://")):
+            response = httpx.get(source, follow_redirects=True, timeout=60)
+            response.raise_for_status()
+            features = json.loads(response.content)["features"]
+        else:
+            features = read_polling_places(source)
+
+        count = replace_polling_places(features)
+        self.stdout.write(f"Loaded {count} polling places from {source}")
@@ -0,0 +1,29 @@
+import json
+
+import httpx
+from django.core.management.base import BaseCommand
+
+from facets.street_blocks import replace_street_segments
+
+
+class Command(BaseCommand):
+    help = (
+        "Replace the street segments used to resolve violation addresses from the city's "
+        "Street Centerline GeoJSON file or URL"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", help="Path or http(s) URL of the Street Centerline GeoJSON")
+
+    def handle(self, *args, **options):
+        source = options["source"]
+        if source.startswith(("http://", "https://")):
+            response = httpx.get(source, follow_redirects=True, timeout=120)
+            response.raise_for_status()
+            features = json.loads(response.content)["features"]
+        else:
+            with open(source) as f:
+                features = json.load(f)["features"]
+
+        count = replace_street_segments(features)
+        self.stdout.write(f"Loaded {count} street segments from {source}")
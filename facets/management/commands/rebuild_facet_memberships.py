@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from facets.membership import rebuild_memberships
+
+
+class Command(BaseCommand):
+    help = "Recompute the profile/facet membership table from scratch"
+
+    def handle(self, *args, **options):
+        count = rebuild_memberships()
+        self.stdout.write(f"Stored {count} facet memberships")
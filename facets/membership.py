@@ -0,0 +1,71 @@
+from django.db import connection, transaction
+
+from facets.models import (
+    District,
+    FacetMembership,
+    RegisteredCommunityOrganization,
+    StateHouseDistrict,
+    StateSenateDistrict,
+    ZipCode,
+)
+
+FACET_MODELS = [
+    District,
+    RegisteredCommunityOrganization,
+    ZipCode,
+    StateHouseDistrict,
+    StateSenateDistrict,
+]
+
+
+def _insert_memberships(facet_model, profile_ids=None, facet_ids=None):
+    """Insert membership rows for profiles located within `facet_model` geometries."""
+    profile_table = FacetMembership._meta.get_field("profile").related_model._meta.db_table
+    where, params = ["p.location IS NOT NULL"], [facet_model.facet_type()]
+    if profile_ids is not None:
+        where.append("p.id = ANY(%s::uuid[])")
+        params.append([str(pk) for pk in profile_ids])
+    if facet_ids is not None:
+        where.append("f.id = ANY(%s::uuid[])")
+        params.append([str(pk) for pk in facet_ids])
+
+    sql = f"""
+        INSERT INTO {FacetMembership._meta.db_table} (profile_id, facet_type, facet_id)
+        SELECT p.id, %s, f.id
+          FROM {profile_table} p
+          JOIN {facet_model._meta.db_table} f ON ST_Within(p.location, f.mpoly)
+         WHERE {" AND ".join(where)}
+        ON CONFLICT DO NOTHING
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def update_profile_memberships(profile_ids):
+    """Recompute memberships for the given profiles, e.g. after their location changed."""
+    profile_ids = list(profile_ids)
+    if not profile_ids:
+        return
+    with transaction.atomic():
+        FacetMembership.objects.filter(profile_id__in=profile_ids).delete()
+        for facet_model in FACET_MODELS:
+            _insert_memberships(facet_model, profile_ids=profile_ids)
+
+
+def update_facet_memberships(facet):
+    """Recompute memberships for one facet, e.g. after its geometry was re-imported."""
+    with transaction.atomic():
+        remove_facet_memberships(facet)
+        _insert_memberships(type(facet), facet_ids=[facet.id])
+
+
+def remove_facet_memberships(facet):
+    FacetMembership.objects.filter(facet_type=facet.facet_type(), facet_id=facet.id).delete()
+
+
+def rebuild_memberships():
+    with transaction.atomic():
+        FacetMembership.objects.all().delete()
+        for facet_model in FACET_MODELS:
+            _insert_memberships(facet_model)
+    return FacetMembership.objects.count()
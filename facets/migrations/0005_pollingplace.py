@@ -0,0 +1,52 @@
+# Generated by Django 5.1.8 on 2026-10-18 03:40
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations, models
+
+
+def load_polling_places(apps, schema_editor):
+    from facets.polling_places import read_polling_places, replace_polling_places
+
+    PollingPlace = apps.get_model("facets", "PollingPlace")
+    replace_polling_places(read_polling_places(), model=PollingPlace)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("facets", "0004_statehousedistrict_statesenatedistrict"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PollingPlace",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("ward", models.IntegerField()),
+                ("division", models.IntegerField()),
+                ("placename", models.CharField(max_length=256)),
+                ("street_address", models.CharField(max_length=256)),
+                ("zip_code", models.CharField(blank=True, max_length=10, null=True)),
+                (
+                    "location",
+                    django.contrib.gis.db.models.fields.PointField(
+                        blank=True, null=True, srid=4326
+                    ),
+                ),
+                ("properties", models.JSONField()),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("ward", "division"), name="unique_polling_place_ward_division"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(load_polling_places, migrations.RunPython.noop),
+    ]
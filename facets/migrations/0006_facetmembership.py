@@ -0,0 +1,79 @@
+# Generated by Django 5.1.8 on 2026-10-18 04:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+FACET_MODELS = [
+    "District",
+    "RegisteredCommunityOrganization",
+    "ZipCode",
+    "StateHouseDistrict",
+    "StateSenateDistrict",
+]
+
+
+def populate_memberships(apps, schema_editor):
+    # Uses the historical models, so this keeps working as facets.membership changes
+    FacetMembership = apps.get_model("facets", "FacetMembership")
+    Profile = apps.get_model("profiles", "Profile")
+    with schema_editor.connection.cursor() as cursor:
+        for model_name in FACET_MODELS:
+            facet_model = apps.get_model("facets", model_name)
+            cursor.execute(
+                f"""
+                INSERT INTO {FacetMembership._meta.db_table} (profile_id, facet_type, facet_id)
+                SELECT p.id, %s, f.id
+                  FROM {Profile._meta.db_table} p
+                  JOIN {facet_model._meta.db_table} f ON ST_Within(p.location, f.mpoly)
+                 WHERE p.location IS NOT NULL
+                ON CONFLICT DO NOTHING
+                """,
+                [facet_model._meta.model_name],
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("facets", "0005_pollingplace"),
+        ("profiles", "0020_shirtorder_product_type_alter_shirtorder_fit"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FacetMembership",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("facet_type", models.CharField(max_length=64)),
+                ("facet_id", models.UUIDField()),
+                (
+                    "profile",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="facet_memberships",
+                        to="profiles.profile",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["facet_type", "facet_id"], name="facets_face_facet_t_a3eb3b_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("profile", "facet_type", "facet_id"),
+                        name="unique_facet_membership",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_memberships, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.8 on 2026-10-18 04:39
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("facets", "0006_facetmembership"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StreetSegment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("geometry", django.contrib.gis.db.models.fields.MultiLineStringField(srid=4326)),
+                ("properties", models.JSONField()),
+            ],
+        ),
+    ]
@@ -4,6 +4,8 @@ from django.contrib.gis.db import models
 from django.db.models import Q
 from relativity.fields import L, Relationship
 
+from facets.street_blocks import street_name
+
 
 class Facet(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -33,6 +35,19 @@ class Facet(models.Model):
             return True
         return self.name > other.name
 
+    @classmethod
+    def facet_type(cls):
+        return cls._meta.model_name
+
+    def member_profiles(self):
+        """Profiles located in this facet, read from the FacetMembership table."""
+        from profiles.models import Profile
+
+        return Profile.objects.filter(
+            facet_memberships__facet_type=self.facet_type(),
+            facet_memberships__facet_id=self.id,
+        )
+
 
 class District(Facet):
     targetable = models.BooleanField(default=True)
@@ -64,3 +79,63 @@ class StateHouseDistrict(Facet):
 
 class StateSenateDistrict(Facet):
     pass
+
+
+class PollingPlace(models.Model):
+    ward = models.IntegerField()
+    division = models.IntegerField()
+    placename = models.CharField(max_length=256)
+    street_address = models.CharField(max_length=256)
+    zip_code = models.CharField(max_length=10, null=True, blank=True)
+    location = models.PointField(srid=4326, null=True, blank=True)
+    properties = models.JSONField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["ward", "division"], name="unique_polling_place_ward_division"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.placename} - {self.street_address}"
+
+
+class StreetSegment(models.Model):
+    """
+    A segment of the city's Street Centerline dataset, see facets.street_blocks.
+
+    `properties` holds the street name parts, address ranges and zip codes of each side.
+    """
+
+    geometry = models.MultiLineStringField(srid=4326)
+    properties = models.JSONField()
+
+    def __str__(self):
+        return street_name(self.properties)
+
+
+class FacetMembership(models.Model):
+    """
+    Materialized profile-in-facet relation.
+
+    Maintained by facets.membership whenever a profile's location or a facet's geometry
+    changes, so audience lookups are an indexed join instead of a polygon test.
+    """
+
+    profile = models.ForeignKey(
+        "profiles.Profile", on_delete=models.CASCADE, related_name="facet_memberships"
+    )
+    facet_type = models.CharField(max_length=64)
+    facet_id = models.UUIDField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["profile", "facet_type", "facet_id"], name="unique_facet_membership"
+            )
+        ]
+        indexes = [models.Index(fields=["facet_type", "facet_id"])]
+
+    def __str__(self):
+        return f"{self.profile_id} in {self.facet_type} {self.facet_id}"
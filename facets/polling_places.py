@@ -0,0 +1,47 @@
+import json
+import pathlib
+
+from django.contrib.gis.geos import GEOSGeometry
+from django.db import transaction
+
+DATA_DIR = pathlib.Path(__file__).parent / "data"
+POLLING_PLACES_GEOJSON = DATA_DIR / "polling_places.geojson"
+
+
+def read_polling_places(path=POLLING_PLACES_GEOJSON):
+    with open(path) as f:
+        return json.load(f)["features"]
+
+
+def replace_polling_places(features, model=None):
+    """
+    Replace all PollingPlace rows with the given GeoJSON features.
+
+    Runs in a single transaction so lookups see either the old or the new set.
+    `model` may be a historical model when called from a migration.
+    """
+    if model is None:
+        from facets.models import PollingPlace as model
+
+    places = {}
+    for feature in features:
+        properties = feature["properties"]
+        key = (int(properties["ward"]), int(properties["division"]))
+        if key in places:
+            continue
+        geometry = feature.get("geometry")
+        places[key] = model(
+            ward=key[0],
+            division=key[1],
+            placename=properties["placename"] or "",
+            street_address=properties["street_address"] or "",
+            zip_code=properties.get("zip_code"),
+            location=GEOSGeometry(json.dumps(geometry), srid=4326) if geometry else None,
+            properties=properties,
+        )
+
+    with transaction.atomic():
+        model.objects.all().delete()
+        model.objects.bulk_create(places.values(), batch_size=500)
+
+    return len(places)
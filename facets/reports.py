@@ -0,0 +1,102 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+from facets.models import District, FacetMembership, RegisteredCommunityOrganization
+from profiles.models import EmailActivityDay, Profile
+
+EMAIL_REPORT_CACHE_KEY = "facets:email_report"
+EMAIL_REPORT_TIMEOUT = 60 * 60
+EMAIL_REPORT_STALE_AFTER = datetime.timedelta(minutes=5)
+EMAIL_REPORT_DAYS = 30
+
+
+def email_counts_by_facet(facet_types, since):
+    """
+    Return {(facet_type, facet_id): (profile_count, total_emails)} in a single query.
+
+    Recent emails are summed per recipient from the EmailActivityDay rollup, then joined
+    to the profiles in each facet via the FacetMembership table. `since` is a date.
+    """
+    sql = f"""
+        WITH recipient_counts AS (
+            SELECT recipient AS email, SUM(count) AS n
+              FROM {EmailActivityDay._meta.db_table}
+             WHERE date >= %s
+             GROUP BY recipient
+        )
+        SELECT m.facet_type, m.facet_id, COUNT(*), COALESCE(SUM(rc.n), 0)
+          FROM {FacetMembership._meta.db_table} m
+          JOIN {Profile._meta.db_table} p ON p.id = m.profile_id
+          JOIN {User._meta.db_table} u ON u.id = p.user_id
+          LEFT JOIN recipient_counts rc ON rc.email = lower(u.email)
+         WHERE m.facet_type = ANY(%s) AND u.email IS NOT NULL AND u.email <> ''
+         GROUP BY m.facet_type, m.facet_id
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [since, list(facet_types)])
+        return {
+            (facet_type, facet_id): (profile_count, total_emails)
+            for facet_type, facet_id, profile_count, total_emails in cursor.fetchall()
+        }
+
+
+def _rows(facets, counts):
+    rows = []
+    for facet in facets:
+        profile_count, total_emails = counts.get((facet.facet_type(), facet.id), (0, 0))
+        if profile_count > 0:
+            rows.append(
+                {
+                    "name": facet.name,
+                    "profile_count": profile_count,
+                    "total_emails": total_emails,
+                    "avg_emails": round(total_emails / profile_count, 2),
+                }
+            )
+    rows.sort(key=lambda x: x["avg_emails"], reverse=True)
+    return rows
+
+
+def build_email_report():
+    now = timezone.now()
+    since = timezone.localdate(now) - datetime.timedelta(days=EMAIL_REPORT_DAYS)
+    counts = email_counts_by_facet(
+        [District.facet_type(), RegisteredCommunityOrganization.facet_type()], since
+    )
+    districts = District.objects.only("id", "name")
+    rcos = RegisteredCommunityOrganization.objects.filter(targetable=True).only("id", "name")
+    return {
+        "districts": _rows(districts, counts),
+        "rcos": _rows(rcos, counts),
+        "date_range": f"Last {EMAIL_REPORT_DAYS} days (since {since})",
+        "generated_at": now,
+    }
+
+
+def refresh_email_report():
+    report = build_email_report()
+    cache.set(EMAIL_REPORT_CACHE_KEY, report, timeout=EMAIL_REPORT_TIMEOUT)
+    return report
+
+
+def get_email_report():
+    """
+    Return the cached report, building it on a cold cache.
+
+    Once the cached copy is older than EMAIL_REPORT_STALE_AFTER it is still served, but a
+    background refresh is queued.
+    """
+    report = cache.get(EMAIL_REPORT_CACHE_KEY)
+    if report is None:
+        return refresh_email_report()
+
+    if timezone.now() - report["generated_at"] > EMAIL_REPORT_STALE_AFTER:
+        if cache.add(f"{EMAIL_REPORT_CACHE_KEY}:refreshing", True, timeout=60):
+            from facets.tasks import refresh_email_report as refresh_email_report_task
+
+            refresh_email_report_task.delay()
+    return report
@@ -0,0 +1,31 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from facets.membership import (
+    FACET_MODELS,
+    remove_facet_memberships,
+    update_facet_memberships,
+)
+
+
+def facet_post_save(sender, instance, raw, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(lambda: update_facet_memberships(instance))
+
+
+def facet_post_delete(sender, instance, **kwargs):
+    remove_facet_memberships(instance)
+
+
+for facet_model in FACET_MODELS:
+    post_save.connect(
+        facet_post_save,
+        sender=facet_model,
+        dispatch_uid=f"{facet_model.facet_type()}_membership_post_save",
+    )
+    post_delete.connect(
+        facet_post_delete,
+        sender=facet_model,
+        dispatch_uid=f"{facet_model.facet_type()}_membership_post_delete",
+    )
@@ -0,0 +1,155 @@
+import json
+import math
+import string
+from dataclasses import dataclass
+
+from django.contrib.gis.db.models.functions import Distance
+from django.contrib.gis.geos import GEOSGeometry, MultiLineString
+from django.contrib.gis.geos import Point as GEOSPoint
+from django.contrib.gis.measure import D
+from django.db import transaction
+from shapely import wkb
+from shapely.affinity import scale
+from shapely.geometry import Point
+
+# Properties used from the city's Street Centerline dataset
+CENTERLINE_PROPERTIES = [
+    "PRE_DIR",
+    "ST_NAME",
+    "ST_TYPE",
+    "SUF_DIR",
+    "L_F_ADD",
+    "L_T_ADD",
+    "R_F_ADD",
+    "R_T_ADD",
+    "ZIP_LEFT",
+    "ZIP_RIGHT",
+]
+
+METERS_PER_DEGREE = 111_320
+# Longitudes are squeezed by the cosine of Philadelphia's latitude, so distances in the
+# index are the same in every direction
+X_SCALE = math.cos(math.radians(39.95))
+
+
+@dataclass(frozen=True)
+class StreetBlock:
+    block_number: str
+    street_name: str
+    zip_code: str
+
+    @property
+    def address(self):
+        # capwords rather than title, which would give "52Nd St"
+        street = string.capwords(self.street_name)
+        return f"{self.block_number} {street}, Philadelphia, PA {self.zip_code}, USA"
+
+
+def street_name(properties):
+    parts = ["PRE_DIR", "ST_NAME", "ST_TYPE", "SUF_DIR"]
+    return " ".join(str(properties[part]) for part in parts if properties.get(part)).upper()
+
+
+def _to_index(geometry):
+    return scale(geometry, xfact=X_SCALE, yfact=1, origin=(0, 0))
+
+
+def _is_left(line, point, distance):
+    """Whether `point` is to the left of `line`, looking along it, at `distance` along."""
+    step = min(line.length / 10, 1e-5)
+    start = line.interpolate(max(distance - step, 0))
+    end = line.interpolate(min(distance + step, line.length))
+    return (end.x - start.x) * (point.y - start.y) - (end.y - start.y) * (point.x - start.x) > 0
+
+
+def block_for(line, properties, point):
+    """
+    Return the StreetBlock of `point` on a centerline segment, or None without addresses.
+
+    The address number is interpolated along the segment using the address range of the side
+    of the street the point is on, and rounded down to its hundred block.
+    """
+    distance = line.project(point)
+    sides = [("L_F_ADD", "L_T_ADD", "ZIP_LEFT"), ("R_F_ADD", "R_T_ADD", "ZIP_RIGHT")]
+    if not _is_left(line, point, distance):
+        sides.reverse()
+    zip_code = properties.get(sides[0][2]) or properties.get(sides[1][2])
+    if not zip_code:
+        return None
+
+    for start_key, end_key, _zip_key in sides:
+        start, end = properties.get(start_key) or 0, properties.get(end_key) or 0
+        if start or end:
+            fraction = distance / line.length if line.length else 0
+            number = int(start + (end - start) * fraction)
+            return StreetBlock(str(number // 100 * 100), street_name(properties), str(zip_code))
+    return None
+
+
+def _segment(model, feature):
+    geometry = GEOSGeometry(json.dumps(feature["geometry"]), srid=4326)
+    if geometry.geom_type == "LineString":
+        geometry = MultiLineString(geometry, srid=4326)
+    properties = feature["properties"]
+    return model(
+        geometry=geometry,
+        properties={name: properties.get(name) for name in CENTERLINE_PROPERTIES},
+    )
+
+
+def replace_street_segments(features, model=None):
+    """
+    Replace all StreetSegment rows with the given Street Centerline GeoJSON features.
+
+    Only the properties the resolver needs are kept. Runs in a single transaction so
+    lookups see either the old or the new set.
+    """
+    if model is None:
+        from facets.models import StreetSegment as model
+
+    segments = [_segment(model, feature) for feature in features if feature.get("geometry")]
+    with transaction.atomic():
+        model.objects.all().delete()
+        model.objects.bulk_create(segments, batch_size=1000)
+
+    return len(segments)
+
+
+def _nearest_segments(longitude, latitude, max_distance):
+    from facets.models import StreetSegment
+
+    point = GEOSPoint(longitude, latitude, srid=4326)
+    # dwithin in degrees narrows to nearby segments using the spatial index, with a
+    # longitude scale so it never cuts off a segment inside max_distance
+    return (
+        StreetSegment.objects.filter(
+            geometry__dwithin=(point, max_distance / (METERS_PER_DEGREE * X_SCALE)),
+            geometry__distance_lte=(point, D(m=max_distance)),
+        )
+        .annotate(distance=Distance("geometry", point))
+        .order_by("distance")
+    )
+
+
+def _street_block(segment, longitude, latitude):
+    if segment is None:
+        return None
+    line = _to_index(wkb.loads(bytes(segment.geometry.wkb)))
+    return block_for(line, segment.properties, _to_index(Point(longitude, latitude)))
+
+
+def resolve_street_block(longitude, latitude, max_distance=30):
+    """
+    Return the StreetBlock of a point, or None if it is not within `max_distance` meters of
+    a street with addresses.
+
+    Streets come from the StreetSegment table, see the load_street_centerlines command.
+    """
+    segment = _nearest_segments(longitude, latitude, max_distance).first()
+    return _street_block(segment, longitude, latitude)
+
+
+async def aresolve_street_block(longitude, latitude, max_distance=30):
+    """Async version of resolve_street_block."""
+    segment = await _nearest_segments(longitude, latitude, max_distance).afirst()
+    return _street_block(segment, longitude, latitude)
@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from facets.reports import refresh_email_report as _refresh_email_report
+
+
+@shared_task
+def refresh_email_report():
+    _refresh_email_report()
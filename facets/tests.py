@@ -0,0 +1,220 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.contrib.gis.geos import MultiPolygon
+from django.contrib.gis.geos import Point as GEOSPoint
+from django.contrib.gis.geos import Polygon
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from geopy.location import Location
+from shapely.geometry import Point
+
+from facets.divisions import division_index, parse_division_num
+from facets.geocoding import geocode_many
+from facets.membership import (
+    rebuild_memberships,
+    update_facet_memberships,
+    update_profile_memberships,
+)
+from facets.models import District, FacetMembership, StreetSegment
+from facets.street_blocks import (
+    StreetBlock,
+    aresolve_street_block,
+    replace_street_segments,
+    resolve_street_block,
+)
+from facets.utils import (
+    geocode_address,
+    geocode_cache_stats,
+    normalize_address,
+    quantize_point,
+    reverse_geocode_point,
+)
+from profiles.models import Profile
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class DivisionIndexTestCase(SimpleTestCase):
+    def test_parse_division_num(self):
+        self.assertEqual(parse_division_num("5815"), (58, 15))
+        self.assertEqual(parse_division_num("0524"), (5, 24))
+
+    def test_lookup_inside_division(self):
+        index = division_index()
+        centroid = index.geometries[0].representative_point()
+        self.assertEqual(index.lookup(centroid), parse_division_num(index.division_nums[0]))
+
+    def test_lookup_outside_city(self):
+        self.assertEqual(division_index().lookup(Point(0, 0)), (None, None))
+
+
+@override_settings(CACHES=LOCMEM_CACHES, GEOCODE_CACHE_ENABLED=True, GOOGLE_MAPS_API_KEY=None)
+class GeocodeCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.location = Location("1 Test St, Philadelphia, PA", (39.95, -75.16), {})
+
+    def test_normalize_address(self):
+        self.assertEqual(
+            normalize_address("  123 Main St.,  Philadelphia, PA "),
+            normalize_address("123 main st philadelphia pa"),
+        )
+
+    def test_quantize_point(self):
+        self.assertEqual(
+            quantize_point("39.952581, -75.165222"), quantize_point("39.95261, -75.16518")
+        )
+
+    def test_repeat_lookup_is_cached(self):
+        with mock.patch(
+            "facets.utils._geocode_address", new=mock.AsyncMock(return_value=self.location)
+        ) as lookup:
+            first = async_to_sync(geocode_address)("123 Main St, Philadelphia")
+            second = async_to_sync(geocode_address)("123 main st philadelphia")
+
+        lookup.assert_awaited_once()
+        self.assertEqual(first.address, second.address)
+        self.assertEqual(geocode_cache_stats(), {"hits": 1, "misses": 1})
+
+    def test_bypass_cache(self):
+        with mock.patch(
+            "facets.utils._geocode_address", new=mock.AsyncMock(return_value=self.location)
+        ) as lookup:
+            async_to_sync(geocode_address)("123 Main St", use_cache=False)
+            async_to_sync(geocode_address)("123 Main St", use_cache=False)
+
+        self.assertEqual(lookup.await_count, 2)
+
+    def test_failed_lookup_not_cached(self):
+        with mock.patch(
+            "facets.utils._reverse_geocode_point", new=mock.AsyncMock(return_value=None)
+        ) as lookup:
+            async_to_sync(reverse_geocode_point)("39.95, -75.16")
+            async_to_sync(reverse_geocode_point)("39.95, -75.16")
+
+        self.assertEqual(lookup.await_count, 2)
+
+
+@override_settings(
+    GOOGLE_MAPS_API_KEY="test", GEOCODE_BULK_REQUESTS_PER_SECOND=1000, GEOCODE_BULK_CONCURRENCY=2
+)
+class GeocodeManyTestCase(SimpleTestCase):
+    def test_errors_are_left_out(self):
+        location = Location("1 Test St, Philadelphia, PA", (39.95, -75.16), {})
+
+        async def fake_geocode(search_address):
+            if search_address == "error":
+                raise Exception("quota exceeded")
+            if search_address == "nowhere":
+                return None
+            return location
+
+        with mock.patch("facets.geocoding.geocode_address", new=fake_geocode):
+            results = async_to_sync(geocode_many)({1: "good", 2: "error", 3: "nowhere"})
+
+        self.assertEqual(results, {1: location, 3: None})
+
+
+class StreetBlockTestCase(TestCase):
+    def setUp(self):
+        # Spruce St runs east from 15th to 16th, odd numbers on the north (left) side
+        replace_street_segments(
+            [
+                {
+                    "type": "Feature",
+                    "properties": {
+                        "ST_NAME": "SPRUCE",
+                        "ST_TYPE": "ST",
+                        "L_F_ADD": 1501,
+                        "L_T_ADD": 1599,
+                        "R_F_ADD": 1500,
+                        "R_T_ADD": 1598,
+                        "ZIP_LEFT": 19102,
+                        "ZIP_RIGHT": 19146,
+                        "SEG_ID": 421,
+                    },
+                    "geometry": {
+                        "type": "LineString",
+                        "coordinates": [[-75.1670, 39.9470], [-75.1650, 39.9470]],
+                    },
+                }
+            ]
+        )
+
+    def test_snaps_to_side_of_street(self):
+        self.assertEqual(
+            resolve_street_block(-75.1660, 39.94705),
+            StreetBlock("1500", "SPRUCE ST", "19102"),
+        )
+        self.assertEqual(resolve_street_block(-75.1660, 39.94695).zip_code, "19146")
+
+    def test_too_far_from_street(self):
+        self.assertIsNone(resolve_street_block(-75.1660, 39.9480))
+
+    def test_keeps_only_resolver_properties(self):
+        self.assertNotIn("SEG_ID", StreetSegment.objects.get().properties)
+
+    def test_async(self):
+        self.assertEqual(
+            async_to_sync(aresolve_street_block)(-75.1660, 39.94705),
+            StreetBlock("1500", "SPRUCE ST", "19102"),
+        )
+
+
+class StreetBlockAddressTestCase(SimpleTestCase):
+    def test_address(self):
+        self.assertEqual(
+            StreetBlock("1500", "SPRUCE ST", "19102").address,
+            "1500 Spruce St, Philadelphia, PA 19102, USA",
+        )
+        self.assertEqual(
+            StreetBlock("5200", "N 52ND ST", "19131").address,
+            "5200 N 52nd St, Philadelphia, PA 19131, USA",
+        )
+
+
+def square(x, y, size=0.01):
+    return MultiPolygon(Polygon.from_bbox((x, y, x + size, y + size)))
+
+
+class FacetMembershipTestCase(TestCase):
+    def setUp(self):
+        self.district = District.objects.create(
+            name="District 1", mpoly=square(-75.17, 39.94), properties={}
+        )
+        self.other = District.objects.create(
+            name="District 2", mpoly=square(-75.15, 39.94), properties={}
+        )
+        user = User.objects.create_user(username="member", email="member@example.com")
+        self.profile = Profile.objects.create(user=user, location=GEOSPoint(-75.165, 39.945))
+
+    def test_update_profile_memberships(self):
+        update_profile_memberships([self.profile.id])
+
+        self.assertEqual(list(self.district.member_profiles()), [self.profile])
+        self.assertFalse(self.other.member_profiles().exists())
+
+    def test_moving_profile_updates_memberships(self):
+        update_profile_memberships([self.profile.id])
+
+        self.profile.location = GEOSPoint(-75.145, 39.945)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.save()
+
+        self.assertFalse(self.district.member_profiles().exists())
+        self.assertEqual(list(self.other.member_profiles()), [self.profile])
+
+    def test_update_facet_memberships(self):
+        update_profile_memberships([self.profile.id])
+
+        self.district.mpoly = square(-75.13, 39.94)
+        self.district.save()
+        update_facet_memberships(self.district)
+
+        self.assertFalse(self.district.member_profiles().exists())
+
+    def test_rebuild_memberships(self):
+        self.assertEqual(rebuild_memberships(), 1)
+        self.assertEqual(FacetMembership.objects.get().facet_id, self.district.id)
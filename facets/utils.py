@@ -1,12 +1,79 @@
+import hashlib
+import re
+
 import sentry_sdk
 from django.conf import settings
+from django.core.cache import cache
 from geopy.adapters import AioHTTPAdapter
 from geopy.geocoders import GoogleV3, Nominatim
+from geopy.point import Point as GeoPoint
 
 UA = "apps.bikeaction.org Geopy"
 
+GEOCODE_CACHE_PREFIX = "geocode"
+
+
+def _provider():
+    return "google" if settings.GOOGLE_MAPS_API_KEY is not None else "nominatim"
+
+
+def normalize_address(search_address):
+    """Lowercase, drop punctuation and collapse whitespace so trivial variants share a key."""
+    return " ".join(re.sub(r"[^\w\s#-]", " ", search_address.lower()).split())
+
+
+def quantize_point(search_point, precision=None):
+    if precision is None:
+        precision = settings.GEOCODE_CACHE_REVERSE_PRECISION
+    point = GeoPoint(search_point)
+    return f"{round(point.latitude, precision)},{round(point.longitude, precision)}"
 
-async def geocode_address(search_address):
+
+def _cache_key(kind, value):
+    digest = hashlib.sha256(value.encode()).hexdigest()
+    return f"{GEOCODE_CACHE_PREFIX}:{_provider()}:{kind}:{digest}"
+
+
+def _stats_key(name):
+    return f"{GEOCODE_CACHE_PREFIX}:stats:{name}"
+
+
+async def _count(name):
+    key = _stats_key(name)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aset(key, 1, timeout=None)
+
+
+def geocode_cache_stats():
+    hits = cache.get(_stats_key("hits"), 0)
+    misses = cache.get(_stats_key("misses"), 0)
+    return {"hits": hits, "misses": misses}
+
+
+def reset_geocode_cache_stats():
+    cache.delete_many([_stats_key("hits"), _stats_key("misses")])
+
+
+async def _cached(key, use_cache, lookup):
+    use_cache = use_cache and settings.GEOCODE_CACHE_ENABLED
+    if use_cache:
+        result = await cache.aget(key)
+        if result is not None:
+            await _count("hits")
+            return result
+        await _count("misses")
+
+    result = await lookup()
+
+    # Failed lookups are not cached, the next attempt may have a corrected address
+    if result and use_cache:
+        await cache.aset(key, result, timeout=settings.GEOCODE_CACHE_TIMEOUT)
+    return result
+
+
+async def _geocode_address(search_address):
     try:
         if settings.GOOGLE_MAPS_API_KEY is not None:
             async with GoogleV3(
@@ -22,7 +89,7 @@ async def geocode_address(search_address):
         raise
 
 
-async def reverse_geocode_point(search_point, exactly_one=True):
+async def _reverse_geocode_point(search_point, exactly_one=True):
     try:
         if settings.GOOGLE_MAPS_API_KEY is not None:
             async with GoogleV3(
@@ -36,3 +103,15 @@ async def reverse_geocode_point(search_point, exactly_one=True):
     except Exception as err:
         sentry_sdk.capture_exception(err)
         raise
+
+
+async def geocode_address(search_address, use_cache=True):
+    key = _cache_key("forward", normalize_address(search_address))
+    return await _cached(key, use_cache, lambda: _geocode_address(search_address))
+
+
+async def reverse_geocode_point(search_point, exactly_one=True, use_cache=True):
+    key = _cache_key("reverse-one" if exactly_one else "reverse-all", quantize_point(search_point))
+    return await _cached(
+        key, use_cache, lambda: _reverse_geocode_point(search_point, exactly_one=exactly_one)
+    )
@@ -8,8 +8,11 @@ from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 
 from facets.utils import reverse_geocode_point
-from lazer.models import ViolationReport, ViolationSubmission
-from lazer.tasks import submit_violation_report_to_ppa
+from lazer import scheduler
+from lazer.integrations.submit_form import direct_submission_configured
+from lazer.models import ReporterStats, ViolationReport, ViolationSubmission
+from lazer.reporter_stats import TRUSTED_SUBMITTED_COUNT
+from lazer.tasks import drain_ppa_submissions, submit_violation_report_to_ppa
 from pbaabp.admin import ReadOnlyLeafletGeoAdminMixin
 
 
@@ -20,8 +23,10 @@ class ViolationSubmissionAdmin(ReadOnlyLeafletGeoAdminMixin, admin.ModelAdmin):
         "created_by",
         "location",
         "violation_report_link",
+        "duplicate_of",
     )
-    readonly_fields = ("image_tag", "reverse_geocode_results")
+    list_filter = (("duplicate_of", admin.EmptyFieldListFilter),)
+    readonly_fields = ("image_tag", "reverse_geocode_results", "image_hash", "duplicate_of")
     search_fields = (
         "created_by__email",
         "created_by__first_name",
@@ -94,16 +99,29 @@ class IsSubmittedFilter(admin.SimpleListFilter):
         return queryset
 
 
+def requeue(modeladmin, request, queryset):
+    violation_ids = list(queryset.filter(submitted__isnull=True).values_list("id", flat=True))
+    if violation_ids:
+        scheduler.enqueue(violation_ids)
+        drain_ppa_submissions.delay()
+
+
+requeue.short_description = "Requeue for PPA submission"
+
+
 class ViolationReportAdmin(ExtraButtonsMixin, admin.ModelAdmin):
+    actions = [requeue]
     list_display = (
         "image_tag_violation_no_href",
         "violation_observed_short",
         "is_submitted",
+        "submission_state",
+        "submission_attempts",
         "created_by",
         "date_observed",
         "time_observed",
     )
-    list_filter = ("violation_observed", IsSubmittedFilter)
+    list_filter = ("violation_observed", IsSubmittedFilter, "submission_state")
     list_select_related = True
     search_fields = (
         "submission__created_by__email",
@@ -117,6 +135,9 @@ class ViolationReportAdmin(ExtraButtonsMixin, admin.ModelAdmin):
         "image_tag_success",
         "image_tag_error",
         "image_tag_final",
+        "submission_attempts",
+        "next_attempt_at",
+        "last_submission_error",
     )
 
     @button(
@@ -129,6 +150,47 @@ class ViolationReportAdmin(ExtraButtonsMixin, admin.ModelAdmin):
         report = ViolationReport.objects.get(pk=object_id)
         submit_violation_report_to_ppa.delay(report.id)
 
+    @button(
+        label="Resubmit (direct)",
+        change_form=True,
+        change_list=True,
+        permission=lambda request, obj, **kw: direct_submission_configured()
+        and (bool(obj.screenshot_error) or obj.submitted is None),
+    )
+    def resubmit_direct(self, request, object_id):
+        report = ViolationReport.objects.get(pk=object_id)
+        submit_violation_report_to_ppa.delay(report.id, mode="direct")
+
+
+class ReporterStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        "user",
+        "submitted_count",
+        "rejected_count",
+        "rejection_rate",
+        "is_trusted",
+        "last_submitted_at",
+    )
+    ordering = ("-submitted_count",)
+    list_select_related = ("user",)
+    search_fields = ("user__email", "user__first_name", "user__last_name")
+    readonly_fields = ("user", "submitted_count", "rejected_count", "last_submitted_at")
+
+    def rejection_rate(self, obj):
+        reviewed = obj.submitted_count + obj.rejected_count
+        if not reviewed:
+            return "-"
+        return f"{obj.rejected_count / reviewed:.0%}"
+
+    def is_trusted(self, obj):
+        return obj.submitted_count > TRUSTED_SUBMITTED_COUNT
+
+    is_trusted.boolean = True
+
+    def has_add_permission(self, request):
+        return False
+
 
 admin.site.register(ViolationSubmission, ViolationSubmissionAdmin)
 admin.site.register(ViolationReport, ViolationReportAdmin)
+admin.site.register(ReporterStats, ReporterStatsAdmin)
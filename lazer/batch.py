@@ -0,0 +1,215 @@
+import asyncio
+import base64
+import datetime
+import logging
+import os
+
+import pyap
+import sentry_sdk
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.db import IntegrityError
+
+from facets.street_blocks import aresolve_street_block
+from facets.utils import reverse_geocode_point
+from lazer.dedupe import find_duplicate
+from lazer.forms import BatchItemForm, BatchReportForm
+from lazer.images import ingest_image_bytes
+from lazer.integrations.platerecognizer import read_plate
+from lazer.models import ViolationReport, ViolationSubmission
+from lazer.utils import build_violation_report, violation_from_report
+
+logger = logging.getLogger(__name__)
+
+
+async def _no_addresses():
+    return []
+
+
+def vehicle_fields(plate_data):
+    """Report fields for the highest scoring vehicle in a Plate Recognizer result."""
+    vehicles = sorted(
+        [v for v in plate_data.get("results", []) if v.get("vehicle") is not None],
+        key=lambda v: v["vehicle"].get("score", 0),
+        reverse=True,
+    )
+    if not vehicles:
+        return {}
+    vehicle = vehicles[0]
+    fields = {"body_style": vehicle["vehicle"].get("type", "")}
+    if vehicle.get("model_make"):
+        fields["make"] = vehicle["model_make"][0].get("make", "")
+        fields["model"] = vehicle["model_make"][0].get("model", "")
+    if vehicle.get("color"):
+        fields["vehicle_color"] = vehicle["color"][0].get("color", "")
+    return {name: value for name, value in fields.items() if value}
+
+
+def address_fields(address):
+    """Report fields for a geocoded address, if it parses."""
+    parsed = pyap.parse(address, country="US")
+    if len(parsed) != 1 or None in (parsed[0].street_name, parsed[0].street_type):
+        return {}
+    return {
+        "block_number": parsed[0].street_number,
+        "street_name": f"{parsed[0].street_name} {parsed[0].street_type}".upper(),
+        "zip_code": parsed[0].postal_code,
+    }
+
+
+def _ingest_upload(upload):
+    extension = os.path.splitext(upload.name or "")[1].lstrip(".") or "jpg"
+    return ingest_image_bytes(upload.read(), extension)
+
+
+def _stored_upload(submission):
+    # The plate read was cached on the upload ingest_image_bytes prepared. That is the stored
+    # image itself, unless the original was kept, in which case it is recompressed again.
+    with submission.image.open("rb") as f:
+        stored = f.read()
+    if settings.LAZER_KEEP_ORIGINAL_IMAGE:
+        extension = os.path.splitext(submission.image.name)[1].lstrip(".") or "jpg"
+        return ingest_image_bytes(stored, extension).upload
+    return base64.b64encode(stored).decode()
+
+
+async def _plate_data(submission, upload):
+    # No need to read the plate of a violation that has already been photographed
+    if submission.duplicate_of_id is not None:
+        return {}
+    if upload is None:
+        upload = await sync_to_async(_stored_upload, thread_sensitive=False)(submission)
+    return await read_plate(upload, datetime.datetime.now(datetime.timezone.utc))
+
+
+async def _reverse_geocode(location):
+    try:
+        return await reverse_geocode_point(f"{location.y}, {location.x}", exactly_one=False)
+    except Exception:
+        # Already sent to Sentry, the item comes back incomplete and a retry can finish it
+        return []
+
+
+async def _complete(key, submission, report_form, upload=None):
+    """Fill in and store the report of a stored submission, returning the item's result."""
+    location = submission.location
+    block = await aresolve_street_block(location.x, location.y)
+    geocode = _reverse_geocode(location) if block is None else _no_addresses()
+    data, addresses = await asyncio.gather(_plate_data(submission, upload), geocode)
+
+    if block is not None:
+        addresses = [block.address]
+        block_fields = {
+            "block_number": block.block_number,
+            "street_name": block.street_name,
+            "zip_code": block.zip_code,
+        }
+    else:
+        addresses = [address.address for address in addresses or []]
+        block_fields = address_fields(addresses[0]) if addresses else {}
+    result = {
+        "key": key,
+        "submissionId": submission.submission_id,
+        "duplicateOf": submission.duplicate_of and submission.duplicate_of.submission_id,
+        "addresses": addresses,
+    }
+    report = {
+        **vehicle_fields(data),
+        **block_fields,
+        **{name: value for name, value in report_form.cleaned_data.items() if value},
+    }
+    missing = [
+        name
+        for name in BatchReportForm.FILLABLE_FIELDS
+        if name != "model" and not report.get(name)
+    ]
+    if missing:
+        return {**result, "status": "incomplete", "missing": missing}
+
+    violation_report = build_violation_report(
+        submission, violation_from_report({**report_form.cleaned_data, **report})
+    )
+    await violation_report.asave()
+    return {**result, "status": "created"}
+
+
+async def _existing(key, report_form, user):
+    submission = await (
+        ViolationSubmission.objects.filter(created_by=user, client_key=key)
+        .select_related("duplicate_of")
+        .afirst()
+    )
+    if submission is None:
+        return None
+    if await ViolationReport.objects.filter(submission=submission).aexists():
+        return {"key": key, "status": "exists", "submissionId": submission.submission_id}
+    # Stored by an earlier attempt that didn't get as far as the report, finish it now
+    return await _complete(key, submission, report_form)
+
+
+async def _ingest_item(item, files, user, semaphore):
+    if not isinstance(item, dict):
+        return {"key": None, "status": "error", "errors": {"item": ["Must be an object"]}}
+    form = BatchItemForm(item)
+    report_form = BatchReportForm(item.get("report") or {})
+    if not form.is_valid() or not report_form.is_valid():
+        return {
+            "key": item.get("key"),
+            "status": "error",
+            "errors": {**form.errors, **report_form.errors},
+        }
+    key = form.cleaned_data["key"]
+
+    async with semaphore:
+        existing = await _existing(key, report_form, user)
+    if existing is not None:
+        return existing
+
+    upload = files.get(form.cleaned_data["image"])
+    if upload is None:
+        return {"key": key, "status": "error", "errors": {"image": ["No such file"]}}
+    if upload.size > settings.LAZER_MAX_IMAGE_BYTES:
+        return {"key": key, "status": "error", "errors": {"image": ["Image is too large"]}}
+
+    async with semaphore:
+        image = await sync_to_async(_ingest_upload, thread_sensitive=False)(upload)
+        latitude, longitude = form.cleaned_data["latitude"], form.cleaned_data["longitude"]
+        location = Point(float(longitude), float(latitude))
+        duplicate_of = await find_duplicate(location, form.cleaned_data["datetime"], image.hash)
+        submission = ViolationSubmission(
+            image=image.file,
+            image_hash=image.hash,
+            duplicate_of=duplicate_of,
+            location=location,
+            captured_at=form.cleaned_data["datetime"],
+            created_by=user,
+            client_key=key,
+        )
+        try:
+            await submission.asave()
+        except IntegrityError:
+            # A retry of this item raced us
+            return await _existing(key, report_form, user)
+        return await _complete(key, submission, report_form, upload=image.upload)
+
+
+async def ingest_item(item, files, user, semaphore):
+    """
+    Store one submission and report pair from a batch upload, returning its result.
+
+    Items are idempotent on their `key`: one that was already stored for this user is not
+    stored again, though its report is, if an earlier attempt stopped short of it. Report
+    vehicle and address fields left blank are filled in from the plate read and reverse
+    geocoding. Errors are returned in the item's result rather than failing the batch.
+    """
+    try:
+        return await _ingest_item(item, files, user, semaphore)
+    except Exception as err:
+        logger.exception("Failed to ingest batch item")
+        sentry_sdk.capture_exception(err)
+        return {
+            "key": item.get("key") if isinstance(item, dict) else None,
+            "status": "error",
+            "errors": {"item": ["Could not be stored, try again"]},
+        }
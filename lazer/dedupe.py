@@ -0,0 +1,68 @@
+import datetime
+import math
+
+from django.conf import settings
+from django.contrib.gis.measure import D
+
+from lazer.images import hash_distance
+from lazer.models import ViolationReport, ViolationSubmission
+
+METERS_PER_DEGREE = 111_320
+
+
+def _radius_degrees(location, meters):
+    # location is in SRID 4326, so dwithin takes degrees. Use the longitude scale at this
+    # latitude, which is the wider of the two, so nothing within `meters` is missed. That
+    # over-reaches north to south, so the exact distance is checked too.
+    return meters / (METERS_PER_DEGREE * math.cos(math.radians(location.y)))
+
+
+async def find_duplicate(location, captured_at, image_hash):
+    """
+    Return the earliest submission that is likely of the same violation, or None.
+
+    That is one captured within LAZER_DUPLICATE_WINDOW seconds and LAZER_DUPLICATE_DISTANCE
+    meters of this one, whose image hash is within LAZER_DUPLICATE_HASH_DISTANCE bits.
+    """
+    if image_hash is None:
+        return None
+    window = datetime.timedelta(seconds=settings.LAZER_DUPLICATE_WINDOW)
+    candidates = (
+        ViolationSubmission.objects.filter(
+            duplicate_of__isnull=True,
+            image_hash__isnull=False,
+            captured_at__range=(captured_at - window, captured_at + window),
+            # dwithin narrows candidates down with the index, distance_lte is exact
+            location__dwithin=(
+                location,
+                _radius_degrees(location, settings.LAZER_DUPLICATE_DISTANCE),
+            ),
+            location__distance_lte=(location, D(m=settings.LAZER_DUPLICATE_DISTANCE)),
+        )
+        .order_by("captured_at")
+        .only("id", "submission_id", "image_hash")
+    )
+    async for candidate in candidates:
+        if (
+            hash_distance(candidate.image_hash, image_hash)
+            <= settings.LAZER_DUPLICATE_HASH_DISTANCE
+        ):
+            return candidate
+    return None
+
+
+def is_duplicate_report(violation_report):
+    """
+    Whether a new report is of a violation that has already been reported.
+
+    Its submission must be a likely duplicate, and the original must have a report of its
+    own, otherwise this report is the only one and goes ahead as usual.
+    """
+    original_id = violation_report.submission.duplicate_of_id
+    if original_id is None:
+        return False
+    return (
+        ViolationReport.objects.filter(submission_id=original_id)
+        .exclude(submission_state=ViolationReport.SubmissionState.DUPLICATE)
+        .exists()
+    )
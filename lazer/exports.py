@@ -0,0 +1,176 @@
+import csv
+import datetime
+import io
+import json
+
+from django.conf import settings
+from django.utils import timezone
+
+from lazer.models import ViolationReport
+from lazer.pin_store import parse_date
+
+EXPORT_FIELDS = [
+    "id",
+    "submission__captured_at",
+    "date_observed",
+    "time_observed",
+    "violation_observed",
+    "make",
+    "model",
+    "body_style",
+    "vehicle_color",
+    "block_number",
+    "street_name",
+    "zip_code",
+    "submitted",
+    "submission__location",
+]
+EXPORT_COLUMNS = [
+    "id",
+    "captured_at",
+    "date_observed",
+    "time_observed",
+    "violation_observed",
+    "make",
+    "model",
+    "body_style",
+    "vehicle_color",
+    "block_number",
+    "street_name",
+    "zip_code",
+    "submitted",
+    "latitude",
+    "longitude",
+]
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "geojson": "application/geo+json",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _start_of_day(value):
+    return timezone.make_aware(datetime.datetime.combine(parse_date(value), datetime.time.min))
+
+
+def export_queryset(violation=None, date=None, date_gte=None, date_lte=None):
+    """
+    Submitted reports, filtered like map_data, as rows of EXPORT_FIELDS.
+
+    As in map_data, date_lte is exclusive and a violation filter leaves out the last 15
+    minutes of reports.
+    """
+    queryset = ViolationReport.objects.filter(submitted__isnull=False)
+    if violation:
+        queryset = queryset.filter(
+            violation_observed__startswith=violation,
+            submission__captured_at__lt=timezone.now() - datetime.timedelta(minutes=15),
+        )
+    if date:
+        start = _start_of_day(date)
+        queryset = queryset.filter(
+            submission__captured_at__gte=start,
+            submission__captured_at__lt=start + datetime.timedelta(days=1),
+        )
+    if date_gte:
+        queryset = queryset.filter(submission__captured_at__gte=_start_of_day(date_gte))
+    if date_lte:
+        queryset = queryset.filter(submission__captured_at__lt=_start_of_day(date_lte))
+    # Ordered by primary key so the server side cursor walks an index
+    return queryset.order_by("id").values_list(*EXPORT_FIELDS)
+
+
+def _record(row):
+    *values, location = row
+    record = dict(zip(EXPORT_COLUMNS, values))
+    for key in ["captured_at", "submitted"]:
+        record[key] = record[key].isoformat()
+    record["latitude"], record["longitude"] = location.y, location.x
+    return record
+
+
+class CSVFormat:
+    def __init__(self):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def _line(self, values):
+        self.writer.writerow(values)
+        line = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return line
+
+    def header(self):
+        return self._line(EXPORT_COLUMNS)
+
+    def row(self, row, first):
+        return self._line(_record(row).values())
+
+    def footer(self):
+        return ""
+
+
+class GeoJSONFormat:
+    def header(self):
+        return '{"type": "FeatureCollection", "features": [\n'
+
+    def row(self, row, first):
+        record = _record(row)
+        feature = {
+            "type": "Feature",
+            "geometry": {
+                "type": "Point",
+                "coordinates": [record.pop("longitude"), record.pop("latitude")],
+            },
+            "properties": record,
+        }
+        return ("" if first else ",\n") + json.dumps(feature)
+
+    def footer(self):
+        return "\n]}\n"
+
+
+class NDJSONFormat:
+    def header(self):
+        return ""
+
+    def row(self, row, first):
+        return json.dumps(_record(row)) + "\n"
+
+    def footer(self):
+        return ""
+
+
+FORMATS = {"csv": CSVFormat, "geojson": GeoJSONFormat, "ndjson": NDJSONFormat}
+
+
+def export_chunks(queryset, format):
+    """
+    Yield `queryset` in `format`, a chunk per row.
+
+    Rows are read through a server side cursor, LAZER_EXPORT_CHUNK_SIZE at a time, so
+    memory use doesn't grow with the size of the export.
+    """
+    formatter = FORMATS[format]()
+    yield formatter.header()
+    first = True
+    for row in queryset.iterator(chunk_size=settings.LAZER_EXPORT_CHUNK_SIZE):
+        yield formatter.row(row, first)
+        first = False
+    yield formatter.footer()
+
+
+async def aexport_chunks(queryset, format):
+    """
+    export_chunks for StreamingHttpResponse under ASGI, which would otherwise read a
+    synchronous iterator into a list before sending any of it.
+    """
+    formatter = FORMATS[format]()
+    yield formatter.header()
+    first = True
+    async for row in queryset.aiterator(chunk_size=settings.LAZER_EXPORT_CHUNK_SIZE):
+        yield formatter.row(row, first)
+        first = False
+    yield formatter.footer()
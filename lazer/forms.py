@@ -1,5 +1,7 @@
 from django import forms
 
+from lazer.images import split_data_url
+
 
 class SubmissionForm(forms.Form):
 
@@ -8,6 +10,11 @@ class SubmissionForm(forms.Form):
     datetime = forms.DateTimeField()
     image = forms.CharField()
 
+    def clean_image(self):
+        image = self.cleaned_data["image"]
+        split_data_url(image)
+        return image
+
 
 class ReportForm(forms.Form):
     submission_id = forms.UUIDField()
@@ -28,3 +35,33 @@ class ReportForm(forms.Form):
     zip_code = forms.CharField()
 
     additional_information = forms.CharField()
+
+
+class BatchItemForm(forms.Form):
+    key = forms.CharField(max_length=64)
+    image = forms.CharField()
+
+    latitude = forms.CharField()
+    longitude = forms.CharField()
+    datetime = forms.DateTimeField()
+
+
+class BatchReportForm(ReportForm):
+    """A report in a batch upload, vehicle and address fields can be left to be filled in."""
+
+    FILLABLE_FIELDS = [
+        "make",
+        "model",
+        "body_style",
+        "vehicle_color",
+        "block_number",
+        "street_name",
+        "zip_code",
+    ]
+
+    submission_id = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in self.FILLABLE_FIELDS:
+            self.fields[name].required = False
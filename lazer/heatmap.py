@@ -0,0 +1,90 @@
+from collections import Counter
+
+from django.contrib.gis.db.models.functions import SnapToGrid
+from django.contrib.gis.geos import Polygon
+from django.db.models import Count
+
+from campaigns.admin import randomize_lat_longs
+
+# Bins are roughly this many screen pixels wide at the requested zoom
+BIN_PIXELS = 4
+MIN_ZOOM, MAX_ZOOM = 10, 18
+DEFAULT_ZOOM = 12
+# Bins are never smaller than the smear randomize_lat_long gives public pins, so zooming
+# in on a heatmap doesn't show where a report was made more precisely than the pins do
+MIN_BIN_SIZE = 0.000358
+
+
+def parse_zoom(value):
+    try:
+        zoom = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_ZOOM
+    return min(max(zoom, MIN_ZOOM), MAX_ZOOM)
+
+
+def parse_bbox(value):
+    """Parse a "west,south,east,north" string into a Polygon, or None if it is invalid."""
+    if not value:
+        return None
+    try:
+        west, south, east, north = (float(v) for v in value.split(","))
+    except ValueError:
+        return None
+    if west >= east or south >= north:
+        return None
+    bbox = Polygon.from_bbox((west, south, east, north))
+    bbox.srid = 4326
+    return bbox
+
+
+def bin_size(zoom):
+    """
+    Width of a bin in degrees, BIN_PIXELS wide on a 256px web mercator tile at `zoom`.
+
+    No smaller than MIN_BIN_SIZE, which takes over from zoom 14 in.
+    """
+    return max(360 / (256 * 2**zoom) * BIN_PIXELS, MIN_BIN_SIZE)
+
+
+def binned_pins(queryset, zoom, bbox=None):
+    """
+    Aggregate ViolationReports into [lat, lng, weight] grid cells in the database.
+
+    Reports are snapped to a grid sized for `zoom` (see bin_size) and counted per cell, so
+    the result grows with the area shown rather than with the number of reports.
+    """
+    if bbox is not None:
+        queryset = queryset.filter(submission__location__intersects=bbox)
+    cells = (
+        queryset.order_by()
+        .annotate(cell=SnapToGrid("submission__location", bin_size(zoom)))
+        .values("cell")
+        .annotate(weight=Count("id"))
+        .values_list("cell", "weight")
+    )
+    return [[cell.y, cell.x, weight] for cell, weight in cells]
+
+
+def bin_points(points, zoom, bbox=None):
+    """Aggregate (lat, lng) points into [lat, lng, weight] cells, as binned_pins does in SQL."""
+    size = bin_size(zoom)
+    if bbox is not None:
+        west, south, east, north = bbox.extent
+        points = [
+            (lat, lng) for lat, lng in points if west <= lng <= east and south <= lat <= north
+        ]
+    cells = Counter((round(lat / size) * size, round(lng / size) * size) for lat, lng in points)
+    return [[lat, lng, weight] for (lat, lng), weight in cells.items()]
+
+
+def jittered_pins(queryset):
+    """One [lat, lng, 1] pin per ViolationReport, jittered with randomize_lat_longs."""
+    reports = [
+        (report_id, location.y, location.x)
+        for report_id, location in queryset.values_list("id", "submission__location")
+    ]
+    if not reports:
+        return []
+    lats, lngs = randomize_lat_longs(*zip(*reports))
+    return [[lat, lng, 1] for lat, lng in zip(lats.tolist(), lngs.tolist())]
@@ -0,0 +1,103 @@
+import base64
+import binascii
+import io
+import secrets
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+@dataclass
+class IngestedImage:
+    # Copy to store on the ViolationSubmission
+    file: ContentFile
+    # Base64 encoded copy to send to Plate Recognizer
+    upload: str
+    # Perceptual hash for duplicate detection, see image_hash
+    hash: int | None = None
+
+
+def split_data_url(data_url):
+    """Return the (extension, base64 payload) of a "data:image/...;base64,..." string."""
+    try:
+        _format, payload = data_url.split(";base64,", 1)
+    except ValueError:
+        raise ValidationError("Image must be a base64 data URL")
+    if len(payload) * 3 // 4 > settings.LAZER_MAX_IMAGE_BYTES:
+        raise ValidationError("Image is too large")
+    return _format.split("/")[-1], payload
+
+
+def recompress(image_bytes):
+    """
+    Re-encode an image as a JPEG no larger than LAZER_IMAGE_MAX_DIMENSION on either side.
+
+    EXIF orientation is applied to the pixels and the metadata, including location, is
+    dropped.
+    """
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((settings.LAZER_IMAGE_MAX_DIMENSION, settings.LAZER_IMAGE_MAX_DIMENSION))
+        output = io.BytesIO()
+        image.convert("RGB").save(
+            output, format="JPEG", quality=settings.LAZER_IMAGE_QUALITY, optimize=True
+        )
+    return output.getvalue()
+
+
+def image_hash(image_bytes):
+    """
+    Return a 64 bit difference hash of an image, as a signed integer for a BigIntegerField.
+
+    Similar looking images, e.g. the same photo at another size or quality, get hashes that
+    differ in only a few bits, see hash_distance.
+    """
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        image.draft("L", (64, 64))
+        pixels = image.convert("L").resize((9, 8), Image.Resampling.LANCZOS).tobytes()
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = bits << 1 | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return bits - (1 << 64) if bits >= 1 << 63 else bits
+
+
+def hash_distance(a, b):
+    """The number of bits that differ between two image_hash values."""
+    return ((a ^ b) & ((1 << 64) - 1)).bit_count()
+
+
+def ingest_image(data_url):
+    """Decode a submitted image data URL once and prepare it as in ingest_image_bytes."""
+    extension, payload = split_data_url(data_url)
+    try:
+        original = base64.b64decode(payload, validate=True)
+    except binascii.Error:
+        raise ValidationError("Image is not valid base64")
+    return ingest_image_bytes(original, extension)
+
+
+def ingest_image_bytes(original, extension):
+    """
+    Prepare a submitted image for storage and plate reading.
+
+    Both get the recompressed copy, unless LAZER_KEEP_ORIGINAL_IMAGE is set, in which case
+    the original bytes are stored. Images Pillow cannot read are passed through untouched.
+    """
+    filename = secrets.token_hex(20)
+    try:
+        compressed = recompress(original)
+    except (UnidentifiedImageError, OSError):
+        return IngestedImage(
+            ContentFile(original, name=f"{filename}.{extension}"),
+            base64.b64encode(original).decode(),
+        )
+
+    upload = base64.b64encode(compressed).decode()
+    hash = image_hash(compressed)
+    if settings.LAZER_KEEP_ORIGINAL_IMAGE:
+        return IngestedImage(ContentFile(original, name=f"{filename}.{extension}"), upload, hash)
+    return IngestedImage(ContentFile(compressed, name=f"{filename}.jpg"), upload, hash)
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import os
+import threading
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from playwright.async_api import Browser, async_playwright
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PooledBrowser:
+    browser: Browser
+    uses: int = 0
+
+
+class BrowserPool:
+    """
+    Keeps up to `size` Chromium browsers running and hands out a fresh context per use.
+
+    Browsers are checked to still be connected before being handed out, and are closed once
+    they have served `max_uses` contexts. At most `size` contexts are open at once; further
+    callers wait. `launch_browser` is a coroutine function returning a new browser, headless
+    Chromium by default.
+    """
+
+    def __init__(self, size, max_uses, launch_browser=None):
+        self.size = size
+        self.max_uses = max_uses
+        self._launch_browser = launch_browser or self._launch_chromium
+        self._playwright = None
+        self._idle = []
+        self._semaphore = asyncio.Semaphore(size)
+
+    async def _launch_chromium(self):
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        return await self._playwright.chromium.launch(headless=True)
+
+    async def _launch(self):
+        return PooledBrowser(await self._launch_browser())
+
+    async def _close_browser(self, pooled):
+        try:
+            await pooled.browser.close()
+        except Exception:
+            logger.warning("Failed to close pooled browser", exc_info=True)
+
+    async def _acquire(self):
+        while self._idle:
+            pooled = self._idle.pop()
+            if pooled.browser.is_connected():
+                return pooled
+            await self._close_browser(pooled)
+        return await self._launch()
+
+    async def _release(self, pooled):
+        if pooled.browser.is_connected() and pooled.uses < self.max_uses:
+            self._idle.append(pooled)
+        else:
+            await self._close_browser(pooled)
+
+    @asynccontextmanager
+    async def context(self, **kwargs):
+        async with self._semaphore:
+            pooled = await self._acquire()
+            pooled.uses += 1
+            try:
+                context = await pooled.browser.new_context(**kwargs)
+                try:
+                    yield context
+                finally:
+                    await context.close()
+            finally:
+                await self._release(pooled)
+
+    async def close(self):
+        while self._idle:
+            await self._close_browser(self._idle.pop())
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+# Playwright objects belong to the event loop that created them, so the pool lives on a
+# long running loop in a background thread of each (worker) process.
+_lock = threading.Lock()
+_loop = None
+_loop_pid = None
+_pool = None
+
+
+def _get_loop():
+    global _loop, _loop_pid, _pool
+    with _lock:
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _loop_pid = os.getpid()
+            _pool = None
+            threading.Thread(target=_loop.run_forever, name="browser-pool", daemon=True).start()
+        return _loop
+
+
+def get_browser_pool():
+    """Return this process's BrowserPool, only call this on the browser pool loop."""
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool(settings.LAZER_BROWSER_POOL_SIZE, settings.LAZER_BROWSER_MAX_USES)
+    return _pool
+
+
+async def _run(coro):
+    try:
+        return await coro
+    finally:
+        await sync_to_async(close_old_connections)()
+
+
+def run_in_browser_loop(coro):
+    """Run `coro` on the browser pool's event loop from synchronous code and wait for it."""
+    return asyncio.run_coroutine_threadsafe(_run(coro), _get_loop()).result()
+
+
+@asynccontextmanager
+async def browser_context(tracing=False, **kwargs):
+    """
+    Yield a new browser context, from the pool when running on the browser pool loop.
+
+    Tracing needs a headed browser, so those runs, and callers on any other event loop, get
+    a browser of their own.
+    """
+    if not tracing and asyncio.get_running_loop() is _loop:
+        async with get_browser_pool().context(**kwargs) as context:
+            yield context
+        return
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=not tracing)
+        context = await browser.new_context(**kwargs)
+        try:
+            yield context
+        finally:
+            await context.close()
+            await browser.close()
@@ -1,19 +1,139 @@
+import asyncio
+import hashlib
+import logging
+import time
+import weakref
+
 import httpx
+import sentry_sdk
 from django.conf import settings
+from django.core.cache import cache
 
+logger = logging.getLogger(__name__)
+
+REGIONS = ["us-pa", "us-nj", "us-ny"]
+CONFIG = {"detection_mode": "vehicle"}
+CACHE_KEY_PREFIX = "platerecognizer"
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing service for `reset_timeout` seconds after `failure_threshold`
+    consecutive failures, then lets a single trial call through.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+
+    def allow(self):
+        if self.opened_at is None:
+            return True
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            # Half open, the next result decides whether to close again
+            self.opened_at = time.monotonic()
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+breaker = CircuitBreaker(
+    settings.PLATERECOGNIZER_CIRCUIT_FAILURES, settings.PLATERECOGNIZER_CIRCUIT_RESET
+)
+
+# httpx clients are bound to the event loop they were first used on, so keep one per loop
+_clients = weakref.WeakKeyDictionary()
+_inflight = weakref.WeakKeyDictionary()
 
-async def read_plate(image, utc_time):
-    url = "https://api.platerecognizer.com/v1/plate-reader/"
-    headers = {"Authorization": f"Token {settings.PLATERECOGNIZER_API_KEY}"}
 
+def get_client():
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                settings.PLATERECOGNIZER_TIMEOUT, connect=settings.PLATERECOGNIZER_CONNECT_TIMEOUT
+            ),
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+            transport=httpx.AsyncHTTPTransport(retries=1),
+        )
+        _clients[loop] = client
+    return client
+
+
+def _cache_key(image):
+    return f"{CACHE_KEY_PREFIX}:{hashlib.sha256(image.encode()).hexdigest()}"
+
+
+async def _read_plate(image, utc_time):
+    headers = {"Authorization": f"Token {settings.PLATERECOGNIZER_API_KEY}"}
     data = {
         "upload": image,
-        "regions": ["us-pa", "us-nj", "us-ny"],
+        "regions": REGIONS,
         "timestamp": utc_time.isoformat(),
         "mmc": True,
-        "config": {"detection_mode": "vehicle"},
+        "config": CONFIG,
     }
+    response = await get_client().post(settings.PLATERECOGNIZER_URL, headers=headers, json=data)
+    response.raise_for_status()
+    return response.json()
+
+
+async def read_plate(image, utc_time):
+    """
+    Run the base64 encoded `image` through Plate Recognizer.
+
+    Results are cached by image content, and concurrent calls for the same image share one
+    request. If the API fails, or the circuit breaker is open after repeated failures, an
+    empty result is returned so callers can carry on without plate data.
+    """
+    key = _cache_key(image)
+    result = await cache.aget(key)
+    if result is not None:
+        return result
+
+    inflight = _inflight.setdefault(asyncio.get_running_loop(), {})
+    if key in inflight:
+        try:
+            return await asyncio.shield(inflight[key])
+        except (httpx.HTTPError, ValueError):
+            return {}
+
+    if not breaker.allow():
+        logger.warning("Plate Recognizer circuit open, skipping plate read")
+        return {}
+
+    task = asyncio.ensure_future(_read_plate(image, utc_time))
+    inflight[key] = task
+    try:
+        result = await task
+    except httpx.HTTPStatusError as err:
+        # Client errors are about this request, e.g. an unreadable image, and shouldn't
+        # stop plate reads for everyone else. Rate limiting is the service's problem.
+        status = err.response.status_code
+        if status >= 500 or status == 429:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        sentry_sdk.capture_exception(err)
+        return {}
+    except (httpx.HTTPError, ValueError) as err:
+        breaker.record_failure()
+        sentry_sdk.capture_exception(err)
+        return {}
+    finally:
+        inflight.pop(key, None)
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, headers=headers, json=data)
-        return response.json()
+    breaker.record_success()
+    await cache.aset(key, result, timeout=settings.PLATERECOGNIZER_CACHE_TIMEOUT)
+    return result
@@ -0,0 +1,64 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+# Screenshot name to ViolationReport field, in the order they are taken
+SCREENSHOT_FIELDS = {
+    "before-submit": "screenshot_before_submit",
+    "after-submit": "screenshot_after_submit",
+    "success": "screenshot_success",
+    "error": "screenshot_error",
+    "final": "screenshot_final",
+}
+
+SCREENSHOT_POLICIES = {
+    "all": set(SCREENSHOT_FIELDS),
+    "errors": {"error", "final"},
+    "none": set(),
+}
+
+
+class ScreenshotBatch:
+    """
+    Screenshots taken during a form submission, held in memory until the browser is done.
+
+    Which screenshots are kept is set by settings.LAZER_SCREENSHOT_POLICY, and they are
+    encoded as settings.LAZER_SCREENSHOT_FORMAT ("png", or the much smaller "jpeg").
+    """
+
+    def __init__(self, policy=None):
+        self.names = SCREENSHOT_POLICIES[policy or settings.LAZER_SCREENSHOT_POLICY]
+        self.format = settings.LAZER_SCREENSHOT_FORMAT
+        self.screenshots = {}
+
+    async def capture(self, page, name):
+        if name not in self.names:
+            return
+        options = {"full_page": True, "type": self.format}
+        if self.format == "jpeg":
+            options["quality"] = settings.LAZER_SCREENSHOT_QUALITY
+        self.screenshots[name] = await page.screenshot(**options)
+
+    async def persist(self, violation_report):
+        """
+        Upload the captured screenshots concurrently onto `violation_report`'s fields.
+
+        The report itself is not saved, callers save it once afterwards.
+        """
+        extension = "jpg" if self.format == "jpeg" else "png"
+        # upload_to needs the submission, load it here rather than in every upload thread
+        await sync_to_async(getattr)(violation_report, "submission")
+
+        def upload(name, content):
+            getattr(violation_report, SCREENSHOT_FIELDS[name]).save(
+                f"screenshot-{name}.{extension}", ContentFile(content), save=False
+            )
+
+        await asyncio.gather(
+            *(
+                sync_to_async(upload, thread_sensitive=False)(name, content)
+                for name, content in self.screenshots.items()
+            )
+        )
@@ -1,3 +1,4 @@
+import json
 import logging
 import os
 import urllib
@@ -6,17 +7,21 @@ from datetime import datetime
 from enum import StrEnum
 from typing import Any, Optional
 
+import httpx
 import pyap
 import pytz
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.core.files.base import ContentFile
 from django.db.models.fields.files import ImageFieldFile
 from django.utils import timezone
 from playwright.async_api import FilePayload
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
-from playwright.async_api import async_playwright, expect
+from playwright.async_api import expect
 from playwright_stealth import stealth_async
 
+from lazer.integrations.browser_pool import browser_context
+from lazer.integrations.screenshots import ScreenshotBatch
 from lazer.models import ViolationReport, ViolationSubmission
 
 PPA_SMARTSHEET_URL = os.getenv(
@@ -278,19 +283,113 @@ class MobilityAccessViolation:
         )
 
 
+def smartsheet_fields(violation: MobilityAccessViolation) -> dict[str, str]:
+    """Smartsheet form fields, by label, for a violation. Date Observed is typed separately."""
+    return {
+        # "Date Observed": violation.date_observed,
+        "Time Observed": violation.time_observed,
+        "Make": violation.make,
+        "Model": violation.model,
+        "Body Style": violation.body_style,
+        "Vehicle Color": violation.vehicle_color,
+        "Violation Observed": violation.violation_observed,
+        "Block Number": violation.block_number,
+        "Street Name": violation.street_name,
+        "Zip Code": violation.zip_code,
+        "How frequently does this occur?": violation.occurrence_frequency,
+        "Additional Information": violation.additional_information,
+        # not sure how to do "send me a copy of my responses"
+    }
+
+
+class DirectSubmissionRejected(Exception):
+    """The Smartsheet submit endpoint did not accept a direct submission."""
+
+
+# Every field posted by submit_form_direct, smartsheet_fields plus Date Observed
+DIRECT_SUBMISSION_LABELS = [
+    "Date Observed",
+    "Time Observed",
+    "Make",
+    "Model",
+    "Body Style",
+    "Vehicle Color",
+    "Violation Observed",
+    "Block Number",
+    "Street Name",
+    "Zip Code",
+    "How frequently does this occur?",
+    "Additional Information",
+]
+
+
+def direct_submission_configured() -> bool:
+    """Whether direct submissions can be made, see submit_form_direct."""
+    field_ids = settings.PPA_SMARTSHEET_FIELD_IDS
+    return bool(settings.PPA_SMARTSHEET_SUBMIT_CONFIRMATION) and all(
+        field_ids.get(label) for label in DIRECT_SUBMISSION_LABELS
+    )
+
+
+async def submit_form_direct(
+    violation: MobilityAccessViolation,
+    photo: ImageFieldFile | ContentFile,
+    url: str | None = None,
+) -> None:
+    """Submit a violation by posting the form's multipart payload straight to Smartsheet.
+
+    Field labels are mapped to the form's field ids with settings.PPA_SMARTSHEET_FIELD_IDS,
+    which must cover every field, and the response must contain
+    settings.PPA_SMARTSHEET_SUBMIT_CONFIRMATION. Both come from a submission recorded in a
+    browser; Smartsheet answers some malformed posts with a 200 too.
+
+    Raises:
+        DirectSubmissionRejected: if direct submissions aren't configured, or the request
+            fails or is not confirmed.
+    """
+    if not direct_submission_configured():
+        raise DirectSubmissionRejected(
+            "PPA_SMARTSHEET_FIELD_IDS or PPA_SMARTSHEET_SUBMIT_CONFIRMATION is not configured"
+        )
+    fields = {"Date Observed": violation.date_observed, **smartsheet_fields(violation)}
+    field_ids = settings.PPA_SMARTSHEET_FIELD_IDS
+    data = {field_ids[label]: str(value) for label, value in fields.items()}
+
+    photo_bytes = await sync_to_async(photo.read)()
+    files = {
+        "attachments": (
+            os.path.basename(getattr(photo, "name", None) or "violation_photo.jpg"),
+            photo_bytes,
+            "image/jpeg",
+        )
+    }
+    try:
+        async with httpx.AsyncClient(timeout=30) as client:
+            response = await client.post(
+                url or SUBMIT_SMARTSHEET_URL, data={"data": json.dumps(data)}, files=files
+            )
+    except httpx.HTTPError as err:
+        raise DirectSubmissionRejected(str(err)) from err
+    if not response.is_success or settings.PPA_SMARTSHEET_SUBMIT_CONFIRMATION not in response.text:
+        raise DirectSubmissionRejected(f"{response.status_code}: {response.text[:200]}")
+
+
 async def submit_form_with_playwright(
     submission: ViolationSubmission,
     violation: MobilityAccessViolation,
     photo: str | ImageFieldFile | ContentFile,
     send_copy_to_email: str | None = None,
     tracing: bool = False,
-    screenshot_dir: str | None = None,
+    screenshots: bool = False,
     violation_report: ViolationReport | None = None,
 ) -> ViolationReport:
     """Method to submit a violation to the PPA's Smartsheet using Playwright.
 
+    The returned report is not saved.
+
     Args:
         violation (MobilityAccessViolation): The description of the violation to submit.
+        screenshots (bool): Attach screenshots, as allowed by settings.LAZER_SCREENSHOT_POLICY.
     """
     # smartsheet allows pre-filling of fields using query parameters.
     # for example, date observed would be Date%20Observed=06/03/2025
@@ -317,9 +416,10 @@ async def submit_form_with_playwright(
             raise FileNotFoundError(f"Photo file not found: {photo}")
         with open(photo, "rb") as f:
             photo = ContentFile(f.read(), name=os.path.basename(photo))
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=not tracing)
-        context = await browser.new_context(viewport={"width": 1024, "height": 3000})
+    batch = ScreenshotBatch(None if screenshots else "none")
+    async with browser_context(
+        tracing=tracing, viewport={"width": 1024, "height": 3000}
+    ) as context:
 
         if tracing:
             tracing_debug_key = os.urandom(3).hex()
@@ -329,21 +429,7 @@ async def submit_form_with_playwright(
         await stealth_async(page)
 
         # Construct the URL with query parameters
-        params = {
-            # "Date Observed": violation.date_observed,
-            "Time Observed": violation.time_observed,
-            "Make": violation.make,
-            "Model": violation.model,
-            "Body Style": violation.body_style,
-            "Vehicle Color": violation.vehicle_color,
-            "Violation Observed": violation.violation_observed,
-            "Block Number": violation.block_number,
-            "Street Name": violation.street_name,
-            "Zip Code": violation.zip_code,
-            "How frequently does this occur?": violation.occurrence_frequency,
-            "Additional Information": violation.additional_information,
-            # not sure how to do "send me a copy of my responses"
-        }
+        params = smartsheet_fields(violation)
         url_parts = urllib.parse.urlparse(PPA_SMARTSHEET_URL)
         query = dict(urllib.parse.parse_qsl(url_parts.query))
         query.update(params)  # type: ignore
@@ -382,15 +468,7 @@ async def submit_form_with_playwright(
 
         # submit the form
         try:
-            if screenshot_dir:
-                await page.screenshot(
-                    path=f"{screenshot_dir}/screenshot-before-submit.png", full_page=True
-                )
-                with open(f"{screenshot_dir}/screenshot-before-submit.png", "rb") as f:
-                    violation_report.screenshot_before_submit.save(
-                        "screenshot-before-submit.png", f, save=False
-                    )
-                    await violation_report.asave()
+            await batch.capture(page, "before-submit")
 
             if not settings.DEBUG:
                 async with page.expect_request(
@@ -399,15 +477,7 @@ async def submit_form_with_playwright(
                 ) as _:
                     await page.get_by_role("button", name="Submit").click()
 
-            if screenshot_dir:
-                await page.screenshot(
-                    path=f"{screenshot_dir}/screenshot-after-submit.png", full_page=True
-                )
-                with open(f"{screenshot_dir}/screenshot-after-submit.png", "rb") as f:
-                    violation_report.screenshot_after_submit.save(
-                        "screenshot-after-submit.png", f, save=False
-                    )
-                    await violation_report.asave()
+            await batch.capture(page, "after-submit")
 
             # make sure there is a POST to the form URL and it returned 200
             # also, the submission page should have an h1 element with specific
@@ -418,39 +488,18 @@ async def submit_form_with_playwright(
                     page.locator('div[data-client-id="submission-confirmation-container"]')
                 ).to_be_visible(timeout=10000)
 
-            if screenshot_dir:
-                await page.screenshot(
-                    path=f"{screenshot_dir}/screenshot-success.png", full_page=True
-                )
-                with open(f"{screenshot_dir}/screenshot-success.png", "rb") as f:
-                    violation_report.screenshot_success.save(
-                        "screenshot-success.png", f, save=False
-                    )
-                    await violation_report.asave()
+            await batch.capture(page, "success")
             violation_report.submitted = timezone.now()
 
         except PlaywrightTimeoutError:
             logging.error("Playwright timed out.", exc_info=True)
-            if screenshot_dir:
-                await page.screenshot(
-                    path=f"{screenshot_dir}/screenshot-error.png", full_page=True
-                )
-                with open(f"{screenshot_dir}/screenshot-error.png", "rb") as f:
-                    violation_report.screenshot_error.save("screenshot-error.png", f, save=False)
-                    await violation_report.asave()
-            if tracing:
-                await context.tracing.stop(path=f"tracing_{tracing_debug_key}.zip")
-            await context.close()
-            await browser.close()
-            return violation_report
+            await batch.capture(page, "error")
+        else:
+            await batch.capture(page, "final")
 
         if tracing:
             await context.tracing.stop(path=f"tracing_{tracing_debug_key}.zip")
-        if screenshot_dir:
-            await page.screenshot(path=f"{screenshot_dir}/screenshot-final.png", full_page=True)
-            with open(f"{screenshot_dir}/screenshot-final.png", "rb") as f:
-                violation_report.screenshot_final.save("screenshot-final.png", f, save=False)
-                await violation_report.asave()
-        await context.close()
-        await browser.close()
-        return violation_report
+
+    # Upload once the browser is free for the next report
+    await batch.persist(violation_report)
+    return violation_report
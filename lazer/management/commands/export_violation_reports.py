@@ -0,0 +1,32 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from lazer.exports import FORMATS, export_chunks, export_queryset
+
+
+class Command(BaseCommand):
+    help = "Stream submitted violation reports as CSV, GeoJSON or NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+        parser.add_argument("--violation", help="Only violations starting with this")
+        parser.add_argument("--date", help="Only reports captured on this YYYY-MM-DD")
+        parser.add_argument("--date-gte", help="Only reports captured on or after YYYY-MM-DD")
+        parser.add_argument("--date-lte", help="Only reports captured before YYYY-MM-DD")
+        parser.add_argument("--output", help="File to write to, defaults to stdout")
+
+    def handle(self, *args, **options):
+        queryset = export_queryset(
+            violation=options["violation"],
+            date=options["date"],
+            date_gte=options["date_gte"],
+            date_lte=options["date_lte"],
+        )
+        output = open(options["output"], "w", newline="") if options["output"] else sys.stdout
+        try:
+            for chunk in export_chunks(queryset, options["format"]):
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout:
+                output.close()
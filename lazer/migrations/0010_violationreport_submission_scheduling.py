@@ -0,0 +1,54 @@
+# Generated by Django 5.1.8 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lazer", "0009_alter_violationreport_violation_observed_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="violationreport",
+            name="submission_state",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("queued", "Queued"),
+                    ("submitted", "Submitted"),
+                    ("dead_letter", "Dead letter"),
+                ],
+                max_length=16,
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="violationreport",
+            name="submission_priority",
+            field=models.SmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="violationreport",
+            name="submission_attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="violationreport",
+            name="next_attempt_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="violationreport",
+            name="last_submission_error",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="violationreport",
+            index=models.Index(
+                fields=["submission_state", "next_attempt_at"],
+                name="lazer_viola_submiss_897ea7_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.1.8 on 2026-10-18 11:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_reporter_stats(apps, schema_editor):
+    ReporterStats = apps.get_model("lazer", "ReporterStats")
+    ViolationReport = apps.get_model("lazer", "ViolationReport")
+
+    submitted = (
+        ViolationReport.objects.filter(
+            submitted__isnull=False, submission__created_by__isnull=False
+        )
+        .values("submission__created_by")
+        .annotate(count=models.Count("id"), last=models.Max("submitted"))
+    )
+    ReporterStats.objects.bulk_create(
+        ReporterStats(
+            user_id=row["submission__created_by"],
+            submitted_count=row["count"],
+            last_submitted_at=row["last"],
+        )
+        for row in submitted
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lazer", "0010_violationreport_submission_scheduling"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReporterStats",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="reporter_stats",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("submitted_count", models.PositiveIntegerField(default=0)),
+                ("rejected_count", models.PositiveIntegerField(default=0)),
+                ("last_submitted_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name_plural": "reporter stats",
+            },
+        ),
+        migrations.RunPython(populate_reporter_stats, migrations.RunPython.noop),
+    ]
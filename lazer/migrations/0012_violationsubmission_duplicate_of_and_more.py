@@ -0,0 +1,45 @@
+# Generated by Django 5.1.8 on 2026-10-18 12:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lazer", "0011_reporterstats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="violationsubmission",
+            name="duplicate_of",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="duplicates",
+                to="lazer.violationsubmission",
+            ),
+        ),
+        migrations.AddField(
+            model_name="violationsubmission",
+            name="image_hash",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="violationreport",
+            name="submission_state",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("queued", "Queued"),
+                    ("submitted", "Submitted"),
+                    ("dead_letter", "Dead letter"),
+                    ("duplicate", "Duplicate"),
+                ],
+                max_length=16,
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.8 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lazer", "0012_violationsubmission_duplicate_of_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="violationsubmission",
+            name="client_key",
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name="violationsubmission",
+            constraint=models.UniqueConstraint(
+                fields=("created_by", "client_key"), name="unique_submission_client_key"
+            ),
+        ),
+    ]
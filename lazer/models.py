@@ -15,6 +15,21 @@ class ViolationSubmission(models.Model):
     captured_at = models.DateTimeField(db_index=True)
     location = models.PointField(srid=4326)
     image = models.ImageField(upload_to="lazer/violations")
+    image_hash = models.BigIntegerField(null=True, blank=True)
+    # An earlier submission that is likely of the same violation, see lazer.dedupe
+    duplicate_of = models.ForeignKey(
+        "self", null=True, blank=True, on_delete=models.SET_NULL, related_name="duplicates"
+    )
+
+    # Set by the app on batch uploads, so a retried upload is not stored twice
+    client_key = models.CharField(max_length=64, null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["created_by", "client_key"], name="unique_submission_client_key"
+            )
+        ]
 
     def image_tag_no_href(self):
         return mark_safe('<img src="%s" style="max-height: 50px;"/>' % (self.image.url,))
@@ -31,6 +46,12 @@ def report_image_upload_to(instance, filename):
 
 
 class ViolationReport(models.Model):
+    class SubmissionState(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        SUBMITTED = "submitted", "Submitted"
+        DEAD_LETTER = "dead_letter", "Dead letter"
+        DUPLICATE = "duplicate", "Duplicate"
+
     submission = models.ForeignKey(ViolationSubmission, on_delete=models.CASCADE)
 
     date_observed = models.CharField()
@@ -62,6 +83,18 @@ class ViolationReport(models.Model):
 
     submitted = models.DateTimeField(null=True, blank=True)
 
+    # PPA submission scheduling, see lazer.scheduler
+    submission_state = models.CharField(
+        max_length=16, choices=SubmissionState.choices, null=True, blank=True
+    )
+    submission_priority = models.SmallIntegerField(default=0)
+    submission_attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    last_submission_error = models.TextField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["submission_state", "next_attempt_at"])]
+
     def is_submitted(self):
         return self.submitted is not None
 
@@ -117,3 +150,22 @@ class ViolationReport(models.Model):
             '<a href="%s"><img src="%s" style="max-height: 50px;"/></a>'
             % (self.screenshot_final.url, self.screenshot_final.url)
         )
+
+
+class ReporterStats(models.Model):
+    """
+    Running totals of a user's violation reports, kept up to date by lazer.reporter_stats.
+    """
+
+    user = models.OneToOneField(
+        User, primary_key=True, on_delete=models.CASCADE, related_name="reporter_stats"
+    )
+    submitted_count = models.PositiveIntegerField(default=0)
+    rejected_count = models.PositiveIntegerField(default=0)
+    last_submitted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "reporter stats"
+
+    def __str__(self):
+        return f"{self.user} ({self.submitted_count} submitted, {self.rejected_count} rejected)"
@@ -0,0 +1,135 @@
+import datetime
+from typing import NamedTuple
+
+import pytz
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Min
+from django.utils import timezone
+
+from campaigns.admin import randomize_lat_longs
+from lazer.models import ViolationReport
+
+PIN_STORE_KEY_PREFIX = "lazer:pins"
+PIN_STORE_TIMEOUT = 60 * 60 * 24 * 7
+# Today's pins are still changing, so don't trust them for as long
+PIN_STORE_TODAY_TIMEOUT = 60 * 5
+
+
+class Pin(NamedTuple):
+    report_id: int
+    lat: float
+    lng: float
+    jittered_lat: float
+    jittered_lng: float
+    violation_observed: str
+    created_by_id: int | None
+    captured_at: datetime.datetime
+
+
+def parse_date(value):
+    return (
+        datetime.datetime.strptime(value, "%Y-%m-%d")
+        .astimezone(pytz.timezone("America/New_York"))
+        .date()
+    )
+
+
+def first_report_day():
+    key = f"{PIN_STORE_KEY_PREFIX}:first_day"
+    day = cache.get(key)
+    if day is None:
+        first = ViolationReport.objects.filter(submitted__isnull=False).aggregate(
+            first=Min("submission__captured_at")
+        )["first"]
+        day = timezone.localdate(first) if first is not None else timezone.localdate()
+        cache.set(key, day, timeout=60 * 60)
+    return day
+
+
+class DateRangeTooLong(ValueError):
+    pass
+
+
+def report_days(date=None, date_gte=None, date_lte=None):
+    """
+    Return the local days selected by map_data's date parameters.
+
+    As with the original captured_at filters, date_lte is exclusive: it compares against
+    midnight at the start of that day. Ranges are clipped to the days that can have reports,
+    and raise DateRangeTooLong if still longer than LAZER_MAP_MAX_DAYS. Malformed dates
+    raise ValueError.
+    """
+    if date:
+        return [parse_date(date)]
+    first_day = first_report_day()
+    tomorrow = timezone.localdate() + datetime.timedelta(days=1)
+    start = max(parse_date(date_gte), first_day) if date_gte else first_day
+    end = min(parse_date(date_lte), tomorrow) if date_lte else tomorrow
+    if (end - start).days > settings.LAZER_MAP_MAX_DAYS:
+        raise DateRangeTooLong(f"Date ranges are limited to {settings.LAZER_MAP_MAX_DAYS} days")
+    return [start + datetime.timedelta(days=i) for i in range((end - start).days)]
+
+
+def _key(day):
+    return f"{PIN_STORE_KEY_PREFIX}:{day.isoformat()}"
+
+
+def _timeout(day):
+    return PIN_STORE_TODAY_TIMEOUT if day >= timezone.localdate() else PIN_STORE_TIMEOUT
+
+
+def compute_days_pins(days):
+    """Return {day: [Pin]} for each of `days`, from a single query."""
+    pins = {day: [] for day in days}
+    reports = ViolationReport.objects.filter(
+        submitted__isnull=False, submission__captured_at__date__in=days
+    ).values_list(
+        "id",
+        "submission__location",
+        "violation_observed",
+        "submission__created_by_id",
+        "submission__captured_at",
+    )
+    if not reports:
+        return pins
+    report_ids, locations, violations, created_by_ids, captured_ats = zip(*reports)
+    lats = [location.y for location in locations]
+    lngs = [location.x for location in locations]
+    jittered_lats, jittered_lngs = randomize_lat_longs(report_ids, lats, lngs)
+    for pin in zip(
+        report_ids,
+        lats,
+        lngs,
+        jittered_lats.tolist(),
+        jittered_lngs.tolist(),
+        violations,
+        created_by_ids,
+        captured_ats,
+    ):
+        pins[timezone.localdate(pin[-1])].append(Pin(*pin))
+    return pins
+
+
+def pins_for_days(days):
+    """
+    Return the Pins of submitted reports captured on any of `days`.
+
+    Each day's pins are cached separately, so overlapping date ranges share work and only
+    days that were invalidated (see invalidate_day) are recomputed, all in one query.
+    """
+    keys = {_key(day): day for day in days}
+    cached = cache.get_many(keys)
+    missing = [day for key, day in keys.items() if key not in cached]
+    if missing:
+        by_timeout = {}
+        for day, day_pins in compute_days_pins(missing).items():
+            cached[_key(day)] = day_pins
+            by_timeout.setdefault(_timeout(day), {})[_key(day)] = day_pins
+        for timeout, values in by_timeout.items():
+            cache.set_many(values, timeout=timeout)
+    return [pin for key in keys for pin in cached[key]]
+
+
+def invalidate_day(day):
+    cache.delete(_key(day))
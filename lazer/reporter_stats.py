@@ -0,0 +1,42 @@
+from django.db import connection
+
+from lazer.models import ReporterStats
+
+# Reporters with more submitted reports than this skip review in Discord
+TRUSTED_SUBMITTED_COUNT = 1
+
+
+def _upsert(user_id, submitted=0, rejected=0, submitted_at=None):
+    table = ReporterStats._meta.db_table
+    sql = f"""
+        INSERT INTO {table} (user_id, submitted_count, rejected_count, last_submitted_at)
+        VALUES (%s, %s, %s, %s)
+        ON CONFLICT (user_id) DO UPDATE SET
+            submitted_count = {table}.submitted_count + EXCLUDED.submitted_count,
+            rejected_count = {table}.rejected_count + EXCLUDED.rejected_count,
+            last_submitted_at = GREATEST({table}.last_submitted_at, EXCLUDED.last_submitted_at)
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [user_id, submitted, rejected, submitted_at])
+
+
+def record_submitted(violation_report):
+    """Count a newly submitted report towards its reporter's stats."""
+    user_id = violation_report.submission.created_by_id
+    if user_id is not None:
+        _upsert(user_id, submitted=1, submitted_at=violation_report.submitted)
+
+
+def record_rejected(violation_report):
+    """Count a report rejected in review towards its reporter's stats."""
+    user_id = violation_report.submission.created_by_id
+    if user_id is not None:
+        _upsert(user_id, rejected=1)
+
+
+def is_trusted(user_id):
+    if user_id is None:
+        return False
+    return ReporterStats.objects.filter(
+        user_id=user_id, submitted_count__gt=TRUSTED_SUBMITTED_COUNT
+    ).exists()
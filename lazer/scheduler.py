@@ -0,0 +1,158 @@
+import datetime
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from lazer.models import ViolationReport
+from lazer.utils import submit_violation_report_to_ppa
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_NORMAL = 0
+# Reporters with a track record of submitted reports go to the front of the queue
+PRIORITY_TRUSTED = 10
+
+DRAIN_LOCK_KEY = "lazer:ppa:drain"
+# How long a claimed report is hidden from other drains, and the longest a drain may hold
+# the lock, should a worker die mid submission
+CLAIM_TIMEOUT = 60 * 15
+
+State = ViolationReport.SubmissionState
+
+
+class TokenBucket:
+    """
+    A token bucket kept in the cache, so every worker shares the same budget.
+
+    Holds up to `capacity` tokens, refilled at `rate` tokens per second. Callers are expected
+    to serialize their use of a bucket, as drain() does with DRAIN_LOCK_KEY.
+    """
+
+    def __init__(self, key, rate, capacity):
+        self.key = key
+        self.rate = rate
+        self.capacity = capacity
+
+    def take(self):
+        """Take a token, returning 0 on success or the seconds to wait until one is free."""
+        now = time.time()
+        tokens, updated = cache.get(self.key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0
+        else:
+            wait = (1 - tokens) / self.rate
+        cache.set(self.key, (tokens, now), timeout=int(self.capacity / self.rate) + 60)
+        return wait
+
+
+def ppa_bucket():
+    return TokenBucket(
+        "lazer:ppa:bucket",
+        settings.LAZER_PPA_SUBMIT_RATE / 60,
+        settings.LAZER_PPA_SUBMIT_BURST,
+    )
+
+
+def retry_delay(attempts):
+    """Seconds to wait before retrying a report that has failed `attempts` times."""
+    return min(
+        settings.LAZER_PPA_SUBMIT_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.LAZER_PPA_SUBMIT_RETRY_MAX_DELAY,
+    )
+
+
+def enqueue(violation_ids, priority=PRIORITY_NORMAL):
+    """Queue reports for submission to the PPA, resetting any earlier failed attempts."""
+    return ViolationReport.objects.filter(id__in=violation_ids, submitted__isnull=True).update(
+        submission_state=State.QUEUED,
+        submission_priority=priority,
+        submission_attempts=0,
+        next_attempt_at=timezone.now(),
+        last_submission_error=None,
+    )
+
+
+def _due():
+    return ViolationReport.objects.filter(
+        submission_state=State.QUEUED, submitted__isnull=True, next_attempt_at__lte=timezone.now()
+    ).order_by("-submission_priority", "next_attempt_at", "id")
+
+
+def _claim_next():
+    with transaction.atomic():
+        report = _due().select_for_update(skip_locked=True).first()
+        if report is None:
+            return None
+        report.submission_attempts += 1
+        report.next_attempt_at = timezone.now() + datetime.timedelta(seconds=CLAIM_TIMEOUT)
+        report.save(update_fields=["submission_attempts", "next_attempt_at"])
+    return ViolationReport.objects.select_related("submission").get(id=report.id)
+
+
+def attempt(violation_report, mode=None):
+    """Submit a report to the PPA, returning an error message if it was not submitted."""
+    try:
+        submit_violation_report_to_ppa(violation_report, mode=mode)
+    except Exception as err:
+        logger.exception("Submission of report %s failed", violation_report.id)
+        return repr(err)
+    if violation_report.submitted is None:
+        return "Submission was not confirmed, see the error screenshot"
+    return None
+
+
+def record_result(violation_report, error):
+    """Move a report on after an attempt, to submitted, a retry later, or the dead letters."""
+    fields = {"last_submission_error": error}
+    if error is None:
+        fields.update(submission_state=State.SUBMITTED, next_attempt_at=None)
+    elif violation_report.submission_attempts >= settings.LAZER_PPA_SUBMIT_MAX_ATTEMPTS:
+        fields.update(submission_state=State.DEAD_LETTER, next_attempt_at=None)
+    else:
+        fields["next_attempt_at"] = timezone.now() + datetime.timedelta(
+            seconds=retry_delay(violation_report.submission_attempts)
+        )
+    ViolationReport.objects.filter(id=violation_report.id).update(**fields)
+
+
+def next_drain_in():
+    """Seconds until the next queued report is due, or None if the queue is empty."""
+    next_attempt_at = (
+        ViolationReport.objects.filter(submission_state=State.QUEUED, submitted__isnull=True)
+        .order_by("next_attempt_at")
+        .values_list("next_attempt_at", flat=True)
+        .first()
+    )
+    if next_attempt_at is None:
+        return None
+    return max((next_attempt_at - timezone.now()).total_seconds(), 0)
+
+
+def drain():
+    """
+    Submit due reports, highest priority first, for as long as the rate limit allows.
+
+    Returns the seconds until there is more work to do, or None if the queue is empty or
+    another drain is already running.
+    """
+    if not cache.add(DRAIN_LOCK_KEY, 1, timeout=CLAIM_TIMEOUT):
+        return None
+    try:
+        bucket = ppa_bucket()
+        while _due().exists():
+            wait = bucket.take()
+            if wait:
+                return wait
+            violation_report = _claim_next()
+            if violation_report is None:
+                break
+            record_result(violation_report, attempt(violation_report))
+        return next_drain_in()
+    finally:
+        cache.delete(DRAIN_LOCK_KEY)
@@ -1,9 +1,16 @@
+from django.contrib.auth import get_user_model
 from django.db import transaction
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, pre_delete
 from django.dispatch import receiver
+from django.utils import timezone
 
+from lazer.dedupe import is_duplicate_report
 from lazer.models import ViolationReport
-from lazer.tasks import submit_violation_report_discord, submit_violation_report_to_ppa
+from lazer.pin_store import invalidate_day
+from lazer.reporter_stats import is_trusted
+from lazer.scheduler import PRIORITY_TRUSTED
+from lazer.tasks import queue_violation_report_for_ppa, submit_violation_report_discord
+from lazer.tokens import forget_user
 
 
 @receiver(post_save, sender=ViolationReport, dispatch_uid="violation_report_post_save")
@@ -11,12 +18,36 @@ def violation_report_post_save(sender, instance, created, update_fields, **kwarg
     if instance.submitted is not None:
         return
     if created:
-        if (
-            ViolationReport.objects.filter(
-                submission__created_by=instance.submission.created_by, submitted__isnull=False
-            ).count()
-            > 1
-        ):
-            transaction.on_commit(lambda: submit_violation_report_to_ppa.delay(instance.id))
+        if is_duplicate_report(instance):
+            # Already reported, so it isn't submitted again unless a reviewer approves it
+            ViolationReport.objects.filter(id=instance.id).update(
+                submission_state=ViolationReport.SubmissionState.DUPLICATE
+            )
+            transaction.on_commit(lambda: submit_violation_report_discord.delay(instance.id))
+        elif is_trusted(instance.submission.created_by_id):
+            queue_violation_report_for_ppa(instance.id, priority=PRIORITY_TRUSTED)
         else:
             transaction.on_commit(lambda: submit_violation_report_discord.delay(instance.id))
+
+
+def _invalidate_report_day(report):
+    day = timezone.localdate(report.submission.captured_at)
+    transaction.on_commit(lambda: invalidate_day(day))
+
+
+@receiver(post_save, sender=ViolationReport, dispatch_uid="violation_report_pin_store_post_save")
+def violation_report_pin_store_post_save(sender, instance, **kwargs):
+    if instance.submitted is not None:
+        _invalidate_report_day(instance)
+
+
+@receiver(pre_delete, sender=ViolationReport, dispatch_uid="violation_report_pin_store_pre_delete")
+def violation_report_pin_store_pre_delete(sender, instance, **kwargs):
+    if instance.submitted is not None:
+        _invalidate_report_day(instance)
+
+
+@receiver(post_save, sender=get_user_model(), dispatch_uid="lazer_api_user_post_save")
+def api_user_post_save(sender, instance, **kwargs):
+    # Deactivations and other changes reach token authenticated API calls straight away
+    forget_user(instance.id)
@@ -2,7 +2,10 @@ import interactions
 from asgiref.sync import async_to_sync
 from celery import shared_task
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 
+from lazer import scheduler
 from lazer.models import ViolationReport
 from lazer.utils import build_embed
 from lazer.utils import (
@@ -12,9 +15,31 @@ from pba_discord.bot import bot
 
 
 @shared_task
-def submit_violation_report_to_ppa(violation_id):
+def submit_violation_report_to_ppa(violation_id, mode=None):
     violation_report = ViolationReport.objects.get(id=violation_id)
-    _submit_violation_report_to_ppa(violation_report)
+    _submit_violation_report_to_ppa(violation_report, mode=mode)
+    if violation_report.submitted is not None:
+        ViolationReport.objects.filter(id=violation_id).update(
+            submission_state=ViolationReport.SubmissionState.SUBMITTED, next_attempt_at=None
+        )
+
+
+@shared_task
+def drain_ppa_submissions():
+    wait = scheduler.drain()
+    if wait is None:
+        return
+    # Keep a single wake up pending however many drains were kicked off, the key expires
+    # just before it runs
+    wait = max(wait, 1)
+    if cache.add("lazer:ppa:drain:scheduled", 1, timeout=int(wait)):
+        drain_ppa_submissions.apply_async(countdown=wait)
+
+
+def queue_violation_report_for_ppa(violation_id, priority=scheduler.PRIORITY_NORMAL):
+    """Queue a report for the PPA submission scheduler rather than submitting it right away."""
+    scheduler.enqueue([violation_id], priority=priority)
+    transaction.on_commit(drain_ppa_submissions.delay)
 
 
 async def _submit_violation_report_discord(violation_id):
@@ -0,0 +1,905 @@
+import asyncio
+import base64
+import datetime
+import io
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from geopy.location import Location
+from PIL import Image
+
+from lazer import scheduler
+from lazer.batch import _stored_upload, address_fields, ingest_item, vehicle_fields
+from lazer.dedupe import find_duplicate
+from lazer.exports import EXPORT_COLUMNS, export_chunks
+from lazer.heatmap import MAX_ZOOM, MIN_BIN_SIZE, bin_points, bin_size
+from lazer.images import hash_distance, image_hash, ingest_image, ingest_image_bytes
+from lazer.integrations import platerecognizer, submit_form
+from lazer.integrations.browser_pool import BrowserPool, run_in_browser_loop
+from lazer.integrations.platerecognizer import read_plate
+from lazer.integrations.screenshots import ScreenshotBatch
+from lazer.integrations.submit_form import (
+    DirectSubmissionRejected,
+    MobilityAccessViolation,
+    submit_form_direct,
+)
+from lazer.models import ViolationReport, ViolationSubmission
+from lazer.pin_store import (
+    PIN_STORE_KEY_PREFIX,
+    DateRangeTooLong,
+    pins_for_days,
+    report_days,
+)
+from lazer.reporter_stats import is_trusted, record_rejected, record_submitted
+from lazer.tokens import (
+    USER_KEY_PREFIX,
+    aauthenticate_token,
+    authenticate_token,
+    forget_user,
+    issue_token,
+    revoke_token,
+)
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class StubPlateRecognizer(BaseHTTPRequestHandler):
+    status = 200
+    requests = 0
+
+    def do_POST(self):
+        type(self).requests += 1
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.dumps({"results": [{"plate": "abc123"}]}).encode()
+        self.send_response(self.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(CACHES=LOCMEM_CACHES, PLATERECOGNIZER_API_KEY="test")
+class ReadPlateTestCase(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubPlateRecognizer)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}/v1/plate-reader/"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        platerecognizer.breaker.record_success()
+        StubPlateRecognizer.status = 200
+        StubPlateRecognizer.requests = 0
+        # One loop for the whole test, as in a long running worker
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        client = platerecognizer._clients.pop(self.loop, None)
+        if client is not None:
+            self.loop.run_until_complete(client.aclose())
+        self.loop.close()
+
+    def _read(self, image="aW1hZ2U="):
+        with self.settings(PLATERECOGNIZER_URL=self.url):
+            return self.loop.run_until_complete(
+                read_plate(image, datetime.datetime.now(datetime.timezone.utc))
+            )
+
+    def test_same_image_is_cached(self):
+        first = self._read()
+        second = self._read()
+
+        self.assertEqual(first, {"results": [{"plate": "abc123"}]})
+        self.assertEqual(first, second)
+        self.assertEqual(StubPlateRecognizer.requests, 1)
+
+    def test_failures_open_the_circuit(self):
+        StubPlateRecognizer.status = 500
+        for i in range(platerecognizer.breaker.failure_threshold):
+            self.assertEqual(self._read(f"image-{i}"), {})
+        requests = StubPlateRecognizer.requests
+
+        self.assertEqual(self._read("another-image"), {})
+        self.assertEqual(StubPlateRecognizer.requests, requests)
+
+    def test_client_errors_keep_the_circuit_closed(self):
+        StubPlateRecognizer.status = 400
+        for i in range(platerecognizer.breaker.failure_threshold + 1):
+            self.assertEqual(self._read(f"image-{i}"), {})
+
+        self.assertEqual(
+            StubPlateRecognizer.requests, platerecognizer.breaker.failure_threshold + 1
+        )
+        self.assertTrue(platerecognizer.breaker.allow())
+
+    def test_client_is_reused(self):
+        self._read("first-image")
+        client = platerecognizer._clients[self.loop]
+        self._read("second-image")
+
+        self.assertIs(platerecognizer._clients[self.loop], client)
+
+
+@override_settings(LAZER_IMAGE_MAX_DIMENSION=1000, LAZER_KEEP_ORIGINAL_IMAGE=False)
+class IngestImageTestCase(SimpleTestCase):
+    def _data_url(self):
+        image = Image.new("RGB", (4000, 3000), "red")
+        exif = image.getexif()
+        exif[0x0112] = 6  # Orientation: rotated 90 degrees
+        exif[0x010F] = "Phone"
+        output = io.BytesIO()
+        image.save(output, format="JPEG", exif=exif)
+        return "data:image/jpeg;base64," + base64.b64encode(output.getvalue()).decode()
+
+    def test_recompressed_without_exif(self):
+        ingested = ingest_image(self._data_url())
+
+        with Image.open(ingested.file) as stored:
+            self.assertEqual(stored.size, (750, 1000))
+            self.assertEqual(dict(stored.getexif()), {})
+        ingested.file.seek(0)
+        self.assertEqual(base64.b64decode(ingested.upload), ingested.file.read())
+
+    def test_keep_original(self):
+        data_url = self._data_url()
+        with self.settings(LAZER_KEEP_ORIGINAL_IMAGE=True):
+            ingested = ingest_image(data_url)
+
+        self.assertEqual(ingested.file.read(), base64.b64decode(data_url.split(",")[1]))
+        self.assertNotEqual(ingested.upload, data_url.split(",")[1])
+
+    def test_hash(self):
+        ingested = ingest_image(self._data_url())
+
+        ingested.file.seek(0)
+        self.assertEqual(ingested.hash, image_hash(ingested.file.read()))
+
+
+@override_settings(LAZER_IMAGE_MAX_DIMENSION=1000)
+class StoredUploadTestCase(SimpleTestCase):
+    def _stored_upload(self):
+        output = io.BytesIO()
+        Image.new("RGB", (3000, 2000), "red").save(output, format="PNG")
+        ingested = ingest_image_bytes(output.getvalue(), "png")
+        return _stored_upload(ViolationSubmission(image=ingested.file)), ingested.upload
+
+    def test_matches_ingested_upload(self):
+        with self.settings(LAZER_KEEP_ORIGINAL_IMAGE=False):
+            stored, upload = self._stored_upload()
+
+        self.assertEqual(stored, upload)
+
+    def test_matches_ingested_upload_of_kept_original(self):
+        with self.settings(LAZER_KEEP_ORIGINAL_IMAGE=True):
+            stored, upload = self._stored_upload()
+
+        self.assertEqual(stored, upload)
+
+
+def gradient_jpeg(size, reverse=False, quality=90):
+    image = Image.linear_gradient("L").transpose(Image.Transpose.ROTATE_90).resize(size)
+    if reverse:
+        image = image.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+    output = io.BytesIO()
+    image.convert("RGB").save(output, format="JPEG", quality=quality)
+    return output.getvalue()
+
+
+class ImageHashTestCase(SimpleTestCase):
+    def test_similar_images_are_close(self):
+        original = image_hash(gradient_jpeg((1600, 1200)))
+        resized = image_hash(gradient_jpeg((800, 600), quality=50))
+        flipped = image_hash(gradient_jpeg((1600, 1200), reverse=True))
+
+        self.assertLessEqual(hash_distance(original, resized), 4)
+        self.assertGreater(hash_distance(original, flipped), 20)
+
+    def test_fits_in_a_bigint(self):
+        for content in [gradient_jpeg((100, 100)), gradient_jpeg((100, 100), reverse=True)]:
+            self.assertTrue(-(2**63) <= image_hash(content) < 2**63)
+
+
+SMARTSHEET_FIELD_IDS = {
+    label: str(1000 + i) for i, label in enumerate(submit_form.DIRECT_SUBMISSION_LABELS)
+}
+SMARTSHEET_CONFIRMATION = "submission-confirmation"
+
+
+class StubSmartsheetSubmit(BaseHTTPRequestHandler):
+    """Only confirms posts with every configured field id, like the real form."""
+
+    status = 200
+    confirm = True
+    received = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        type(self).received.append((self.headers["Content-Type"], body))
+        valid = all(
+            f'"{field_id}": '.encode() in body for field_id in SMARTSHEET_FIELD_IDS.values()
+        )
+        if valid and self.confirm:
+            response = json.dumps({"result": SMARTSHEET_CONFIRMATION}).encode()
+        else:
+            response = json.dumps({"result": "form"}).encode()
+        self.send_response(self.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(
+    PPA_SMARTSHEET_FIELD_IDS=SMARTSHEET_FIELD_IDS,
+    PPA_SMARTSHEET_SUBMIT_CONFIRMATION=SMARTSHEET_CONFIRMATION,
+)
+class SubmitFormDirectTestCase(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubSmartsheetSubmit)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}/api/submit/form"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        StubSmartsheetSubmit.status = 200
+        StubSmartsheetSubmit.confirm = True
+        StubSmartsheetSubmit.received = []
+        self.violation = MobilityAccessViolation(
+            make="Honda",
+            body_style="sedan",
+            vehicle_color="black",
+            violation_observed="bike lane",
+            _date_observed="06/03/2025",
+            _time_observed="08:15 AM",
+            _block_number="1500",
+            _street_name="SPRUCE ST",
+            _zip_code="19102",
+            address=None,
+            date_time_observed=None,
+        )
+
+    def _submit(self):
+        photo = ContentFile(b"jpeg bytes", name="photo.jpg")
+        async_to_sync(submit_form_direct)(self.violation, photo, url=self.url)
+
+    def test_labels_cover_fields(self):
+        self.assertEqual(
+            submit_form.DIRECT_SUBMISSION_LABELS,
+            ["Date Observed", *submit_form.smartsheet_fields(self.violation)],
+        )
+
+    def test_posts_multipart_payload(self):
+        self._submit()
+
+        [(content_type, body)] = StubSmartsheetSubmit.received
+        ids = SMARTSHEET_FIELD_IDS
+        self.assertTrue(content_type.startswith("multipart/form-data"))
+        self.assertIn(f'"{ids["Make"]}": "Honda"'.encode(), body)
+        self.assertIn(f'"{ids["Date Observed"]}": "06/03/2025"'.encode(), body)
+        self.assertIn(
+            f'"{ids["Violation Observed"]}": "Bike Lane (vehicle parked in bike lane)"'.encode(),
+            body,
+        )
+        self.assertNotIn(b'"Make"', body)
+        self.assertIn(b'filename="photo.jpg"', body)
+        self.assertIn(b"jpeg bytes", body)
+
+    def test_rejection_raises(self):
+        StubSmartsheetSubmit.status = 422
+        with self.assertRaises(DirectSubmissionRejected):
+            self._submit()
+
+    def test_unconfirmed_success_raises(self):
+        StubSmartsheetSubmit.confirm = False
+        with self.assertRaises(DirectSubmissionRejected):
+            self._submit()
+
+    def test_refused_without_field_ids(self):
+        field_ids = {**SMARTSHEET_FIELD_IDS, "Make": ""}
+        with self.settings(PPA_SMARTSHEET_FIELD_IDS=field_ids):
+            self.assertFalse(submit_form.direct_submission_configured())
+            with self.assertRaises(DirectSubmissionRejected):
+                self._submit()
+        self.assertEqual(StubSmartsheetSubmit.received, [])
+
+    def test_refused_without_confirmation(self):
+        with self.settings(PPA_SMARTSHEET_SUBMIT_CONFIRMATION=""):
+            with self.assertRaises(DirectSubmissionRejected):
+                self._submit()
+        self.assertEqual(StubSmartsheetSubmit.received, [])
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    launched = 0
+
+    def __init__(self):
+        type(self).launched += 1
+        self.connected = True
+        self.closed = False
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **kwargs):
+        self.contexts.append(FakeContext(self))
+        return self.contexts[-1]
+
+    async def close(self):
+        self.closed = True
+
+
+class BrowserPoolTestCase(SimpleTestCase):
+    def setUp(self):
+        FakeBrowser.launched = 0
+
+    async def launch(self):
+        return FakeBrowser()
+
+    def _use(self, pool, times=1):
+        async def use():
+            contexts = []
+            for _ in range(times):
+                async with pool.context() as context:
+                    contexts.append(context)
+            return contexts
+
+        return run_in_browser_loop(use())
+
+    def _pool(self, max_uses=10):
+        return run_in_browser_loop(self._make_pool(max_uses))
+
+    async def _make_pool(self, max_uses):
+        # The pool's semaphore belongs to the loop it is made on
+        return BrowserPool(1, max_uses, launch_browser=self.launch)
+
+    def test_reuses_browser(self):
+        pool = self._pool()
+
+        contexts = self._use(pool, times=3)
+
+        self.assertEqual(FakeBrowser.launched, 1)
+        self.assertEqual(len({context.browser for context in contexts}), 1)
+        self.assertTrue(all(context.closed for context in contexts))
+        self.assertEqual(pool._idle[0].uses, 3)
+
+    def test_recycles_after_max_uses(self):
+        pool = self._pool(max_uses=2)
+
+        contexts = self._use(pool, times=3)
+
+        self.assertEqual(FakeBrowser.launched, 2)
+        self.assertTrue(contexts[0].browser.closed)
+        self.assertIs(contexts[2].browser, pool._idle[0].browser)
+
+    def test_replaces_crashed_browser(self):
+        pool = self._pool()
+        (first,) = self._use(pool)
+        first.browser.connected = False
+
+        (second,) = self._use(pool)
+
+        self.assertIsNot(second.browser, first.browser)
+        self.assertTrue(first.browser.closed)
+        self.assertEqual([pooled.browser for pooled in pool._idle], [second.browser])
+
+
+class ScreenshotPage:
+    def __init__(self):
+        self.calls = []
+
+    async def screenshot(self, **options):
+        self.calls.append(options)
+        return b"screenshot"
+
+
+@override_settings(LAZER_SCREENSHOT_FORMAT="jpeg", LAZER_SCREENSHOT_QUALITY=60)
+class ScreenshotBatchTestCase(SimpleTestCase):
+    def _capture(self, policy):
+        page = ScreenshotPage()
+        batch = ScreenshotBatch(policy)
+        for name in ["before-submit", "after-submit", "success", "final"]:
+            async_to_sync(batch.capture)(page, name)
+        return batch, page
+
+    def test_all(self):
+        batch, page = self._capture("all")
+
+        self.assertEqual(
+            list(batch.screenshots), ["before-submit", "after-submit", "success", "final"]
+        )
+        self.assertEqual(page.calls[0], {"full_page": True, "type": "jpeg", "quality": 60})
+
+    def test_errors_only(self):
+        batch, page = self._capture("errors")
+
+        self.assertEqual(list(batch.screenshots), ["final"])
+        self.assertEqual(len(page.calls), 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TokenBucketTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_burst_then_wait(self):
+        bucket = scheduler.TokenBucket("test:bucket", rate=1 / 60, capacity=3)
+
+        self.assertEqual([bucket.take() for _ in range(3)], [0, 0, 0])
+        wait = bucket.take()
+        self.assertGreater(wait, 59)
+        self.assertLessEqual(wait, 60)
+
+    @override_settings(LAZER_PPA_SUBMIT_RETRY_DELAY=60, LAZER_PPA_SUBMIT_RETRY_MAX_DELAY=600)
+    def test_retry_delay_backs_off(self):
+        self.assertEqual([scheduler.retry_delay(n) for n in range(1, 6)], [60, 120, 240, 480, 600])
+
+
+@override_settings(LAZER_PPA_SUBMIT_MAX_ATTEMPTS=2)
+class SubmissionSchedulerTestCase(TestCase):
+    def setUp(self):
+        self.report = self._report()
+
+    def _report(self):
+        submission = ViolationSubmission.objects.create(
+            captured_at=timezone.now(),
+            location=Point(-75.16, 39.95),
+            image=ContentFile(b"jpeg bytes", name="photo.jpg"),
+        )
+        return ViolationReport.objects.create(
+            submission=submission,
+            date_observed="06/03/2025",
+            time_observed="08:15 AM",
+            make="Honda",
+            body_style="sedan",
+            vehicle_color="black",
+            violation_observed="bike lane",
+            occurrence_frequency="daily",
+            block_number="1500",
+            street_name="SPRUCE ST",
+            zip_code="19102",
+        )
+
+    def test_enqueue_orders_by_priority(self):
+        trusted = self._report()
+        # Queued first, so only priority puts the trusted report ahead of it
+        scheduler.enqueue([self.report.id])
+        scheduler.enqueue([trusted.id], priority=scheduler.PRIORITY_TRUSTED)
+
+        self.report.refresh_from_db()
+        self.assertEqual(self.report.submission_state, ViolationReport.SubmissionState.QUEUED)
+        self.assertEqual(scheduler._claim_next(), trusted)
+        self.assertEqual(scheduler._claim_next(), self.report)
+        self.assertIsNone(scheduler._claim_next())
+
+    def test_failures_retry_then_dead_letter(self):
+        scheduler.enqueue([self.report.id])
+
+        report = scheduler._claim_next()
+        scheduler.record_result(report, "timed out")
+        report.refresh_from_db()
+        self.assertEqual(report.submission_state, ViolationReport.SubmissionState.QUEUED)
+        self.assertGreater(report.next_attempt_at, timezone.now())
+
+        ViolationReport.objects.filter(id=report.id).update(next_attempt_at=timezone.now())
+        report = scheduler._claim_next()
+        scheduler.record_result(report, "timed out again")
+        report.refresh_from_db()
+        self.assertEqual(report.submission_state, ViolationReport.SubmissionState.DEAD_LETTER)
+        self.assertEqual(report.last_submission_error, "timed out again")
+        self.assertIsNone(scheduler._claim_next())
+
+
+class ReporterStatsTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="reporter", email="reporter@example.com"
+        )
+        self.submission = ViolationSubmission.objects.create(
+            created_by=self.user,
+            captured_at=timezone.now(),
+            location=Point(-75.16, 39.95),
+            image=ContentFile(b"jpeg bytes", name="photo.jpg"),
+        )
+
+    def _report(self, submitted=None):
+        return ViolationReport(submission=self.submission, submitted=submitted)
+
+    def test_trusted_after_two_submissions(self):
+        self.assertFalse(is_trusted(self.user.id))
+
+        record_submitted(self._report(timezone.now()))
+        record_rejected(self._report())
+        self.assertFalse(is_trusted(self.user.id))
+
+        record_submitted(self._report(timezone.now()))
+        self.assertTrue(is_trusted(self.user.id))
+        self.assertEqual(self.user.reporter_stats.submitted_count, 2)
+        self.assertEqual(self.user.reporter_stats.rejected_count, 1)
+
+    def test_anonymous_reporters_are_not_tracked(self):
+        self.submission.created_by = None
+
+        record_submitted(self._report(timezone.now()))
+        self.assertFalse(is_trusted(None))
+
+
+@override_settings(
+    LAZER_DUPLICATE_DISTANCE=30, LAZER_DUPLICATE_WINDOW=1800, LAZER_DUPLICATE_HASH_DISTANCE=10
+)
+class FindDuplicateTestCase(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.hash = image_hash(gradient_jpeg((800, 600)))
+        self.original = ViolationSubmission.objects.create(
+            captured_at=self.now,
+            location=Point(-75.16, 39.95),
+            image=ContentFile(b"jpeg bytes", name="photo.jpg"),
+            image_hash=self.hash,
+        )
+
+    def _find(self, location, minutes=5, hash=None):
+        return async_to_sync(find_duplicate)(
+            location, self.now + datetime.timedelta(minutes=minutes), hash or self.hash
+        )
+
+    def test_nearby_similar_image(self):
+        self.assertEqual(self._find(Point(-75.16005, 39.95005)), self.original)
+
+    def test_too_far(self):
+        self.assertIsNone(self._find(Point(-75.161, 39.95)))
+        self.assertIsNone(self._find(Point(-75.16005, 39.95005), minutes=45))
+
+    def test_exact_distance_north_south(self):
+        # About 35m north, inside the index radius, which is wider north to south
+        self.assertIsNone(self._find(Point(-75.16, 39.950315)))
+        self.assertEqual(self._find(Point(-75.16, 39.95025)), self.original)
+
+    def test_different_image(self):
+        other = image_hash(gradient_jpeg((800, 600), reverse=True))
+        self.assertIsNone(self._find(Point(-75.16005, 39.95005), hash=other))
+
+
+@override_settings(CACHES=LOCMEM_CACHES, LAZER_API_TOKEN_MAX_AGE=3600)
+class APITokenTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model()(id=42, username="rider", is_active=True)
+        self.user.set_password("old password")
+        self._cache_user()
+
+    def _cache_user(self):
+        forget_user(self.user.id)
+        # Where get_user finds the user before going to the database
+        cache.set(f"{USER_KEY_PREFIX}:{self.user.id}", self.user)
+
+    def test_round_trip(self):
+        token, expires = issue_token(self.user)
+
+        self.assertEqual(authenticate_token(token), self.user)
+        self.assertEqual(async_to_sync(aauthenticate_token)(token), self.user)
+        self.assertGreater(expires, timezone.now())
+
+    def test_tampered_and_expired(self):
+        token, _expires = issue_token(self.user)
+
+        self.assertIsNone(authenticate_token(token[:-2] + "xx"))
+        with self.settings(LAZER_API_TOKEN_MAX_AGE=-1):
+            self.assertIsNone(authenticate_token(token))
+
+    def test_revocation(self):
+        token, _expires = issue_token(self.user)
+        other, _expires = issue_token(self.user)
+
+        revoke_token(token)
+        self.assertIsNone(authenticate_token(token))
+        self.assertEqual(authenticate_token(other), self.user)
+
+    def test_password_change_invalidates(self):
+        token, _expires = issue_token(self.user)
+
+        self.user.set_password("new password")
+        self._cache_user()
+
+        self.assertIsNone(authenticate_token(token))
+        self.assertIsNone(async_to_sync(aauthenticate_token)(token))
+        newer, _expires = issue_token(self.user)
+        self.assertEqual(authenticate_token(newer), self.user)
+
+
+class BatchFieldsTestCase(SimpleTestCase):
+    def test_vehicle_fields_from_best_vehicle(self):
+        plate_data = {
+            "results": [
+                {
+                    "vehicle": {"type": "SUV", "score": 0.4},
+                    "model_make": [{"make": "Jeep", "model": "Wrangler"}],
+                    "color": [{"color": "green"}],
+                },
+                {
+                    "vehicle": {"type": "Sedan", "score": 0.9},
+                    "model_make": [{"make": "Honda", "model": "Civic"}],
+                    "color": [{"color": "black"}],
+                },
+            ]
+        }
+
+        self.assertEqual(
+            vehicle_fields(plate_data),
+            {"body_style": "Sedan", "make": "Honda", "model": "Civic", "vehicle_color": "black"},
+        )
+        self.assertEqual(vehicle_fields({}), {})
+
+    def test_address_fields(self):
+        self.assertEqual(
+            address_fields("1500 Spruce St, Philadelphia, PA 19102, USA"),
+            {"block_number": "1500", "street_name": "SPRUCE ST", "zip_code": "19102"},
+        )
+        self.assertEqual(address_fields("Rittenhouse Square"), {})
+
+
+class HeatmapBinTestCase(SimpleTestCase):
+    def test_bins_are_no_finer_than_pin_jitter(self):
+        for zoom in range(MAX_ZOOM + 1):
+            self.assertGreaterEqual(bin_size(zoom), MIN_BIN_SIZE)
+        # The widest smear randomize_lat_long applies to a pin
+        self.assertGreaterEqual(MIN_BIN_SIZE, 0.000358)
+
+    def test_nearby_points_share_a_bin_at_max_zoom(self):
+        # About 10 m apart
+        points = [(39.95000, -75.16000), (39.95009, -75.16000)]
+
+        self.assertEqual(len(bin_points(points, MAX_ZOOM)), 1)
+
+
+class ExportRows(list):
+    """Stands in for export_queryset's values_list in export_chunks."""
+
+    def iterator(self, chunk_size):
+        return iter(self)
+
+
+class ExportChunksTestCase(SimpleTestCase):
+    def setUp(self):
+        captured_at = datetime.datetime(2025, 5, 1, 8, 30, tzinfo=datetime.timezone.utc)
+        self.rows = ExportRows(
+            (
+                report_id,
+                captured_at,
+                "May 1, 2025",
+                "08:30 AM",
+                "bike lane (vehicle parked in bike lane)",
+                "Honda",
+                "Civic",
+                "Sedan",
+                "black",
+                "1500",
+                "SPRUCE ST",
+                "19102",
+                captured_at + datetime.timedelta(hours=1),
+                Point(-75.1667, 39.9475),
+            )
+            for report_id in [1, 2]
+        )
+
+    def export(self, format):
+        return "".join(export_chunks(self.rows, format))
+
+    def test_csv(self):
+        lines = self.export("csv").splitlines()
+
+        self.assertEqual(lines[0], ",".join(EXPORT_COLUMNS))
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].startswith("1,2025-05-01T08:30:00+00:00,"))
+        self.assertTrue(lines[2].endswith(",39.9475,-75.1667"))
+
+    def test_geojson(self):
+        collection = json.loads(self.export("geojson"))
+
+        self.assertEqual(len(collection["features"]), 2)
+        feature = collection["features"][1]
+        self.assertEqual(feature["geometry"]["coordinates"], [-75.1667, 39.9475])
+        self.assertEqual(feature["properties"]["id"], 2)
+        self.assertNotIn("latitude", feature["properties"])
+
+    def test_geojson_empty(self):
+        self.rows.clear()
+
+        self.assertEqual(json.loads(self.export("geojson"))["features"], [])
+
+    def test_ndjson(self):
+        records = [json.loads(line) for line in self.export("ndjson").splitlines()]
+
+        self.assertEqual([record["id"] for record in records], [1, 2])
+        self.assertEqual(records[0]["submitted"], "2025-05-01T09:30:00+00:00")
+        self.assertEqual(records[0]["street_name"], "SPRUCE ST")
+
+
+@override_settings(CACHES=LOCMEM_CACHES, LAZER_MAP_MAX_DAYS=30)
+class ReportDaysTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.localdate()
+        self.first_day = self.today - datetime.timedelta(days=10)
+        cache.set(f"{PIN_STORE_KEY_PREFIX}:first_day", self.first_day)
+
+    def test_clamped_to_report_days(self):
+        days = report_days(date_gte="1900-01-01", date_lte="2999-01-01")
+
+        self.assertEqual(days[0], self.first_day)
+        self.assertEqual(days[-1], self.today)
+
+    def test_date_lte_is_exclusive(self):
+        date_lte = self.today - datetime.timedelta(days=2)
+
+        self.assertEqual(
+            report_days(date_lte=date_lte.isoformat())[-1], date_lte - datetime.timedelta(days=1)
+        )
+
+    def test_range_too_long(self):
+        cache.set(f"{PIN_STORE_KEY_PREFIX}:first_day", self.today - datetime.timedelta(days=100))
+
+        with self.assertRaises(DateRangeTooLong):
+            report_days(date_gte="1900-01-01")
+
+    def test_malformed_date(self):
+        with self.assertRaises(ValueError):
+            report_days(date_gte="yesterday")
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PinStoreTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.days = [timezone.localdate() - datetime.timedelta(days=i) for i in [3, 2, 1]]
+        for day in self.days[:2]:
+            submission = ViolationSubmission.objects.create(
+                captured_at=timezone.make_aware(datetime.datetime.combine(day, datetime.time(12))),
+                location=Point(-75.16, 39.95),
+                image=ContentFile(b"jpeg bytes", name="photo.jpg"),
+            )
+            ViolationReport.objects.create(
+                submission=submission,
+                submitted=timezone.now(),
+                date_observed="06/03/2025",
+                time_observed="12:00 PM",
+                make="Honda",
+                body_style="sedan",
+                vehicle_color="black",
+                violation_observed="bike lane",
+                occurrence_frequency="daily",
+                block_number="1500",
+                street_name="SPRUCE ST",
+                zip_code="19102",
+            )
+
+    def test_missing_days_fetched_in_one_query(self):
+        with self.assertNumQueries(1):
+            pins = pins_for_days(self.days)
+        self.assertEqual([timezone.localdate(pin.captured_at) for pin in pins], self.days[:2])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(pins_for_days(self.days), pins)
+
+
+async def no_street_block(longitude, latitude):
+    return None
+
+
+@mock.patch("lazer.batch.aresolve_street_block", new=no_street_block)
+class IngestItemTestCase(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="batcher", email="batcher@example.com"
+        )
+        self.item = {
+            "key": "item-1",
+            "image": "photo",
+            "latitude": "39.9475",
+            "longitude": "-75.1667",
+            "datetime": "2025-06-03T08:15:00-04:00",
+            "report": {
+                "date_observed": "06/03/2025",
+                "time_observed": "08:15 AM",
+                "violation_observed": "bike lane",
+                "occurrence_frequency": "daily",
+                "additional_information": "none",
+            },
+        }
+        self.geocoder_error = None
+
+    async def read_plate(self, upload, utc_time):
+        return {
+            "results": [
+                {
+                    "vehicle": {"type": "Sedan", "score": 0.9},
+                    "model_make": [{"make": "Honda", "model": "Civic"}],
+                    "color": [{"color": "black"}],
+                }
+            ]
+        }
+
+    async def reverse_geocode_point(self, search_point, exactly_one=True):
+        if self.geocoder_error is not None:
+            raise self.geocoder_error
+        return [Location("1500 Spruce St, Philadelphia, PA 19102, USA", (39.9475, -75.1667), {})]
+
+    def _ingest(self, item=None):
+        files = {"photo": SimpleUploadedFile("photo.jpg", gradient_jpeg((100, 100)))}
+        with (
+            mock.patch("lazer.batch.read_plate", new=self.read_plate),
+            mock.patch("lazer.batch.reverse_geocode_point", new=self.reverse_geocode_point),
+        ):
+            return async_to_sync(ingest_item)(
+                item or self.item, files, self.user, asyncio.Semaphore(1)
+            )
+
+    def test_creates_report(self):
+        result = self._ingest()
+
+        self.assertEqual(result["status"], "created")
+        report = ViolationReport.objects.get(submission__client_key="item-1")
+        self.assertEqual((report.make, report.street_name), ("Honda", "SPRUCE ST"))
+        self.assertEqual(self._ingest()["status"], "exists")
+
+    def test_retry_finishes_incomplete_item(self):
+        self.geocoder_error = Exception("quota exceeded")
+        result = self._ingest()
+
+        self.assertEqual(result["status"], "incomplete")
+        self.assertEqual(result["missing"], ["block_number", "street_name", "zip_code"])
+        self.assertFalse(ViolationReport.objects.exists())
+
+        self.geocoder_error = None
+        result = self._ingest()
+
+        self.assertEqual(result["status"], "created")
+        self.assertEqual(ViolationSubmission.objects.count(), 1)
+        self.assertEqual(ViolationReport.objects.get().zip_code, "19102")
+
+    def test_unexpected_error_is_per_item(self):
+        with mock.patch("lazer.batch.find_duplicate", side_effect=RuntimeError("boom")):
+            result = self._ingest()
+
+        self.assertEqual(result["key"], "item-1")
+        self.assertEqual(result["status"], "error")
@@ -0,0 +1,135 @@
+import datetime
+import secrets
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+
+User = get_user_model()
+
+TOKEN_SALT = "lazer.tokens"
+REVOKED_KEY_PREFIX = "lazer:api-token-revoked"
+USER_KEY_PREFIX = "lazer:api-user"
+# Users are also kept in memory for a few seconds, saving the cache round trip on bursts of
+# requests from the same rider
+LOCAL_USER_TIMEOUT = 10
+LOCAL_USER_MAX = 1000
+
+_local_users = {}
+
+
+def _fingerprint(user):
+    # Changes with the user's password, so password changes and resets invalidate their
+    # tokens the way they do sessions
+    return user.get_session_auth_hash()[:16]
+
+
+def issue_token(user):
+    """Return a signed API token for `user` and when it expires."""
+    payload = {"u": user.id, "j": secrets.token_urlsafe(8), "h": _fingerprint(user)}
+    token = signing.dumps(payload, salt=TOKEN_SALT)
+    expires = timezone.now() + datetime.timedelta(seconds=settings.LAZER_API_TOKEN_MAX_AGE)
+    return token, expires
+
+
+def _load(token):
+    try:
+        return signing.loads(token, salt=TOKEN_SALT, max_age=settings.LAZER_API_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return None
+
+
+def _revocation_key(payload):
+    return f"{REVOKED_KEY_PREFIX}:{payload['j']}"
+
+
+def _token_user(payload, user):
+    if user is None or not constant_time_compare(payload.get("h", ""), _fingerprint(user)):
+        return None
+    return user
+
+
+def authenticate_token(token):
+    """
+    Return the active user of a valid, unexpired and unrevoked token, otherwise None.
+
+    Tokens stop working when their user is deactivated or their password changes.
+    """
+    payload = _load(token)
+    if payload is None or cache.get(_revocation_key(payload)):
+        return None
+    return _token_user(payload, get_user(payload["u"]))
+
+
+async def aauthenticate_token(token):
+    payload = _load(token)
+    if payload is None or await cache.aget(_revocation_key(payload)):
+        return None
+    return _token_user(payload, await aget_user(payload["u"]))
+
+
+def revoke_token(token):
+    """Revoke a single token, e.g. when an app logs out."""
+    payload = _load(token)
+    if payload is not None:
+        cache.set(_revocation_key(payload), True, timeout=settings.LAZER_API_TOKEN_MAX_AGE)
+
+
+def _user_key(user_id):
+    return f"{USER_KEY_PREFIX}:{user_id}"
+
+
+def _local_user(user_id):
+    cached = _local_users.get(user_id)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    return None
+
+
+def _remember_local_user(user):
+    if len(_local_users) >= LOCAL_USER_MAX:
+        _local_users.clear()
+    _local_users[user.id] = (time.monotonic() + LOCAL_USER_TIMEOUT, user)
+
+
+def get_user(user_id):
+    """Return an active user by id through the in-process and shared caches, or None."""
+    user = _local_user(user_id)
+    if user is None:
+        user = cache.get(_user_key(user_id))
+        if user is None:
+            user = User.objects.filter(id=user_id, is_active=True).first()
+            if user is None:
+                return None
+            cache.set(_user_key(user_id), user, timeout=settings.LAZER_API_USER_CACHE_TIMEOUT)
+        _remember_local_user(user)
+    return user
+
+
+async def aget_user(user_id):
+    user = _local_user(user_id)
+    if user is None:
+        user = await cache.aget(_user_key(user_id))
+        if user is None:
+            user = await User.objects.filter(id=user_id, is_active=True).afirst()
+            if user is None:
+                return None
+            await cache.aset(
+                _user_key(user_id), user, timeout=settings.LAZER_API_USER_CACHE_TIMEOUT
+            )
+        _remember_local_user(user)
+    return user
+
+
+def forget_user(user_id):
+    """
+    Drop a user from the shared cache, e.g. after they change.
+
+    Other processes' in-memory copies expire within LOCAL_USER_TIMEOUT seconds.
+    """
+    _local_users.pop(user_id, None)
+    cache.delete(_user_key(user_id))
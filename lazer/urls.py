@@ -5,7 +5,9 @@ from lazer import views
 urlpatterns = [
     path("api/submit/", views.submission_api, name="violation_submission_api"),
     path("api/report/", views.report_api, name="violation_report_api"),
+    path("api/batch/", views.batch_api, name="violation_batch_api"),
     path("api/login/", views.login_api, name="login_api"),
     path("api/logout/", views.logout_api, name="logout_api"),
     path("api/check-login/", views.check_login, name="check_login"),
+    path("export.<str:format>", views.export, name="violation_report_export"),
 ]
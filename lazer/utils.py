@@ -1,54 +1,127 @@
-from tempfile import TemporaryDirectory
+import logging
 
 import interactions
-from asgiref.sync import async_to_sync
 from django.conf import settings
+from django.forms.models import model_to_dict
+from django.urls import reverse
 from django.utils import timezone
 
+from lazer.integrations.browser_pool import run_in_browser_loop
 from lazer.integrations.submit_form import (
+    DirectSubmissionRejected,
     MobilityAccessViolation,
+    submit_form_direct,
     submit_form_with_playwright,
 )
+from lazer.models import ViolationReport
+from lazer.reporter_stats import record_submitted
 
+logger = logging.getLogger(__name__)
 
-def submit_violation_report_to_ppa(violation_report):
-    violation_report.screenshot_error.delete()
-    mobility_access_violation = MobilityAccessViolation(
-        make=violation_report.make,
-        model=violation_report.model,
-        body_style=violation_report.body_style,
-        vehicle_color=violation_report.vehicle_color,
-        violation_observed=violation_report.violation_observed,
-        occurrence_frequency=violation_report.occurrence_frequency,
-        additional_information=violation_report.additional_information,
+
+def violation_from_report(data):
+    """Build a MobilityAccessViolation from a ReportForm's cleaned_data."""
+    return MobilityAccessViolation(
+        make=data["make"],
+        model=data["model"],
+        body_style=data["body_style"],
+        vehicle_color=data["vehicle_color"],
+        violation_observed=data["violation_observed"],
+        occurrence_frequency=data["occurrence_frequency"],
+        additional_information=data["additional_information"],
         date_time_observed=None,
-        _date_observed=violation_report.date_observed,
-        _time_observed=violation_report.time_observed,
+        _date_observed=data["date_observed"],
+        _time_observed=data["time_observed"],
         address=None,
-        _block_number=violation_report.block_number,
-        _street_name=violation_report.street_name,
-        _zip_code=violation_report.zip_code,
+        _block_number=data["block_number"],
+        _street_name=data["street_name"],
+        _zip_code=data["zip_code"],
+    )
+
+
+def build_violation_report(submission, violation):
+    """Return an unsaved ViolationReport of `submission` for a MobilityAccessViolation."""
+    return ViolationReport(
+        submission=submission,
+        date_observed=violation.date_observed,
+        time_observed=violation.time_observed,
+        make=violation.make,
+        model=violation.model,
+        body_style=violation.body_style,
+        vehicle_color=violation.vehicle_color,
+        violation_observed=violation.violation_observed,
+        occurrence_frequency=violation.occurrence_frequency,
+        block_number=violation.block_number,
+        street_name=violation.street_name,
+        zip_code=violation.zip_code,
+        additional_information=violation.additional_information,
     )
-    with TemporaryDirectory() as temp_dir:
-        violation = async_to_sync(submit_form_with_playwright)(
+
+
+def submit_violation_report_to_ppa(violation_report, mode=None):
+    """
+    Submit a report to the PPA, via `mode` or settings.LAZER_PPA_SUBMIT_MODE.
+
+    In "direct" mode the form payload is posted without a browser, falling back to the
+    Playwright submission if Smartsheet doesn't confirm it or direct submissions aren't
+    configured.
+    """
+    was_submitted = violation_report.submitted is not None
+    violation_report.screenshot_error.delete()
+    mobility_access_violation = violation_from_report(model_to_dict(violation_report))
+    if (mode or settings.LAZER_PPA_SUBMIT_MODE) == "direct":
+        try:
+            run_in_browser_loop(
+                submit_form_direct(mobility_access_violation, violation_report.submission.image)
+            )
+        except DirectSubmissionRejected:
+            logger.warning(
+                "Direct submission of report %s rejected, falling back to Playwright",
+                violation_report.id,
+                exc_info=True,
+            )
+            violation_report.submission.image.seek(0)
+        else:
+            violation_report.submitted = timezone.now()
+            violation_report.save()
+            if not was_submitted:
+                record_submitted(violation_report)
+            return
+
+    violation = run_in_browser_loop(
+        submit_form_with_playwright(
             submission=violation_report.submission,
             violation=mobility_access_violation,
             photo=violation_report.submission.image,
-            screenshot_dir=temp_dir,
+            screenshots=True,
             violation_report=violation_report,
         )
-        violation.save()
+    )
+    violation.save()
+    if violation.submitted is not None and not was_submitted:
+        record_submitted(violation)
 
 
 def build_embed(violation_report):
-    embed = interactions.Embed(
-        title="Violation report from a new user submitted!",
-        description=(
-            "**New reporters need to be vetted.**\n\n"
-            "Review this report and click the Approve or Reject button below."
-        ),
-        timestamp=timezone.now(),
-    )
+    if violation_report.submission_state == ViolationReport.SubmissionState.DUPLICATE:
+        embed = interactions.Embed(
+            title="Likely duplicate violation report submitted!",
+            description=(
+                "**This looks like a violation that was already reported, so it won't be "
+                "submitted.**\n\n"
+                "Click Approve if it is a different violation, or Reject if it is the same."
+            ),
+            timestamp=timezone.now(),
+        )
+    else:
+        embed = interactions.Embed(
+            title="Violation report from a new user submitted!",
+            description=(
+                "**New reporters need to be vetted.**\n\n"
+                "Review this report and click the Approve or Reject button below."
+            ),
+            timestamp=timezone.now(),
+        )
     embed.add_field("Date Observed", violation_report.date_observed, inline=True)
     embed.add_field("Time Observed", violation_report.time_observed, inline=True)
     embed.add_field("\u200B", "\u200B", inline=True)
@@ -71,4 +144,11 @@ def build_embed(violation_report):
     embed.set_thumbnail(url=image_url)
     embed.add_field("View Image", f"[here]({image_url})")
 
+    if violation_report.submission.duplicate_of_id is not None:
+        original_url = reverse(
+            "admin:lazer_violationsubmission_change",
+            args=[violation_report.submission.duplicate_of_id],
+        )
+        embed.add_field("Likely Duplicate Of", f"[here]({settings.SITE_URL}{original_url})")
+
     return embed
@@ -1,43 +1,59 @@
 import asyncio
-import base64
 import datetime
 import json
-import secrets
 from functools import wraps
 from importlib import import_module
 
-import pytz
 from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import authenticate, get_user_model, login, logout
 from django.contrib.gis.geos import Point
-from django.core.files.base import ContentFile
-from django.core.paginator import Paginator
+from django.core.exceptions import ValidationError
 from django.db import transaction
-from django.http import JsonResponse
+from django.db.models import Count
+from django.http import (
+    Http404,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import render
 from django.utils import timezone
 from django.views.decorators.cache import cache_page
 from django.views.decorators.csrf import csrf_exempt
 
-from campaigns.admin import randomize_lat_long
+from facets.street_blocks import aresolve_street_block
 from facets.utils import reverse_geocode_point
+from lazer.batch import ingest_item
+from lazer.dedupe import find_duplicate
+from lazer.exports import CONTENT_TYPES, aexport_chunks, export_queryset
 from lazer.forms import ReportForm, SubmissionForm
+from lazer.heatmap import bin_points, binned_pins, jittered_pins, parse_bbox, parse_zoom
+from lazer.images import ingest_image
 from lazer.integrations.platerecognizer import read_plate
-from lazer.integrations.submit_form import MobilityAccessViolation
 from lazer.models import ViolationReport, ViolationSubmission
+from lazer.pin_store import DateRangeTooLong, pins_for_days, report_days
+from lazer.tokens import (
+    aauthenticate_token,
+    authenticate_token,
+    issue_token,
+    revoke_token,
+)
+from lazer.utils import build_violation_report, violation_from_report
+from pbaabp.pagination import KeysetPaginator
+from pbaabp.pins import pins_response
 
 SessionStore = import_module(settings.SESSION_ENGINE).SessionStore
 User = get_user_model()
 
 
-def get_image_from_data_url(data_url):
-    _format, _dataurl = data_url.split(";base64,")
-    _filename, _extension = secrets.token_hex(20), _format.split("/")[-1]
+async def _no_plate():
+    return {}
 
-    file = ContentFile(base64.b64decode(_dataurl), name=f"{_filename}.{_extension}")
 
-    return file, (_filename, _extension)
+async def _no_addresses():
+    return []
 
 
 @sync_to_async
@@ -50,9 +66,14 @@ def api_auth(view_func):
     def _wrapped_view(request, *args, **kwargs):
         if request.user.is_authenticated:
             return view_func(request, *args, **kwargs)
-        if "Authorization" in request.headers and request.headers["Authorization"].startswith(
-            "Session: "
-        ):
+        authorization = request.headers.get("Authorization", "")
+        if authorization.startswith("Token: "):
+            user = authenticate_token(authorization.split("Token: ")[1])
+            if user is not None:
+                request.user = user
+                return view_func(request, *args, **kwargs)
+        # Older app builds send their session key
+        elif authorization.startswith("Session: "):
             session_key = request.headers["Authorization"].split("Session: ")[1]
             session = SessionStore(session_key=session_key)
             request.session = session
@@ -73,9 +94,14 @@ def aapi_auth(view_func):
         _user = await request.auser()
         if _user.is_authenticated:
             return await view_func(request, *args, **kwargs)
-        if "Authorization" in request.headers and request.headers["Authorization"].startswith(
-            "Session: "
-        ):
+        authorization = request.headers.get("Authorization", "")
+        if authorization.startswith("Token: "):
+            user = await aauthenticate_token(authorization.split("Token: ")[1])
+            if user is not None:
+                request.user = user
+                return await view_func(request, *args, **kwargs)
+        # Older app builds send their session key
+        elif authorization.startswith("Session: "):
             session_key = request.headers["Authorization"].split("Session: ")[1]
             session = SessionStore(session_key=session_key)
             request.session = session
@@ -97,29 +123,50 @@ async def submission_api(request):
     if request.method == "POST":
         form = SubmissionForm(request.POST)
         if form.is_valid():
-            image, _ = get_image_from_data_url(form.cleaned_data["image"])
+            try:
+                image = await sync_to_async(ingest_image, thread_sensitive=False)(
+                    form.cleaned_data["image"]
+                )
+            except ValidationError:
+                return JsonResponse({}, status=400)
             user = await get_user_from_request(request)
 
+            location = Point(
+                float(form.cleaned_data["longitude"]), float(form.cleaned_data["latitude"])
+            )
+            duplicate_of = await find_duplicate(
+                location, form.cleaned_data["datetime"], image.hash
+            )
             submission = ViolationSubmission(
-                image=image,
-                location=Point(
-                    float(form.cleaned_data["longitude"]), float(form.cleaned_data["latitude"])
-                ),
+                image=image.file,
+                image_hash=image.hash,
+                duplicate_of=duplicate_of,
+                location=location,
                 captured_at=form.cleaned_data["datetime"],
                 created_by=user,
             )
             await submission.asave()
             await submission.arefresh_from_db()
 
-            data, addresses = await asyncio.gather(
-                read_plate(
-                    form.cleaned_data["image"].split(";base64,")[1],
-                    datetime.datetime.now(datetime.timezone.utc),
-                ),
-                reverse_geocode_point(
+            # No need to read the plate of a violation that has already been photographed
+            if duplicate_of is None:
+                plate_read = read_plate(image.upload, datetime.datetime.now(datetime.timezone.utc))
+            else:
+                plate_read = _no_plate()
+            # Reverse geocoding is only a fallback for points away from known street blocks
+            block = await aresolve_street_block(location.x, location.y)
+            if block is None:
+                geocode = reverse_geocode_point(
                     f"{form.cleaned_data['latitude']}, {form.cleaned_data['longitude']}",
                     exactly_one=False,
-                ),
+                )
+            else:
+                geocode = _no_addresses()
+            data, addresses = await asyncio.gather(plate_read, geocode)
+            addresses = (
+                [block.address]
+                if block is not None
+                else [address.address for address in addresses]
             )
 
             vehicles = data.get("results", [])
@@ -132,10 +179,11 @@ async def submission_api(request):
                             reverse=True,
                         )[:4]
                     ),
-                    "addresses": [address.address for address in addresses],
-                    "address": addresses[0].address,
+                    "addresses": addresses,
+                    "address": addresses[0],
                     "timestamp": form.cleaned_data["datetime"],
                     "submissionId": submission.submission_id,
+                    "duplicateOf": duplicate_of and duplicate_of.submission_id,
                 },
                 status=200,
             )
@@ -159,37 +207,8 @@ async def report_api(request):
                     status=400,
                 )
 
-            mobility_access_violation = MobilityAccessViolation(
-                make=form.cleaned_data["make"],
-                model=form.cleaned_data["model"],
-                body_style=form.cleaned_data["body_style"],
-                vehicle_color=form.cleaned_data["vehicle_color"],
-                violation_observed=form.cleaned_data["violation_observed"],
-                occurrence_frequency=form.cleaned_data["occurrence_frequency"],
-                additional_information=form.cleaned_data["additional_information"],
-                date_time_observed=None,
-                _date_observed=form.cleaned_data["date_observed"],
-                _time_observed=form.cleaned_data["time_observed"],
-                address=None,
-                _block_number=form.cleaned_data["block_number"],
-                _street_name=form.cleaned_data["street_name"],
-                _zip_code=form.cleaned_data["zip_code"],
-            )
-
-            violation_report = ViolationReport(
-                submission=submission,
-                date_observed=mobility_access_violation.date_observed,
-                time_observed=mobility_access_violation.time_observed,
-                make=mobility_access_violation.make,
-                model=mobility_access_violation.model,
-                body_style=mobility_access_violation.body_style,
-                vehicle_color=mobility_access_violation.vehicle_color,
-                violation_observed=mobility_access_violation.violation_observed,
-                occurrence_frequency=mobility_access_violation.occurrence_frequency,
-                block_number=mobility_access_violation.block_number,
-                street_name=mobility_access_violation.street_name,
-                zip_code=mobility_access_violation.zip_code,
-                additional_information=mobility_access_violation.additional_information,
+            violation_report = build_violation_report(
+                submission, violation_from_report(form.cleaned_data)
             )
 
             await violation_report.asave()
@@ -204,6 +223,36 @@ async def report_api(request):
             return JsonResponse({"submitted": False}, status=400)
 
 
+@aapi_auth
+@csrf_exempt
+@transaction.non_atomic_requests
+async def batch_api(request):
+    """
+    Store several submission and report pairs from one multipart request.
+
+    The "items" field is a JSON list of objects with a "key", the name of their "image" file
+    part, "latitude", "longitude", "datetime" and a "report" object of report_api's fields.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "POST only"}, status=400)
+    try:
+        items = json.loads(request.POST["items"])
+    except (KeyError, json.JSONDecodeError):
+        return JsonResponse({"error": "items must be a JSON list"}, status=400)
+    if not isinstance(items, list) or len(items) > settings.LAZER_BATCH_MAX_ITEMS:
+        return JsonResponse(
+            {"error": f"items must be a list of at most {settings.LAZER_BATCH_MAX_ITEMS}"},
+            status=400,
+        )
+
+    user = await get_user_from_request(request)
+    semaphore = asyncio.Semaphore(settings.LAZER_BATCH_CONCURRENCY)
+    results = await asyncio.gather(
+        *(ingest_item(item, request.FILES, user, semaphore) for item in items)
+    )
+    return JsonResponse({"results": results}, status=200)
+
+
 @cache_page(30)
 def map_data(request):
     violation_filter = request.GET.get("violation", None)
@@ -211,44 +260,72 @@ def map_data(request):
     date_lte = request.GET.get("date_lte", None)
     date = request.GET.get("date", None)
 
-    pins = []
-    queryset = ViolationReport.objects.filter(submitted__isnull=False).select_related("submission")
+    zoom = parse_zoom(request.GET.get("zoom"))
+    bbox = parse_bbox(request.GET.get("bbox"))
+
+    if date or date_gte or date_lte:
+        try:
+            days = report_days(date, date_gte, date_lte)
+        except DateRangeTooLong as err:
+            return HttpResponseBadRequest(str(err))
+        except ValueError:
+            return HttpResponseBadRequest("Dates must be YYYY-MM-DD")
+        # Date windows are answered by merging the cached pins of each day
+        pins = pins_for_days(days)
+        if violation_filter:
+            cutoff = timezone.now() - datetime.timedelta(minutes=15)
+            pins = [
+                pin
+                for pin in pins
+                if pin.violation_observed.startswith(violation_filter) and pin.captured_at < cutoff
+            ]
+        totals = {
+            "count": len(pins),
+            "unique_users_count": len({pin.created_by_id for pin in pins if pin.created_by_id}),
+        }
+        if request.GET.get("mode") == "pins":
+            pins = [[pin.jittered_lat, pin.jittered_lng, 1] for pin in pins]
+        else:
+            pins = bin_points([(pin.lat, pin.lng) for pin in pins], zoom, bbox)
+        return pins_response(request, pins, **totals)
+
+    queryset = ViolationReport.objects.filter(submitted__isnull=False)
     if violation_filter:
         queryset = queryset.filter(violation_observed__startswith=violation_filter).filter(
             submission__captured_at__lt=timezone.now() - datetime.timedelta(minutes=15)
         )
 
-    if date:
-        queryset = queryset.filter(
-            submission__captured_at__date=datetime.datetime.strptime(date, "%Y-%m-%d")
-            .astimezone(pytz.timezone("America/New_York"))
-            .date()
-        )
+    # Count reports and unique users who submitted violations
+    totals = queryset.aggregate(
+        count=Count("id"), unique_users_count=Count("submission__created_by", distinct=True)
+    )
+
+    if request.GET.get("mode") == "pins":
+        pins = jittered_pins(queryset)
     else:
-        if date_gte:
-            queryset = queryset.filter(
-                submission__captured_at__gte=datetime.datetime.strptime(date_gte, "%Y-%m-%d")
-                .astimezone(pytz.timezone("America/New_York"))
-                .date()
-            )
-        if date_lte:
-            queryset = queryset.filter(
-                submission__captured_at__lte=datetime.datetime.strptime(date_lte, "%Y-%m-%d")
-                .astimezone(pytz.timezone("America/New_York"))
-                .date()
-            )
+        pins = binned_pins(queryset, zoom, bbox)
+
+    return pins_response(request, pins, **totals)
 
-    # Count unique users who submitted violations
-    unique_users = set()
-    for report in queryset.only("submission__location", "submission__created_by").all():
-        if report.submission.created_by_id:
-            unique_users.add(report.submission.created_by_id)
-        lat, lng = randomize_lat_long(
-            report.id, *(report.submission.location.y, report.submission.location.x)
-        )
-        pins.append([lat, lng, 1])
 
-    return JsonResponse({"pins": pins, "unique_users_count": len(unique_users)}, safe=False)
+@staff_member_required
+def export(request, format):
+    if format not in CONTENT_TYPES:
+        raise Http404
+    try:
+        queryset = export_queryset(
+            violation=request.GET.get("violation"),
+            date=request.GET.get("date"),
+            date_gte=request.GET.get("date_gte"),
+            date_lte=request.GET.get("date_lte"),
+        )
+    except ValueError:
+        return HttpResponseBadRequest("Dates must be YYYY-MM-DD")
+    response = StreamingHttpResponse(
+        aexport_chunks(queryset, format), content_type=CONTENT_TYPES[format]
+    )
+    response["Content-Disposition"] = f'attachment; filename="violation-reports.{format}"'
+    return response
 
 
 def map(request):
@@ -256,15 +333,9 @@ def map(request):
 
 
 def list(request):
-    queryset = (
-        ViolationReport.objects.filter(submitted__isnull=False)
-        .select_related("submission")
-        .order_by("-submission__captured_at")
-        .all()
-    )
-    paginator = Paginator(queryset, 20)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    queryset = ViolationReport.objects.filter(submitted__isnull=False).select_related("submission")
+    paginator = KeysetPaginator(queryset, 20, ["-submission__captured_at", "-pk"])
+    page_obj = paginator.get_page(request.GET.get("cursor"))
     return render(request, "list.html", {"page_obj": page_obj})
 
 
@@ -296,6 +367,7 @@ def login_api(request):
         request.session.set_expiry(30 * 24 * 60 * 60)
         session_key = request.session.session_key
         expiry_date = request.session.get_expiry_date()
+        token, token_expiry_date = issue_token(user)
         return JsonResponse(
             {
                 "success": "ok",
@@ -303,6 +375,8 @@ def login_api(request):
                 "first_name": request.user.first_name,
                 "session_key": session_key,
                 "expiry_date": expiry_date,
+                "token": token,
+                "token_expiry_date": token_expiry_date,
                 "donor": request.user.profile.donor(),
             },
             status=200,
@@ -324,5 +398,8 @@ def check_login(request):
 
 
 def logout_api(request):
+    authorization = request.headers.get("Authorization", "")
+    if authorization.startswith("Token: "):
+        revoke_token(authorization.split("Token: ")[1])
     logout(request)
     return JsonResponse({"success": "ok"}, status=200)
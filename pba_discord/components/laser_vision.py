@@ -1,5 +1,6 @@
 import re
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from interactions import Extension, component_callback
 from redis.asyncio import Redis
@@ -7,7 +8,8 @@ from redis_lock.asyncio import RedisLock
 from redis_lock.exceptions import AcquireFailedError
 
 from lazer.models import ViolationReport
-from lazer.tasks import submit_violation_report_to_ppa
+from lazer.reporter_stats import record_rejected
+from lazer.tasks import queue_violation_report_for_ppa
 from lazer.utils import build_embed
 
 
@@ -40,12 +42,14 @@ class LaserVision(Extension):
                     await ctx.edit_origin(components=[])
                     return
 
-                submit_violation_report_to_ppa.delay(violation_report.id)
+                await sync_to_async(queue_violation_report_for_ppa)(violation_report.id)
 
                 embed = build_embed(violation_report)
                 embed.description = f"**VIOLATION REPORT APPROVED by {ctx.member}**"
                 await ctx.edit_origin(embeds=[embed], components=[])
-                await ctx.send("Violation report approved and submitted!", ephemeral=True)
+                await ctx.send(
+                    "Violation report approved and queued for submission!", ephemeral=True
+                )
         except AcquireFailedError:
             await ctx.send("Another user has already responded", ephemeral=True)
 
@@ -73,6 +77,10 @@ class LaserVision(Extension):
                     await ctx.edit_origin(components=[])
                     return
 
+                if violation_report.submission_state != ViolationReport.SubmissionState.DUPLICATE:
+                    # Reporting a violation someone else already did isn't held against them
+                    await sync_to_async(record_rejected)(violation_report)
+
                 embed = build_embed(violation_report)
                 embed.description = f"**VIOLATION REPORT REJECTED by {ctx.member}**"
                 await ctx.edit_origin(embeds=[embed], components=[])
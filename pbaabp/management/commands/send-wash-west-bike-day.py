@@ -14,7 +14,7 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         settings.EMAIL_SUBJECT_PREFIX = ""
-        for profile in _rco.contained_profiles.all():
+        for profile in _rco.member_profiles().select_related("user"):
             send_email_message(
                 "wash-west-bike-day",
                 "Philly Bike Action <noreply@bikeaction.org>",
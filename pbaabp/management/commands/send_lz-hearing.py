@@ -21,9 +21,13 @@ class Command(BaseCommand):
 
     def handle(*args, **kwargs):
         settings.EMAIL_SUBJECT_PREFIX = ""
-        for profile in Profile.objects.all():
+        d1_profiles = set(district1.member_profiles().values_list("id", flat=True))
+        d2_profiles = set(district2.member_profiles().values_list("id", flat=True))
+        d3_profiles = set(district3.member_profiles().values_list("id", flat=True))
+        d5_profiles = set(district5.member_profiles().values_list("id", flat=True))
+        for profile in Profile.objects.select_related("user"):
             if profile.user.email not in SENT and profile.location is not None:
-                if district1.mpoly.contains(profile.location):
+                if profile.id in d1_profiles:
                     send_email_message(
                         "lz-hearing/d1-d2-d5",
                         "Philly Bike Action <noreply@bikeaction.org>",
@@ -35,7 +39,7 @@ class Command(BaseCommand):
                     )
                     SENT_D1.append(profile.user.email.lower())
                     SENT.append(profile.user.email.lower())
-                elif district2.mpoly.contains(profile.location):
+                elif profile.id in d2_profiles:
                     send_email_message(
                         "lz-hearing/d1-d2-d5",
                         "Philly Bike Action <noreply@bikeaction.org>",
@@ -47,7 +51,7 @@ class Command(BaseCommand):
                     )
                     SENT_D2.append(profile.user.email.lower())
                     SENT.append(profile.user.email.lower())
-                elif district5.mpoly.contains(profile.location):
+                elif profile.id in d5_profiles:
                     send_email_message(
                         "lz-hearing/d1-d2-d5",
                         "Philly Bike Action <noreply@bikeaction.org>",
@@ -59,7 +63,7 @@ class Command(BaseCommand):
                     )
                     SENT_D5.append(profile.user.email.lower())
                     SENT.append(profile.user.email.lower())
-                elif district3.mpoly.contains(profile.location):
+                elif profile.id in d3_profiles:
                     send_email_message(
                         "lz-hearing/d3",
                         "Philly Bike Action <noreply@bikeaction.org>",
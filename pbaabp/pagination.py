@@ -0,0 +1,132 @@
+import functools
+from collections.abc import Sequence
+
+from django.core import signing
+from django.db.models import Q
+
+CURSOR_SALT = "pbaabp.pagination"
+
+
+def _cursor_value(value):
+    if isinstance(value, (int, str)) or value is None:
+        return value
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class KeysetPage(Sequence):
+    """
+    A page from KeysetPaginator, with the has_next and has_previous of Django's Page.
+
+    Links to neighbouring pages use next_cursor and previous_cursor in place of page numbers.
+    """
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f"<KeysetPage of {len(self)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return self.paginator.cursor(self.object_list[-1], before=False)
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return self.paginator.cursor(self.object_list[0], before=True)
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset by seeking past the last row shown, rather than with OFFSET.
+
+    `ordering` is a list of fields as for order_by, ending in a unique one such as "-pk" so
+    rows never tie, and none of which may be null. Each page is one query for per_page + 1
+    rows after (or before) an opaque, signed cursor, so deep pages cost the same as the
+    first and nothing is counted.
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = ordering
+        self.keys = [(field.lstrip("-"), field.startswith("-")) for field in ordering]
+
+    def cursor(self, obj, before):
+        values = [
+            _cursor_value(functools.reduce(getattr, field.split("__"), obj))
+            for field, _descending in self.keys
+        ]
+        return signing.dumps({"k": values, "b": before}, salt=CURSOR_SALT)
+
+    @property
+    def last_cursor(self):
+        """Cursor of the page at the end of the ordering."""
+        return signing.dumps({"k": None, "b": True}, salt=CURSOR_SALT)
+
+    def _seek(self, values, before):
+        # (a, b) after (x, y) is a > x OR (a = x AND b > y), reversed for descending
+        # fields. The leading field's bound is repeated outside the OR so the database
+        # can range scan an index on it.
+        condition = Q()
+        equal = {}
+        for (field, descending), value in zip(self.keys, values):
+            lookup = "lt" if descending != before else "gt"
+            condition |= Q(**equal, **{f"{field}__{lookup}": value})
+            equal[field] = value
+        field, descending = self.keys[0]
+        lookup = "lte" if descending != before else "gte"
+        return Q(**{f"{field}__{lookup}": values[0]}) & condition
+
+    def _load(self, cursor):
+        try:
+            payload = signing.loads(cursor, salt=CURSOR_SALT)
+        except signing.BadSignature:
+            return None, False
+        values = payload.get("k")
+        if values is not None and len(values) != len(self.keys):
+            return None, False
+        return values, bool(payload.get("b"))
+
+    def get_page(self, cursor=None):
+        """Return the page at `cursor`, or the first page for a missing or invalid one."""
+        values, before = self._load(cursor) if cursor else (None, False)
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, before))
+        if before:
+            ordering = [
+                field[1:] if field.startswith("-") else f"-{field}" for field in self.ordering
+            ]
+        else:
+            ordering = self.ordering
+        rows = list(queryset.order_by(*ordering)[: self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if before:
+            rows.reverse()
+            return KeysetPage(rows, self, has_next=values is not None, has_previous=more)
+        return KeysetPage(rows, self, has_next=more, has_previous=values is not None)
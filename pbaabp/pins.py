@@ -0,0 +1,68 @@
+import struct
+import sys
+from array import array
+
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import patch_vary_headers
+
+PINS_CONTENT_TYPE = "application/octet-stream"
+# Coordinates are stored as integer millionths of a degree, roughly 10cm
+PINS_SCALE = 1_000_000
+
+
+def _little_endian(values):
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def encode_pins(pins):
+    """
+    Pack [lat, lng, weight] pins into the compact binary format read by static/js/pins.js.
+
+    Layout (little endian): uint32 count, uint32 scale, then count Int32 latitude deltas,
+    count Int32 longitude deltas and count Float32 weights. Coordinates are multiplied by
+    scale and rounded. Pins are sorted first so consecutive deltas stay small, which also
+    lets the response compress well.
+    """
+    quantized = sorted(
+        (round(lat * PINS_SCALE), round(lng * PINS_SCALE), weight) for lat, lng, weight in pins
+    )
+    lats, lngs, weights = array("i"), array("i"), array("f")
+    last_lat = last_lng = 0
+    for lat, lng, weight in quantized:
+        lats.append(lat - last_lat)
+        lngs.append(lng - last_lng)
+        weights.append(weight)
+        last_lat, last_lng = lat, lng
+    return b"".join(
+        [
+            struct.pack("<II", len(quantized), PINS_SCALE),
+            _little_endian(lats),
+            _little_endian(lngs),
+            _little_endian(weights),
+        ]
+    )
+
+
+def wants_binary_pins(request):
+    return request.GET.get("format") == "binary" or PINS_CONTENT_TYPE in request.headers.get(
+        "Accept", ""
+    )
+
+
+def pins_response(request, pins, **extra):
+    """
+    Respond with `pins` as JSON, or in the binary format if the request asked for it.
+
+    `extra` values are added to the JSON body, or sent as X-Pins-<Name> headers alongside
+    the binary body.
+    """
+    if wants_binary_pins(request):
+        response = HttpResponse(encode_pins(pins), content_type=PINS_CONTENT_TYPE)
+        for name, value in extra.items():
+            response[f"X-Pins-{name.replace('_', '-').title()}"] = str(value)
+    else:
+        response = JsonResponse({"pins": pins, **extra}, safe=False)
+    patch_vary_headers(response, ["Accept"])
+    return response
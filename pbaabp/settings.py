@@ -1,6 +1,7 @@
 from pathlib import Path
 
 import environ
+from celery.schedules import crontab
 
 env = environ.Env()
 
@@ -301,7 +302,17 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # Celery
 CELERY_BROKER_URL = _REDIS_URL
 CELERY_RESULT_BACKEND = _REDIS_URL
-CELERY_BEAT_SCHEDULE = {}
+CELERY_BEAT_SCHEDULE = {
+    "rollup-email-activity": {
+        "task": "profiles.tasks.rollup_email_activity",
+        "schedule": crontab(hour=3, minute=15),
+    },
+    # Picks up retries should the PPA submission queue's own wake ups go missing
+    "drain-ppa-submissions": {
+        "task": "lazer.tasks.drain_ppa_submissions",
+        "schedule": crontab(),
+    },
+}
 
 # MAIL
 # ------------------------------------------------------------------------------
@@ -447,8 +458,68 @@ DISCORD_CONNECTED_ROLE_ID = env("DISCORD_CONNECTED_ROLE_ID", default=None)
 # Google Maps
 GOOGLE_MAPS_API_KEY = env("GOOGLE_MAPS_API_KEY", default=None)
 
+# Geocoding cache, see facets.utils
+GEOCODE_CACHE_ENABLED = env.bool("GEOCODE_CACHE_ENABLED", default=True)
+GEOCODE_CACHE_TIMEOUT = env.int("GEOCODE_CACHE_TIMEOUT", default=30 * 24 * 60 * 60)
+GEOCODE_CACHE_REVERSE_PRECISION = env.int("GEOCODE_CACHE_REVERSE_PRECISION", default=4)
+GEOCODE_BULK_REQUESTS_PER_SECOND = env.float("GEOCODE_BULK_REQUESTS_PER_SECOND", default=10.0)
+GEOCODE_BULK_CONCURRENCY = env.int("GEOCODE_BULK_CONCURRENCY", default=5)
+
 # https://app.platerecognizer.com/service/snapshot-cloud/
 PLATERECOGNIZER_API_KEY = env("PLATERECOGNIZER_API_KEY", default=None)
+PLATERECOGNIZER_URL = env(
+    "PLATERECOGNIZER_URL", default="https://api.platerecognizer.com/v1/plate-reader/"
+)
+PLATERECOGNIZER_TIMEOUT = env.float("PLATERECOGNIZER_TIMEOUT", default=10.0)
+PLATERECOGNIZER_CONNECT_TIMEOUT = env.float("PLATERECOGNIZER_CONNECT_TIMEOUT", default=3.0)
+PLATERECOGNIZER_CACHE_TIMEOUT = env.int("PLATERECOGNIZER_CACHE_TIMEOUT", default=24 * 60 * 60)
+PLATERECOGNIZER_CIRCUIT_FAILURES = env.int("PLATERECOGNIZER_CIRCUIT_FAILURES", default=5)
+PLATERECOGNIZER_CIRCUIT_RESET = env.int("PLATERECOGNIZER_CIRCUIT_RESET", default=60)
+
+# Longest date range map_data answers from the per-day pin store, see lazer.pin_store
+LAZER_MAP_MAX_DAYS = env.int("LAZER_MAP_MAX_DAYS", default=400)
+
+# Laser Vision batch uploads, see lazer.batch
+LAZER_BATCH_MAX_ITEMS = env.int("LAZER_BATCH_MAX_ITEMS", default=25)
+LAZER_BATCH_CONCURRENCY = env.int("LAZER_BATCH_CONCURRENCY", default=4)
+# Rows fetched per server side cursor round trip by violation report exports
+LAZER_EXPORT_CHUNK_SIZE = env.int("LAZER_EXPORT_CHUNK_SIZE", default=2000)
+# Signed Laser Vision API tokens, see lazer.tokens
+LAZER_API_TOKEN_MAX_AGE = env.int("LAZER_API_TOKEN_MAX_AGE", default=30 * 24 * 60 * 60)
+LAZER_API_USER_CACHE_TIMEOUT = env.int("LAZER_API_USER_CACHE_TIMEOUT", default=60)
+
+# Laser Vision submission images, see lazer.images
+LAZER_MAX_IMAGE_BYTES = env.int("LAZER_MAX_IMAGE_BYTES", default=10 * 1024 * 1024)
+LAZER_IMAGE_MAX_DIMENSION = env.int("LAZER_IMAGE_MAX_DIMENSION", default=2048)
+LAZER_IMAGE_QUALITY = env.int("LAZER_IMAGE_QUALITY", default=85)
+LAZER_KEEP_ORIGINAL_IMAGE = env.bool("LAZER_KEEP_ORIGINAL_IMAGE", default=False)
+# Warm Chromium browsers for PPA form submission, see lazer.integrations.browser_pool
+LAZER_BROWSER_POOL_SIZE = env.int("LAZER_BROWSER_POOL_SIZE", default=1)
+LAZER_BROWSER_MAX_USES = env.int("LAZER_BROWSER_MAX_USES", default=50)
+# Screenshots kept from Playwright submissions: "all", "errors" (error and final) or "none",
+# as "png" or "jpeg"
+LAZER_SCREENSHOT_POLICY = env("LAZER_SCREENSHOT_POLICY", default="all")
+LAZER_SCREENSHOT_FORMAT = env("LAZER_SCREENSHOT_FORMAT", default="png")
+LAZER_SCREENSHOT_QUALITY = env.int("LAZER_SCREENSHOT_QUALITY", default=70)
+# Submissions this close in meters and seconds, with images within this many bits of
+# perceptual hash, are flagged as duplicates, see lazer.dedupe
+LAZER_DUPLICATE_DISTANCE = env.int("LAZER_DUPLICATE_DISTANCE", default=30)
+LAZER_DUPLICATE_WINDOW = env.int("LAZER_DUPLICATE_WINDOW", default=60 * 30)
+LAZER_DUPLICATE_HASH_DISTANCE = env.int("LAZER_DUPLICATE_HASH_DISTANCE", default=10)
+# "playwright" fills in the PPA form in a browser, "direct" posts its payload over HTTP
+LAZER_PPA_SUBMIT_MODE = env("LAZER_PPA_SUBMIT_MODE", default="playwright")
+# Smartsheet form field ids by label, and text found in the response to a successful
+# submission, both recorded from a browser submission. Direct submissions are refused until
+# they are set.
+PPA_SMARTSHEET_FIELD_IDS = env.json("PPA_SMARTSHEET_FIELD_IDS", default={})
+PPA_SMARTSHEET_SUBMIT_CONFIRMATION = env("PPA_SMARTSHEET_SUBMIT_CONFIRMATION", default="")
+# PPA submission scheduler, see lazer.scheduler. Reports per minute and burst size,
+# then retries back off from LAZER_PPA_SUBMIT_RETRY_DELAY seconds before dead lettering
+LAZER_PPA_SUBMIT_RATE = env.float("LAZER_PPA_SUBMIT_RATE", default=4)
+LAZER_PPA_SUBMIT_BURST = env.int("LAZER_PPA_SUBMIT_BURST", default=3)
+LAZER_PPA_SUBMIT_MAX_ATTEMPTS = env.int("LAZER_PPA_SUBMIT_MAX_ATTEMPTS", default=5)
+LAZER_PPA_SUBMIT_RETRY_DELAY = env.int("LAZER_PPA_SUBMIT_RETRY_DELAY", default=60)
+LAZER_PPA_SUBMIT_RETRY_MAX_DELAY = env.int("LAZER_PPA_SUBMIT_RETRY_MAX_DELAY", default=60 * 60)
 
 NEW_LASER_VIOLATION_GUILD_ID = env("NEW_LASER_VIOLATION_GUILD_ID", default=None)
 NEW_LASER_VIOLATION_CHANNEL_ID = env("NEW_LASER_VIOLATION_CHANNEL_ID", default=None)
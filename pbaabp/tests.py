@@ -0,0 +1,101 @@
+import datetime
+import json
+import struct
+from array import array
+from itertools import accumulate
+
+from django.contrib.gis.geos import Point
+from django.core.files.base import ContentFile
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.utils import timezone
+
+from lazer.models import ViolationSubmission
+from pbaabp.pagination import KeysetPaginator
+from pbaabp.pins import PINS_CONTENT_TYPE, PINS_SCALE, encode_pins, pins_response
+
+
+def decode_pins(buffer):
+    """Python version of decodePins in static/js/pins.js."""
+    count, scale = struct.unpack_from("<II", buffer)
+    values = array("i", buffer[8 : 8 + count * 8])
+    weights = array("f", buffer[8 + count * 8 :])
+    lats = [value / scale for value in accumulate(values[:count])]
+    lngs = [value / scale for value in accumulate(values[count:])]
+    return [[lat, lng, weight] for lat, lng, weight in zip(lats, lngs, weights)]
+
+
+class PinsTestCase(SimpleTestCase):
+    def setUp(self):
+        self.pins = [[39.952583, -75.165222, 1.0], [39.9, -75.2, 0.5], [40.05, -75.01, 3.0]]
+
+    def test_round_trip(self):
+        buffer = encode_pins(self.pins)
+
+        self.assertEqual(len(buffer), 8 + len(self.pins) * 12)
+        decoded = decode_pins(buffer)
+        self.assertEqual(len(decoded), len(self.pins))
+        for (lat, lng, weight), expected in zip(decoded, sorted(self.pins)):
+            self.assertAlmostEqual(lat, expected[0], delta=1 / PINS_SCALE)
+            self.assertAlmostEqual(lng, expected[1], delta=1 / PINS_SCALE)
+            self.assertEqual(weight, expected[2])
+
+    def test_empty(self):
+        self.assertEqual(decode_pins(encode_pins([])), [])
+
+    def test_binary_response(self):
+        request = RequestFactory().get("/", headers={"Accept": PINS_CONTENT_TYPE})
+
+        response = pins_response(request, self.pins, count=3, unique_users_count=2)
+
+        self.assertEqual(response["Content-Type"], PINS_CONTENT_TYPE)
+        self.assertEqual(response["X-Pins-Count"], "3")
+        self.assertEqual(response["X-Pins-Unique-Users-Count"], "2")
+        self.assertEqual(len(decode_pins(response.content)), 3)
+        self.assertIn("Accept", response["Vary"])
+
+    def test_json_response(self):
+        response = pins_response(RequestFactory().get("/"), self.pins, count=3)
+
+        self.assertEqual(json.loads(response.content), {"pins": self.pins, "count": 3})
+
+
+class KeysetPaginatorTestCase(TestCase):
+    def setUp(self):
+        now = timezone.now().replace(microsecond=0)
+        # Pairs share a captured_at, so pages have to break ties on pk
+        self.submissions = [
+            ViolationSubmission.objects.create(
+                captured_at=now - datetime.timedelta(minutes=i // 2),
+                location=Point(-75.16, 39.95),
+                image=ContentFile(b"jpeg bytes", name="photo.jpg"),
+            )
+            for i in range(7)
+        ]
+        self.paginator = KeysetPaginator(
+            ViolationSubmission.objects.all(), 3, ["-captured_at", "-pk"]
+        )
+        self.expected = sorted(self.submissions, key=lambda s: (s.captured_at, s.pk), reverse=True)
+
+    def test_walks_forward_and_back(self):
+        first = self.paginator.get_page()
+        second = self.paginator.get_page(first.next_cursor)
+        third = self.paginator.get_page(second.next_cursor)
+
+        self.assertEqual(list(first) + list(second) + list(third), self.expected)
+        self.assertFalse(first.has_previous())
+        self.assertTrue(second.has_previous() and second.has_next())
+        self.assertFalse(third.has_next())
+        self.assertEqual(list(self.paginator.get_page(third.previous_cursor)), list(second))
+        self.assertEqual(list(self.paginator.get_page(second.previous_cursor)), list(first))
+
+    def test_last_page(self):
+        last = self.paginator.get_page(self.paginator.last_cursor)
+
+        self.assertEqual(list(last), self.expected[-3:])
+        self.assertFalse(last.has_next())
+        self.assertTrue(last.has_previous())
+
+    def test_invalid_cursor_is_first_page(self):
+        page = self.paginator.get_page("not a cursor")
+
+        self.assertEqual(list(page), self.expected[:3])
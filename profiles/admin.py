@@ -4,8 +4,8 @@ import datetime
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
-from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Value
-from django.db.models.functions import Coalesce
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Lower
 from django.http import HttpResponse
 from django.utils import timezone
 from django.utils.safestring import mark_safe
@@ -13,7 +13,15 @@ from email_log.models import Email
 
 from facets.models import District, RegisteredCommunityOrganization
 from pbaabp.admin import ReadOnlyLeafletGeoAdminMixin
-from profiles.models import DiscordActivity, DoNotEmail, Profile, ShirtOrder
+from profiles.email_activity import email_counts_by_date
+from profiles.models import (
+    DiscordActivity,
+    DoNotEmail,
+    EmailActivityDay,
+    Profile,
+    ShirtOrder,
+)
+from profiles.tasks import bulk_geocode_profiles
 
 
 class ProfileCompleteFilter(admin.SimpleListFilter):
@@ -227,7 +235,7 @@ class DistrictFilter(admin.SimpleListFilter):
     def queryset(self, request, queryset):
         if self.value():
             d = District.objects.get(id=self.value())
-            return queryset.filter(location__within=d.mpoly)
+            return queryset.filter(id__in=d.member_profiles().values("id"))
         return queryset
 
 
@@ -243,7 +251,7 @@ class RCOFilter(admin.SimpleListFilter):
     def queryset(self, request, queryset):
         if self.value():
             r = RegisteredCommunityOrganization.objects.get(id=self.value())
-            return queryset.filter(location__within=r.mpoly)
+            return queryset.filter(id__in=r.member_profiles().values("id"))
         return queryset
 
 
@@ -255,14 +263,23 @@ class EmailHistory:
 
     def get_emails(self):
         if self.profile and self.profile.user.email:
-            return Email.objects.filter(recipients__icontains=self.profile.user.email).order_by(
-                "-date_sent"
-            )[
+            return Email.objects.filter(
+                recipient_index__recipient=self.profile.user.email.lower()
+            ).order_by("-date_sent")[
                 :50
             ]  # Show last 50 emails
         return Email.objects.none()
 
 
+@admin.action(description="Geocode selected profiles without a location")
+def geocode(modeladmin, request, queryset):
+    profile_ids = [
+        str(pk) for pk in queryset.filter(location__isnull=True).values_list("id", flat=True)
+    ]
+    if profile_ids:
+        bulk_geocode_profiles.delay(profile_ids)
+
+
 class ProfileAdmin(ReadOnlyLeafletGeoAdminMixin, admin.ModelAdmin):
     list_display = [
         "_name",
@@ -296,22 +313,23 @@ class ProfileAdmin(ReadOnlyLeafletGeoAdminMixin, admin.ModelAdmin):
         "street_address",
     ]
     autocomplete_fields = ("user",)
+    actions = [geocode]
 
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
         queryset = queryset.select_related("user")
 
-        # Use a subquery to count emails efficiently
-        thirty_days_ago = timezone.now() - datetime.timedelta(days=30)
+        # Use a subquery over the daily rollup to count emails efficiently
+        thirty_days_ago = timezone.localdate() - datetime.timedelta(days=30)
 
         # Create subquery that counts emails for each user
         email_count_subquery = Subquery(
-            Email.objects.filter(
-                recipients__icontains=OuterRef("user__email"), date_sent__gte=thirty_days_ago
+            EmailActivityDay.objects.filter(
+                recipient=Lower(OuterRef("user__email")), date__gte=thirty_days_ago
             )
-            .values("recipients")
-            .annotate(count=Count("*"))
-            .values("count")[:1],
+            .values("recipient")
+            .annotate(total=Sum("count"))
+            .values("total")[:1],
             output_field=IntegerField(),
         )
 
@@ -456,17 +474,9 @@ class ProfileAdmin(ReadOnlyLeafletGeoAdminMixin, admin.ModelAdmin):
             timezone.now().date() - datetime.timedelta(days=(30 - i)) for i in range(31)
         ]
 
-        # Query emails for the last 90 days
+        # Daily email counts for the last 90 days
         ninety_days_ago = timezone.now().date() - datetime.timedelta(days=90)
-        emails = Email.objects.filter(
-            recipients__icontains=obj.user.email, date_sent__gte=ninety_days_ago
-        ).values_list("date_sent", flat=True)
-
-        # Count emails by date
-        email_dates = [email.date() if hasattr(email, "date") else email for email in emails]
-        counts_by_date = {}
-        for date in email_dates:
-            counts_by_date[date] = counts_by_date.get(date, 0) + 1
+        counts_by_date = email_counts_by_date(obj.user.email, ninety_days_ago)
 
         # Build counts for sparklines
         counts_prev_60 = ",".join(
@@ -508,9 +518,9 @@ class ProfileAdmin(ReadOnlyLeafletGeoAdminMixin, admin.ModelAdmin):
         if obj is None or not obj.user.email:
             return "No emails found"
 
-        emails = Email.objects.filter(recipients__icontains=obj.user.email).order_by("-date_sent")[
-            :20
-        ]
+        emails = Email.objects.filter(recipient_index__recipient=obj.user.email.lower()).order_by(
+            "-date_sent"
+        )[:20]
 
         if not emails:
             return "No emails found"
@@ -0,0 +1,70 @@
+import datetime
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from profiles.models import EmailActivityDay, EmailRecipient
+
+
+def record_email_activity(recipients):
+    """Add newly logged EmailRecipient rows to the daily rollup."""
+    counts = Counter(
+        (recipient.recipient, timezone.localdate(recipient.date_sent)) for recipient in recipients
+    )
+    if not counts:
+        return
+
+    values, params = [], []
+    for (recipient, date), count in counts.items():
+        values.append("(%s, %s, %s)")
+        params.extend([recipient, date, count])
+
+    table = EmailActivityDay._meta.db_table
+    sql = f"""
+        INSERT INTO {table} (recipient, date, count)
+        VALUES {", ".join(values)}
+        ON CONFLICT (recipient, date) DO UPDATE SET count = {table}.count + EXCLUDED.count
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def rollup_email_activity(since=None):
+    """
+    Recompute the daily rollup from EmailRecipient for every day from `since` onwards.
+
+    With no `since` the whole table is rebuilt. This corrects any drift from the
+    incremental updates, e.g. sends whose transaction rolled back or deleted logs.
+    """
+    table = EmailActivityDay._meta.db_table
+    where, params = "", [settings.TIME_ZONE]
+    rollups = EmailActivityDay.objects.all()
+    if since is not None:
+        where = "WHERE date_sent >= %s"
+        params.append(timezone.make_aware(datetime.datetime.combine(since, datetime.time.min)))
+        rollups = rollups.filter(date__gte=since)
+
+    sql = f"""
+        INSERT INTO {table} (recipient, date, count)
+        SELECT recipient, (date_sent AT TIME ZONE %s)::date, COUNT(*)
+          FROM {EmailRecipient._meta.db_table}
+          {where}
+         GROUP BY 1, 2
+        ON CONFLICT (recipient, date) DO UPDATE SET count = EXCLUDED.count
+    """
+    with transaction.atomic():
+        rollups.delete()
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount
+
+
+def email_counts_by_date(recipient, since):
+    """Return {date: count} of emails sent to `recipient` on or after `since`."""
+    return dict(
+        EmailActivityDay.objects.filter(recipient=recipient.lower(), date__gte=since).values_list(
+            "date", "count"
+        )
+    )
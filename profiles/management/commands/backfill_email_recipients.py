@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from email_log.models import Email
+
+from profiles.models import EmailRecipient
+
+
+class Command(BaseCommand):
+    help = "Index recipients of already logged emails into EmailRecipient"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        emails = (
+            Email.objects.filter(recipient_index__isnull=True)
+            .only("id", "recipients", "date_sent")
+            .order_by("id")
+        )
+
+        batch, indexed = [], 0
+        for email in emails.iterator(chunk_size=chunk_size):
+            batch.append(email)
+            if len(batch) >= chunk_size:
+                indexed += self._index(batch)
+                batch = []
+        if batch:
+            indexed += self._index(batch)
+
+        self.stdout.write(f"Indexed {indexed} recipients")
+
+    def _index(self, emails):
+        rows = EmailRecipient.for_emails(emails)
+        EmailRecipient.objects.bulk_create(rows, ignore_conflicts=True)
+        return len(rows)
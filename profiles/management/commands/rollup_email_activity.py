@@ -0,0 +1,25 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from profiles.email_activity import rollup_email_activity
+
+
+class Command(BaseCommand):
+    help = "Recompute daily per-recipient email counts from the EmailRecipient index"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Only recompute the last N days (default: rebuild everything)",
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options["days"] is not None:
+            since = timezone.localdate() - datetime.timedelta(days=options["days"])
+        rows = rollup_email_activity(since=since)
+        self.stdout.write(f"Wrote {rows} daily email activity rows")
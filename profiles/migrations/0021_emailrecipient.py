@@ -0,0 +1,48 @@
+# Generated by Django 5.1.8 on 2026-10-18 04:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("email_log", "0004_alter_attachment_file"),
+        ("profiles", "0020_shirtorder_product_type_alter_shirtorder_fit"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmailRecipient",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("recipient", models.CharField(max_length=254)),
+                ("date_sent", models.DateTimeField()),
+                (
+                    "email",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recipient_index",
+                        to="email_log.email",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["recipient", "date_sent"], name="profiles_em_recipie_e0d877_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("email", "recipient"), name="unique_email_recipient"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.8 on 2026-10-18 05:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("profiles", "0021_emailrecipient"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmailActivityDay",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("recipient", models.CharField(max_length=254)),
+                ("date", models.DateField()),
+                ("count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("recipient", "date"),
+                        name="unique_email_activity_recipient_date",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,5 +1,6 @@
 import datetime
 import uuid
+from email.utils import getaddresses
 
 from django.contrib.auth.models import User
 from django.contrib.gis.db import models
@@ -8,7 +9,9 @@ from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from email_log.models import Email
 
+from facets.membership import update_profile_memberships
 from facets.models import District as DistrictFacet
 from facets.models import (
     RegisteredCommunityOrganization as RegisteredCommunityOrganizationFacet,
@@ -59,6 +62,7 @@ class Profile(models.Model):
     location = models.PointField(blank=True, null=True, srid=4326)
 
     def save(self, *args, **kwargs):
+        location_changed = self.location is not None
         if not self._state.adding:
             old_model = Profile.objects.get(pk=self.pk)
             change_fields = [
@@ -73,10 +77,15 @@ class Profile(models.Model):
             if modified:
                 transaction.on_commit(lambda: sync_to_mailjet.delay(self.id))
                 transaction.on_commit(lambda: geocode_profile.delay(self.id))
+            location_changed = old_model.location != self.location
         else:
             transaction.on_commit(lambda: sync_to_mailjet.delay(self.id))
             transaction.on_commit(lambda: geocode_profile.delay(self.id))
         super(Profile, self).save(*args, **kwargs)
+        # Registered after saving, outside a transaction on_commit runs straight away and
+        # must see the new location
+        if location_changed:
+            transaction.on_commit(lambda: update_profile_memberships([self.id]))
 
     def membership(self):
         now = timezone.now().date()
@@ -320,13 +329,20 @@ class Profile(models.Model):
     def organizer_application(self):
         return OrganizerApplication.objects.filter(submitter=self.user, draft=False).all()
 
+    def _member_facets(self, facet_model):
+        return facet_model.objects.filter(
+            id__in=self.facet_memberships.filter(facet_type=facet_model.facet_type()).values(
+                "facet_id"
+            )
+        )
+
     @property
     def district(self):
         if self.street_address is None:
             return None
         if self.location is None:
             return None
-        return DistrictFacet.objects.filter(mpoly__contains=self.location).first()
+        return self._member_facets(DistrictFacet).first()
 
     @property
     def rcos(self):
@@ -335,7 +351,7 @@ class Profile(models.Model):
         if self.location is None:
             return None
         return (
-            RegisteredCommunityOrganizationFacet.objects.filter(mpoly__contains=self.location)
+            self._member_facets(RegisteredCommunityOrganizationFacet)
             .filter(properties__ORG_TYPE="Other")
             .order_by("properties__OBJECTID")
             .all()
@@ -348,7 +364,7 @@ class Profile(models.Model):
         if self.location is None:
             return None
         return (
-            RegisteredCommunityOrganizationFacet.objects.filter(mpoly__contains=self.location)
+            self._member_facets(RegisteredCommunityOrganizationFacet)
             .filter(properties__ORG_TYPE="Ward")
             .order_by("properties__OBJECTID")
             .all()
@@ -361,7 +377,7 @@ class Profile(models.Model):
         if self.location is None:
             return None
         return (
-            RegisteredCommunityOrganizationFacet.objects.filter(mpoly__contains=self.location)
+            self._member_facets(RegisteredCommunityOrganizationFacet)
             .filter(properties__ORG_TYPE__in=["NID", "SSD", None])
             .order_by("properties__OBJECTID")
             .all()
@@ -420,6 +436,68 @@ class DoNotEmail(models.Model):
         verbose_name_plural = "Do Not Email"
 
 
+class EmailRecipient(models.Model):
+    """
+    One row per recipient of a logged email_log Email.
+
+    Email.recipients is a single "; " joined string, so per-address lookups against it
+    are substring scans. This table is filled as emails are logged (see profiles.signals)
+    and lets those lookups use an index instead.
+    """
+
+    email = models.ForeignKey(Email, on_delete=models.CASCADE, related_name="recipient_index")
+    recipient = models.CharField(max_length=254)
+    date_sent = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["email", "recipient"], name="unique_email_recipient")
+        ]
+        indexes = [models.Index(fields=["recipient", "date_sent"])]
+
+    def __str__(self):
+        return f"{self.recipient} ({self.date_sent})"
+
+    @staticmethod
+    def addresses(recipients):
+        """Lowercased addresses from an Email.recipients string."""
+        if not recipients:
+            return []
+        parsed = getaddresses(recipients.split(";"))
+        return sorted({address.strip().lower() for _name, address in parsed if address.strip()})
+
+    @classmethod
+    def for_emails(cls, emails):
+        return [
+            cls(email=email, recipient=address, date_sent=email.date_sent)
+            for email in emails
+            for address in cls.addresses(email.recipients)
+        ]
+
+
+class EmailActivityDay(models.Model):
+    """
+    Number of emails sent to a recipient on a given (local) day.
+
+    Incremented as emails are logged and recomputed nightly from EmailRecipient, see
+    profiles.email_activity.
+    """
+
+    recipient = models.CharField(max_length=254)
+    date = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recipient", "date"], name="unique_email_activity_recipient_date"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.recipient} {self.date}: {self.count}"
+
+
 class ShirtOrder(models.Model):
     class ProductType(models.IntegerChoices):
         T_SHIRT = 0, "T-Shirt"
@@ -1,7 +1,10 @@
 from allauth.socialaccount.models import SocialAccount
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from email_log.models import Email
 
+from profiles.email_activity import record_email_activity
+from profiles.models import EmailRecipient
 from profiles.tasks import add_user_to_connected_role, remove_user_from_connected_role
 
 
@@ -15,3 +18,11 @@ def social_account_post_save(sender, instance, **kwargs):
 def social_account_post_delete(sender, instance, **kwargs):
     if instance.provider == "discord":
         remove_user_from_connected_role.delay(instance.uid)
+
+
+@receiver(post_save, sender=Email, dispatch_uid="email_log_post_save")
+def email_log_post_save(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        recipients = EmailRecipient.for_emails([instance])
+        EmailRecipient.objects.bulk_create(recipients, ignore_conflicts=True)
+        record_email_activity(recipients)
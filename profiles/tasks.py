@@ -1,8 +1,13 @@
+import datetime
+
 from asgiref.sync import async_to_sync
 from celery import shared_task
 from django.conf import settings
 from django.contrib.gis.geos import Point
+from django.utils import timezone
 
+from facets.geocoding import bulk_geocode
+from facets.membership import update_profile_memberships
 from facets.utils import geocode_address
 from pba_discord.bot import bot
 from pbaabp.integrations.mailjet import Mailjet
@@ -34,6 +39,17 @@ def remove_user_from_connected_role(uid):
     async_to_sync(_remove_user_from_connected_role)(uid)
 
 
+def profile_search_address(profile):
+    if profile.street_address is None:
+        return None
+    return profile.street_address + " " + (profile.zip_code or "")
+
+
+def profile_address_accepted(address):
+    # A bare "Philadelphia, PA" match means the street address wasn't found
+    return address.address is not None and not address.address.startswith("Philadelphia")
+
+
 @shared_task
 def geocode_profile(profile_id):
     from profiles.models import Profile
@@ -42,8 +58,8 @@ def geocode_profile(profile_id):
 
     if profile.street_address is not None:
         print(f"Geocoding {profile}")
-        address = async_to_sync(geocode_address)(profile.street_address + " " + profile.zip_code)
-        if address.address is not None and not address.address.startswith("Philadelphia"):
+        address = async_to_sync(geocode_address)(profile_search_address(profile))
+        if address is not None and profile_address_accepted(address):
             print(f"Address found {address}")
             Profile.objects.filter(id=profile_id).update(
                 location=Point(address.longitude, address.latitude)
@@ -51,6 +67,28 @@ def geocode_profile(profile_id):
         else:
             print(f"No address found for {profile.street_address} {profile.zip_code}")
             Profile.objects.filter(id=profile_id).update(location=None)
+        update_profile_memberships([profile_id])
+
+
+def update_profile_memberships_for(profiles):
+    update_profile_memberships([profile.pk for profile in profiles])
+
+
+@shared_task
+def bulk_geocode_profiles(profile_ids=None, only_missing=True):
+    from profiles.models import Profile
+
+    queryset = Profile.objects.filter(street_address__isnull=False)
+    if profile_ids is not None:
+        queryset = queryset.filter(id__in=profile_ids)
+    if only_missing:
+        queryset = queryset.filter(location__isnull=True)
+    return bulk_geocode(
+        queryset,
+        profile_search_address,
+        accept=profile_address_accepted,
+        on_chunk=update_profile_memberships_for,
+    )
 
 
 @shared_task
@@ -99,3 +137,10 @@ def unsubscribe_mailjet_email(list_id, email):
         from profiles.models import Profile
 
         Profile.objects.filter(user__email=email).update(newsletter_opt_in=False)
+
+
+@shared_task
+def rollup_email_activity(days=2):
+    from profiles.email_activity import rollup_email_activity as _rollup_email_activity
+
+    _rollup_email_activity(since=timezone.localdate() - datetime.timedelta(days=days))
@@ -2,12 +2,14 @@ import datetime
 
 from allauth.socialaccount.models import SocialAccount
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 from django.utils import timezone
 from djstripe.models import Customer, Price, Product, Subscription
+from email_log.models import Email
 
 from membership.models import Membership
-from profiles.models import DiscordActivity, Profile
+from profiles.email_activity import email_counts_by_date, rollup_email_activity
+from profiles.models import DiscordActivity, EmailActivityDay, EmailRecipient, Profile
 
 
 class ProfileEligibilityTestCase(TestCase):
@@ -702,3 +704,38 @@ class ProfileEligibilityTestCase(TestCase):
         after_end = end_date + datetime.timedelta(days=1)
         result = self.profile.eligible_as_of(after_end)
         self.assertFalse(result["membership_sufficient_alone"])
+
+
+class EmailRecipientTestCase(SimpleTestCase):
+    def test_addresses(self):
+        self.assertEqual(
+            EmailRecipient.addresses("Jane Doe <Jane@Example.com>; bob@example.com;  "),
+            ["bob@example.com", "jane@example.com"],
+        )
+
+    def test_addresses_empty(self):
+        self.assertEqual(EmailRecipient.addresses(""), [])
+
+
+class EmailActivityTestCase(TestCase):
+    def _send(self, recipients):
+        return Email.objects.create(
+            from_email="info@bikeaction.org", recipients=recipients, subject="Hi", body="Hi"
+        )
+
+    def test_sends_are_rolled_up(self):
+        self._send("Test@Example.com")
+        self._send("test@example.com; other@example.com")
+
+        today = timezone.localdate()
+        self.assertEqual(email_counts_by_date("test@example.com", today), {today: 2})
+        self.assertEqual(email_counts_by_date("other@example.com", today), {today: 1})
+
+    def test_rollup_recomputes_counts(self):
+        self._send("test@example.com")
+        EmailActivityDay.objects.update(count=10)
+
+        rollup_email_activity(since=timezone.localdate())
+
+        today = timezone.localdate()
+        self.assertEqual(email_counts_by_date("test@example.com", today), {today: 1})
@@ -0,0 +1,30 @@
+// Decoder for the compact pin format written by pbaabp.pins.encode_pins:
+// uint32 count, uint32 scale, then count Int32 latitude deltas, count Int32
+// longitude deltas and count Float32 weights, all little endian.
+function decodePins(buffer) {
+  const view = new DataView(buffer);
+  const count = view.getUint32(0, true);
+  const scale = view.getUint32(4, true);
+  const lats = new Int32Array(buffer, 8, count);
+  const lngs = new Int32Array(buffer, 8 + 4 * count, count);
+  const weights = new Float32Array(buffer, 8 + 8 * count, count);
+
+  const pins = new Array(count);
+  let lat = 0;
+  let lng = 0;
+  for (let i = 0; i < count; i++) {
+    lat += lats[i];
+    lng += lngs[i];
+    pins[i] = [lat / scale, lng / scale, weights[i]];
+  }
+  return pins;
+}
+
+function decodePinsBase64(encoded) {
+  const binary = atob(encoded);
+  const bytes = new Uint8Array(binary.length);
+  for (let i = 0; i < binary.length; i++) {
+    bytes[i] = binary.charCodeAt(i);
+  }
+  return decodePins(bytes.buffer);
+}